@@ -0,0 +1,97 @@
+# benchmarks/bench_api_solides.py
+"""
+Benchmark e conferência da busca de detalhes da API Solides (extrair_api_solides).
+
+Sobe a API falsa (benchmarks/fake_solides.py) com latência por requisição e
+compara a busca antiga (um requests.get por colaborador, em série, conexão
+nova a cada chamada) com a busca em paralelo sobre Session com keep-alive.
+Depois liga o limite de taxa do servidor e confere que o token bucket do
+cliente e o tratamento de 429/Retry-After entregam todos os detalhes.
+Em todos os cenários o resultado tem de ser idêntico e na ordem da listagem.
+O cenário incremental confere que, com a marca d'água da última
+sincronização, só os colaboradores alterados têm o detalhe rebuscado.
+
+Uso:
+    python benchmarks/bench_api_solides.py [--colaboradores 300] [--latencia 0.02] [--workers 16]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from src.extract import extrair_api_solides, sincronizar_api_solides
+from src.solides import marca_da_listagem
+from benchmarks.fake_solides import iniciar_servidor
+
+
+def extrair_antigo(token, base_url):
+    """
+    Busca como era feita antes: listagem e detalhes com requests.get em série.
+    """
+    headers = {"Authorization": f"Token token={token}", "Accept": "application/json"}
+    colabs_lista, page = [], 1
+    while True:
+        r = requests.get(f"{base_url}/colaboradores", headers=headers,
+                         params={'page': page, 'page_size': 100, 'status': 'todos'})
+        if r.status_code != 200 or not r.json(): break
+        colabs_lista.extend(r.json())
+        page += 1
+    detalhes = []
+    for item in colabs_lista:
+        r_det = requests.get(f"{base_url}/colaboradores/{item['id']}", headers=headers)
+        detalhes.append(r_det.json() if r_det.status_code == 200 else item)
+    return detalhes
+
+
+def cenario(nome, funcao, esperado, estado):
+    requisicoes, respostas_429 = estado.requisicoes, estado.respostas_429
+    t0 = time.perf_counter()
+    obtido = funcao()
+    t = time.perf_counter() - t0
+    if obtido != esperado:
+        raise SystemExit(f"[ERRO] {nome}: resultado diferente do esperado (ordem ou conteúdo).")
+    print(f"{nome:<38} {t:>7.2f}s  {len(obtido) / t:>8.0f} colab/s  "
+          f"{estado.requisicoes - requisicoes:>6} req  {estado.respostas_429 - respostas_429:>4} x 429")
+    return t
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--colaboradores', type=int, default=300)
+    parser.add_argument('--latencia', type=float, default=0.02)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    servidor, estado, base_url = iniciar_servidor(args.colaboradores, args.latencia)
+    esperado = estado.colaboradores
+    try:
+        t_antigo = cenario("antigo (série, sem keep-alive)", lambda: extrair_antigo('x', base_url), esperado, estado)
+        cenario("série com Session", lambda: extrair_api_solides('x', base_url, workers=1, rps=0), esperado, estado)
+        t_novo = cenario(f"{args.workers} threads, sem limite",
+                         lambda: extrair_api_solides('x', base_url, workers=args.workers, rps=0), esperado, estado)
+
+        # Incremental: só quem tem updated_at >= marca (o último dia) tem o detalhe rebuscado
+        marca = marca_da_listagem(esperado)
+        ids_locais = {c['id'] for c in esperado}
+        alterados = [c for c in esperado if c['updated_at'] >= marca.strftime('%Y-%m-%d')]
+        cenario("incremental (marca d'água)",
+                lambda: sincronizar_api_solides('x', marca, ids_locais, base_url, workers=args.workers, rps=0)[0],
+                alterados, estado)
+
+        # Servidor limitado a 100 req/s: cliente abaixo do limite (sem 429) e sem limite (com 429)
+        estado.limite_rps = 100
+        cenario(f"{args.workers} threads, cliente a 90 req/s",
+                lambda: extrair_api_solides('x', base_url, workers=args.workers, rps=90), esperado, estado)
+        cenario(f"{args.workers} threads, cliente sem limite",
+                lambda: extrair_api_solides('x', base_url, workers=args.workers, rps=0), esperado, estado)
+    finally:
+        servidor.shutdown()
+
+    print(f"[OK] detalhes idênticos e na ordem em todos os cenários; ganho {t_antigo / t_novo:.1f}x sem limite de taxa.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_campos_bloco.py
+"""
+Benchmark e conferência do extrair_campos_bloco (cabeçalho + rodapé do bloco).
+
+Compara a extração antiga (~25 re.search independentes por bloco, cada um
+varrendo o bloco inteiro, com os fallbacks de férias) com extrair_campos_bloco
+(rótulos achados com str.find + regex ancorado). Além dos blocos de holerite e
+férias sintéticos, gera variações (rótulos em maiúsculas, trechos apagados,
+rótulos aninhados como "Total de Proventos:") e exige resultado idêntico.
+
+Uso:
+    python benchmarks/bench_campos_bloco.py [--funcionarios 2000] [--variacoes 20000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extract import segmentar_blocos, extrair_campos_bloco, PERFIS_LAYOUT, CAMPOS_MONETARIOS
+from src.utils import limpar_valor_moeda
+from tests.referencia import gerar_texto_holerite, gerar_texto_ferias, campos_antigos, variar
+
+
+def campos_novos(bloco, perfil):
+    """
+    extrair_campos_bloco com os valores monetários convertidos (como em _montar_dataframes).
+    """
+    dados = extrair_campos_bloco(bloco, perfil)
+    for campo in CAMPOS_MONETARIOS:
+        dados[campo] = limpar_valor_moeda(dados[campo])
+    return dados
+
+
+def medir(funcao, blocos, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        for bloco in blocos:
+            funcao(bloco)
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--funcionarios', type=int, default=2000)
+    parser.add_argument('--variacoes', type=int, default=20000)
+    args = parser.parse_args()
+
+    blocos = []
+    for texto in (gerar_texto_holerite(args.funcionarios), gerar_texto_ferias(args.funcionarios)):
+        blocos.extend(texto[i:f] for i, f in segmentar_blocos(texto))
+
+    rng = random.Random(1)
+    casos = blocos + [variar(rng.choice(blocos), rng) for _ in range(args.variacoes)]
+    generico = PERFIS_LAYOUT['generico']
+    for bloco in casos:
+        if campos_antigos(bloco) != campos_novos(bloco, generico):
+            raise SystemExit(f"Resultado divergente no bloco:\n{bloco}")
+    print(f"[OK] {len(casos)} blocos idênticos (inclui {args.variacoes} variações).")
+
+    for nome_perfil in ('generico', 'holerite'):
+        perfil = PERFIS_LAYOUT[nome_perfil]
+        t_antigo = medir(campos_antigos, blocos)
+        t_novo = medir(lambda b: campos_novos(b, perfil), blocos)
+        print(f"{len(blocos)} blocos, perfil {nome_perfil:>9}: antigo {t_antigo:.3f}s  "
+              f"novo {t_novo:.3f}s  ganho {t_antigo / t_novo:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
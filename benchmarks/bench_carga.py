@@ -0,0 +1,90 @@
+# benchmarks/bench_carga.py
+"""
+Benchmark da carga de staging: COPY FROM STDIN (src/bulk.py) x DataFrame.to_sql.
+
+Gera um stg_folha_detalhe sintético (rubricas com valores em centavos, datas,
+textos com acentos, aspas, ponto e vírgula, texto vazio e nulos), carrega com
+os dois métodos no banco do .env e confere que as tabelas ficam idênticas
+(mesmos tipos de coluna e mesmas linhas). Como no pipeline, os stagings são
+tabelas temporárias: nada fica no banco depois do benchmark.
+
+Uso:
+    python benchmarks/bench_carga.py [--linhas 200000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from sqlalchemy import text
+from src.database import get_db_engine
+from src.bulk import carregar_staging
+from src.constants import SCHEMA_RUBRICAS, MAPEAMENTO_CODIGOS
+
+
+def gerar_detalhe(n_linhas, seed=5):
+    """
+    DataFrame no formato do df_detalhe que sai do transformar_dados_pdf.
+    """
+    rng = random.Random(seed)
+    codigos = list(MAPEAMENTO_CODIGOS)
+    linhas = []
+    for i in range(n_linhas):
+        codigo = rng.choice(codigos)
+        linhas.append({
+            'competencia': date(2023, rng.randint(1, 12), 1),
+            'tipo_calculo': rng.choice(['Folha Mensal', 'Férias', '13º Salário']),
+            'departamento': rng.choice(['TI', 'RH "Central"', 'Operações; Belém', '']),
+            'vinculo': rng.choice(['Empregado', 'Contribuinte', None]),
+            'nome_funcionario': f"FUNCIONÁRIO {i % 5000}",
+            'cpf': f"{rng.randint(0, 10 ** 11 - 1):011d}",
+            'situacao': rng.choice(['Trabalhando', 'Férias', None]),
+            'codigo_rubrica': codigo,
+            'nome_rubrica': MAPEAMENTO_CODIGOS[codigo],
+            'tipo_rubrica': 'Provento' if MAPEAMENTO_CODIGOS[codigo].startswith('P_') else 'Desconto',
+            'valor_rubrica': rng.choice([rng.randint(1, 5_000_000), None]),
+        })
+    df = pd.DataFrame(linhas)
+    df['valor_rubrica'] = df['valor_rubrica'].astype('Int64')
+    return df
+
+
+def ler_tabela(conn, nome):
+    tipos = conn.execute(text(
+        "SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = CAST(:t AS regclass) AND attnum > 0 ORDER BY attnum"),
+        {'t': f'pg_temp.{nome}'}).fetchall()
+    df = pd.read_sql(text(f'SELECT * FROM pg_temp."{nome}"'), conn).astype(str)
+    return tipos, df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=200_000)
+    args = parser.parse_args()
+
+    engine, _ = get_db_engine()
+    df = gerar_detalhe(args.linhas)
+    tempos = {}
+    with engine.begin() as conn:
+        for metodo in ('to_sql', 'copy'):
+            t0 = time.perf_counter()
+            carregar_staging(df, f"stg_bench_{metodo}", conn, dtype=SCHEMA_RUBRICAS, indices=['cpf'], metodo=metodo)
+            tempos[metodo] = time.perf_counter() - t0
+        ref, novo = (ler_tabela(conn, f"stg_bench_{m}") for m in ('to_sql', 'copy'))
+
+    if ref[0] != novo[0] or not ref[1].equals(novo[1]):
+        raise SystemExit(f"[ERRO] Tabelas divergentes entre to_sql e COPY. Tipos: {ref[0]} x {novo[0]}")
+    print(f"[OK] {args.linhas} linhas idênticas nos dois métodos.")
+    print(f"to_sql {tempos['to_sql']:.2f}s  COPY {tempos['copy']:.2f}s  "
+          f"ganho {tempos['to_sql'] / tempos['copy']:.1f}x  "
+          f"({args.linhas / tempos['copy']:,.0f} linhas/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+# benchmarks/bench_extracao_escala.py
+"""
+Benchmark de escala da extração de PDFs (processar_pdfs) com a folha sintética
+de benchmarks/gerar_holerites.py: holerite, férias e 13º com N funcionários cada.
+
+Para cada tamanho informa páginas/s, funcionários/s e o pico de RSS (o maior
+entre o processo principal e os workers), e confere o resultado contra o
+gabarito do gerador (funcionários, rubricas e soma do líquido). Cada tamanho
+roda num subprocesso próprio, para o pico de RSS ser só dele; a geração dos
+PDFs fica fora do tempo medido.
+
+As medições de referência ficam em benchmarks/baselines/extracao_pdf.json,
+por backend e número de workers. Sem --salvar-baseline, cada tamanho é
+comparado com a referência e o script sai com código 1 se a vazão cair ou o
+pico de RSS subir mais que a tolerância, para a regressão aparecer no review.
+As referências só valem para a máquina em que foram gravadas (o arquivo
+guarda CPU e versões); ao trocar de máquina, grave de novo.
+
+Uso:
+    python benchmarks/bench_extracao_escala.py [--funcionarios 10 100 1000 10000] [--backend pdfium]
+                                               [--workers 1] [--repeticoes 1] [--tolerancia 0.25]
+                                               [--salvar-baseline]
+"""
+import os
+import io
+import sys
+import json
+import time
+import platform
+import resource
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extract import processar_pdfs
+from src.backends import BACKEND_PADRAO, configuracao_backend
+from benchmarks.gerar_holerites import gerar_pasta
+
+ARQUIVO_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'extracao_pdf.json')
+
+
+def pico_rss_mib():
+    """
+    Maior RSS entre este processo e os filhos já encerrados (workers do pool).
+    """
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+
+
+def conferir(df_consol, df_detalhe, resumo):
+    """
+    Lista de divergências entre a extração e o gabarito do gerador (vazia se bateu).
+    """
+    esperado = {campo: sum(info[campo] for info in resumo.values())
+                for campo in ('funcionarios', 'rubricas', 'liquido_centavos')}
+    obtido = {'funcionarios': len(df_consol),
+              'rubricas': int(df_detalhe['codigo_rubrica'].notna().sum()) if len(df_detalhe) else 0,
+              'liquido_centavos': int(round(df_consol['valor_liquido'].sum() * 100)) if len(df_consol) else 0}
+    return [f"{campo}: esperado {esperado[campo]}, extraído {obtido[campo]}"
+            for campo in esperado if esperado[campo] != obtido[campo]]
+
+
+def medir(n_funcionarios, args):
+    """
+    Extrai a folha sintética de `n_funcionarios`. Roda no subprocesso.
+    """
+    with tempfile.TemporaryDirectory(prefix='bench_extracao_') as pasta:
+        resumo = gerar_pasta(pasta, n_funcionarios)
+        paginas = sum(info['paginas'] for info in resumo.values())
+        melhor = None
+        for _ in range(args.repeticoes):
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                df_consol, df_detalhe = processar_pdfs(pasta, workers=args.workers, backend=args.backend)
+            segundos = time.perf_counter() - t0
+            melhor = segundos if melhor is None else min(melhor, segundos)
+        divergencias = conferir(df_consol, df_detalhe, resumo)
+    return {
+        'funcionarios': len(df_consol), 'paginas': paginas, 'segundos': round(melhor, 3),
+        'paginas_s': round(paginas / melhor, 1), 'funcionarios_s': round(len(df_consol) / melhor, 1),
+        'pico_rss_mib': round(pico_rss_mib(), 1), 'divergencias': divergencias,
+    }
+
+
+def maquina(backend):
+    return {'cpu': platform.processor() or platform.machine(), 'nucleos': os.cpu_count(),
+            'python': platform.python_version(), 'backend': configuracao_backend(backend)}
+
+
+def ler_baselines():
+    if not os.path.exists(ARQUIVO_BASELINE):
+        return {}
+    with open(ARQUIVO_BASELINE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gravar_baselines(baselines):
+    os.makedirs(os.path.dirname(ARQUIVO_BASELINE), exist_ok=True)
+    with open(ARQUIVO_BASELINE, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def comparar(resultado, referencia, tolerancia):
+    """
+    Regressões de `resultado` frente à `referencia` do mesmo tamanho.
+    """
+    regressoes = []
+    if resultado['paginas_s'] < referencia['paginas_s'] * (1 - tolerancia):
+        regressoes.append(f"vazão {resultado['paginas_s']} pág/s < referência {referencia['paginas_s']}")
+    if resultado['pico_rss_mib'] > referencia['pico_rss_mib'] * (1 + tolerancia):
+        regressoes.append(f"pico RSS {resultado['pico_rss_mib']} MiB > referência {referencia['pico_rss_mib']}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--funcionarios', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--backend', default=BACKEND_PADRAO)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--repeticoes', type=int, default=1)
+    parser.add_argument('--tolerancia', type=float, default=0.25)
+    parser.add_argument('--salvar-baseline', action='store_true')
+    parser.add_argument('--um', type=int, help=argparse.SUPPRESS)  # uso interno: um tamanho, no subprocesso
+    args = parser.parse_args()
+
+    if args.um:
+        print(json.dumps(medir(args.um, args)))
+        return
+
+    chave = f"{args.backend}/workers={args.workers}"
+    baselines = ler_baselines()
+    referencias = baselines.get(chave, {}).get('tamanhos', {})
+    regrediu = divergiu = False
+
+    print(f"Backend {args.backend}, {args.workers} worker(s)")
+    print(f"{'func.':>6} {'páginas':>8} {'tempo':>8} {'pág/s':>8} {'func/s':>8} {'pico RSS':>9}  referência")
+    resultados = {}
+    for n in args.funcionarios:
+        filho = subprocess.run([sys.executable, os.path.abspath(__file__), '--um', str(n), '--backend', args.backend,
+                                '--workers', str(args.workers), '--repeticoes', str(args.repeticoes)],
+                               capture_output=True, text=True)
+        if filho.returncode != 0:
+            raise SystemExit(f"[ERRO] {n} funcionários:\n{filho.stdout[-2000:]}{filho.stderr[-2000:]}")
+        r = json.loads(filho.stdout.strip().splitlines()[-1])
+        resultados[str(n)] = {k: v for k, v in r.items() if k != 'divergencias'}
+
+        referencia = referencias.get(str(n))
+        if referencia is None:
+            situacao = "sem referência"
+        else:
+            regressoes = comparar(r, referencia, args.tolerancia)
+            situacao = "[AVISO] REGRESSÃO: " + "; ".join(regressoes) if regressoes else f"ok ({referencia['paginas_s']} pág/s)"
+            regrediu = regrediu or bool(regressoes)
+        print(f"{n:>6} {r['paginas']:>8} {r['segundos']:>7.2f}s {r['paginas_s']:>8.1f} {r['funcionarios_s']:>8.1f} "
+              f"{r['pico_rss_mib']:>6.0f}MiB  {situacao}")
+        if r['divergencias']:
+            print(f"[ERRO] Extração diverge do gabarito: {'; '.join(r['divergencias'])}")
+            divergiu = True
+
+    if args.salvar_baseline:
+        if divergiu:
+            raise SystemExit("[ERRO] Referência não gravada: a extração divergiu do gabarito.")
+        entrada = baselines.setdefault(chave, {'tamanhos': {}})
+        entrada['maquina'] = maquina(args.backend)
+        entrada['tamanhos'].update(resultados)
+        gravar_baselines(baselines)
+        print(f"[OK] Referência gravada em {ARQUIVO_BASELINE} ({chave}).")
+    elif regrediu or divergiu:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# benchmarks/bench_pipeline_api.py
+"""
+Benchmark ponta a ponta da etapa da API Solides: busca -> transformação -> carga.
+
+Sobe a API falsa (benchmarks/fake_solides.py) num processo separado, para o
+servidor não disputar o GIL com o pipeline, e roda a sincronização completa
+como o main.py faz: iterar_api_solides -> transformar_lotes_api ->
+carregar_dados_api, num schema descartável do banco do .env (apagado no fim).
+Para cada tamanho informa registros/s ponta a ponta, o tempo gasto em cada
+fase e o pico de RSS. Cada tamanho roda num subprocesso próprio, para o pico
+de RSS ser só dele.
+
+Como a busca roda numa thread à frente da carga, "espera API" é o tempo em que
+a transformação/carga ficou parada esperando páginas, não o tempo total de rede.
+
+Uso:
+    python benchmarks/bench_pipeline_api.py [--colaboradores 1000 10000 50000] [--latencia 0]
+                                            [--taxa-erro 0] [--workers 8] [--schema bench_api_solides]
+"""
+import os
+import re
+import io
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+import contextlib
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from src.database import get_db_engine
+from src.extract import iterar_api_solides
+from src.transform import transformar_lotes_api
+from src.load import carregar_dados_api
+from src.migrations import aplicar_migracoes
+
+FAKE_SOLIDES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_solides.py')
+
+
+def cronometrar(gerador, tempos, fase):
+    """
+    Repassa os itens do gerador somando em tempos[fase] o tempo gasto dentro dele.
+    """
+    iterador = iter(gerador)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            item = next(iterador)
+        except StopIteration:
+            tempos[fase] += time.perf_counter() - t0
+            return
+        tempos[fase] += time.perf_counter() - t0
+        yield item
+
+
+def preparar_schema(engine, schema):
+    """
+    Schema vazio com as tabelas do warehouse, criadas pelas migrações do pipeline.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        aplicar_migracoes(engine, schema)
+
+
+def subir_api_falsa(n_colaboradores, latencia, taxa_erro):
+    """
+    Inicia o fake_solides.py numa porta livre. Devolve (processo, base_url).
+    """
+    processo = subprocess.Popen(
+        [sys.executable, FAKE_SOLIDES, '--colaboradores', str(n_colaboradores), '--latencia', str(latencia),
+         '--taxa-erro', str(taxa_erro), '--porta', '0'],
+        stdout=subprocess.PIPE, text=True)
+    m = re.search(r'(http://\S+)', processo.stdout.readline())
+    if not m:
+        processo.kill()
+        raise SystemExit("[ERRO] A API falsa não subiu.")
+    return processo, m.group(1)
+
+
+def medir(n_colaboradores, args):
+    """
+    Uma sincronização completa de `n_colaboradores`. Roda no subprocesso.
+    """
+    engine, _ = get_db_engine()
+    preparar_schema(engine, args.schema)
+    processo, base_url = subir_api_falsa(n_colaboradores, args.latencia, args.taxa_erro)
+    tempos = defaultdict(float)
+    try:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) as saida:
+            paginas = cronometrar(iterar_api_solides('x', base_url=base_url, workers=args.workers, rps=0),
+                                  tempos, 'espera_api')
+            lotes = cronometrar(transformar_lotes_api(paginas), tempos, 'api_e_transformacao')
+            carregar_dados_api(lotes, engine, args.schema)
+        total = time.perf_counter() - t0
+        if "Carga API concluída" not in saida.getvalue():
+            erro = next((linha for linha in saida.getvalue().splitlines() if linha.startswith("Erro")), "")
+            raise SystemExit(f"[ERRO] Carga falhou: {erro[:500]}")
+        with engine.connect() as conn:
+            carregados = conn.execute(text(
+                f'SELECT COUNT(*) FROM "{args.schema}".dim_colaboradores WHERE colaborador_sk <> 0')).scalar()
+    finally:
+        processo.terminate()
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA IF EXISTS "{args.schema}" CASCADE'))
+    return {
+        'colaboradores': n_colaboradores, 'carregados': carregados, 'total_s': total,
+        'espera_api_s': tempos['espera_api'],
+        'transformacao_s': tempos['api_e_transformacao'] - tempos['espera_api'],
+        'carga_s': total - tempos['api_e_transformacao'],
+        'pico_rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--colaboradores', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--latencia', type=float, default=0.0)
+    parser.add_argument('--taxa-erro', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--schema', default='bench_api_solides')
+    parser.add_argument('--um', type=int, help=argparse.SUPPRESS)  # uso interno: um tamanho, no subprocesso
+    args = parser.parse_args()
+
+    if args.um:
+        print(json.dumps(medir(args.um, args)))
+        return
+
+    print(f"{'colab':>7} {'total':>8} {'reg/s':>7} {'espera API':>11} {'transf.':>8} {'carga':>7} "
+          f"{'carregados':>10} {'pico RSS':>9}")
+    for n in args.colaboradores:
+        filho = subprocess.run([sys.executable, os.path.abspath(__file__), '--um', str(n),
+                                '--latencia', str(args.latencia), '--taxa-erro', str(args.taxa_erro),
+                                '--workers', str(args.workers), '--schema', args.schema],
+                               capture_output=True, text=True)
+        if filho.returncode != 0:
+            raise SystemExit(f"[ERRO] {n} colaboradores:\n{filho.stdout[-2000:]}{filho.stderr[-2000:]}")
+        r = json.loads(filho.stdout.strip().splitlines()[-1])
+        print(f"{n:>7} {r['total_s']:>7.1f}s {n / r['total_s']:>7.0f} {r['espera_api_s']:>10.1f}s "
+              f"{r['transformacao_s']:>7.1f}s {r['carga_s']:>6.1f}s {r['carregados']:>10} "
+              f"{r['pico_rss_mib']:>7.0f}MiB")
+
+
+if __name__ == '__main__':
+    main()
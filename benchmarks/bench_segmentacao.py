@@ -0,0 +1,77 @@
+# benchmarks/bench_segmentacao.py
+"""
+Benchmark da segmentação de blocos de funcionário do processar_pdfs.
+
+Compara a lógica antiga (re.split + texto.find(bloco) + varredura reversa dos
+departamentos, O(n²)) com segmentar_blocos + departamento_do_bloco (passada
+única + bisect). Roda direto sobre o texto que o extract_text devolveria para
+um holerite sintético, isolando o custo da segmentação do custo do pdfplumber.
+
+Uso:
+    python benchmarks/bench_segmentacao.py [--funcionarios 500 1000 2000 5000]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extract import segmentar_blocos, departamento_do_bloco, RE_DEPARTAMENTO
+from tests.referencia import gerar_texto_holerite
+
+def segmentacao_antiga(texto):
+    depto_map = {m.start(): m.group(1).strip() for m in re.finditer(r'Departamento:\s*(.+)', texto)}
+    depto_indices = sorted(depto_map.keys())
+    blocos = re.split(r'(?=(?:Empr|Contr)\.?\s*:\s*\d+|Matrícula:\s*\d+)', texto, flags=re.IGNORECASE)
+    resultado = []
+    for bloco in blocos:
+        if len(bloco) < 50: continue
+        if "CPF:" not in bloco and "Matrícula:" not in bloco: continue
+        posicao_bloco = texto.find(bloco)
+        departamento = next((depto_map[idx] for idx in reversed(depto_indices) if idx < posicao_bloco), None)
+        resultado.append((bloco, departamento))
+    return resultado
+
+
+def segmentacao_nova(texto):
+    depto_indices, depto_nomes = [], []
+    for m in RE_DEPARTAMENTO.finditer(texto):
+        depto_indices.append(m.start())
+        depto_nomes.append(m.group(1).strip())
+    resultado = []
+    for inicio, fim in segmentar_blocos(texto):
+        bloco = texto[inicio:fim]
+        if len(bloco) < 50: continue
+        if "CPF:" not in bloco and "Matrícula:" not in bloco: continue
+        resultado.append((bloco, departamento_do_bloco(inicio, depto_indices, depto_nomes)))
+    return resultado
+
+
+def medir(funcao, texto, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao(texto)
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--funcionarios', type=int, nargs='+', default=[500, 1000, 2000, 5000])
+    args = parser.parse_args()
+
+    print(f"{'funcionarios':>12} {'texto (KB)':>11} {'antiga (s)':>11} {'nova (s)':>10} {'ganho':>8}")
+    for n in args.funcionarios:
+        texto = gerar_texto_holerite(n)
+        if segmentacao_antiga(texto) != segmentacao_nova(texto):
+            raise SystemExit(f"Resultados divergentes para {n} funcionários.")
+        t_antiga = medir(segmentacao_antiga, texto)
+        t_nova = medir(segmentacao_nova, texto)
+        print(f"{n:>12} {len(texto) / 1024:>11.0f} {t_antiga:>11.4f} {t_nova:>10.4f} {t_antiga / t_nova:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
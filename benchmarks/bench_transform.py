@@ -0,0 +1,118 @@
+# benchmarks/bench_transform.py
+"""
+Benchmark e conferência das conversões vetorizadas do transform.
+
+Datas: parse_date_series x .apply(parse_date_seguro). Gera valores aleatórios
+em todos os formatos aceitos, com e sem zero à esquerda, espaços, datas
+inválidas (31/02), fora do intervalo do pandas (9999), lixo, nulos e objetos
+date, e exige resultado idêntico ao da função escalar.
+
+Moeda: limpar_valor_moeda_series x .apply(limpar_valor_moeda), com textos
+aleatórios montados a partir de dígitos, "R$", pontos, vírgulas, sinais,
+espaços (inclusive \\xa0) e letras, além de números, booleanos e nulos soltos.
+
+Centavos: converter_para_centavos x .apply(converter_para_decimal): confere
+que os centavos batem com o Decimal arredondado a 2 casas (como o NUMERIC do
+banco) e compara tempo e memória da coluna valor_rubrica.
+
+Uso:
+    python benchmarks/bench_transform.py [--linhas 1000000] [--casos 50000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from decimal import Decimal, ROUND_HALF_UP
+from src.transform import parse_date_seguro, parse_date_series, converter_para_decimal, converter_para_centavos
+from src.utils import limpar_valor_moeda, limpar_valor_moeda_series
+from tests.referencia import valor_data_aleatorio, valor_moeda_aleatorio
+
+
+def conferir_datas(n_casos, seed=1):
+    rng = random.Random(seed)
+    serie = pd.Series([valor_data_aleatorio(rng) for _ in range(n_casos)], dtype=object)
+    esperado = serie.apply(parse_date_seguro)
+    obtido = parse_date_series(serie)
+    divergentes = [(v, e, o) for v, e, o in zip(serie, esperado, obtido) if e != o and not (e is None and o is None)]
+    if divergentes or obtido.dtype != object:
+        raise SystemExit(f"Datas divergentes: {divergentes[:10]}")
+    print(f"[OK] datas: {n_casos} valores idênticos ao parse_date_seguro.")
+
+
+def conferir_moeda(n_casos, seed=2):
+    rng = random.Random(seed)
+    serie = pd.Series([valor_moeda_aleatorio(rng) for _ in range(n_casos)], dtype=object)
+    esperado = pd.to_numeric(serie.apply(limpar_valor_moeda), errors='raise').astype('float64')
+    obtido = limpar_valor_moeda_series(serie)
+    iguais = (esperado == obtido) | (esperado.isna() & obtido.isna())
+    if not iguais.all() or obtido.dtype != 'float64':
+        raise SystemExit(f"Valores divergentes: {list(zip(serie[~iguais], esperado[~iguais], obtido[~iguais]))[:10]}")
+    print(f"[OK] moeda: {n_casos} valores idênticos ao limpar_valor_moeda.")
+
+
+def conferir_centavos(n_casos, seed=3):
+    rng = random.Random(seed)
+    valores = [rng.choice([None, np.nan, round(rng.uniform(-1e5, 1e5), rng.randint(0, 4)),
+                           rng.randint(0, 10 ** 7) / 100, rng.randint(0, 999) / 1000 + 0.005])
+               for _ in range(n_casos)]
+    serie = pd.Series(valores, dtype='float64')
+    obtido = converter_para_centavos(serie)
+    for v, c in zip(serie.apply(converter_para_decimal), obtido):
+        esperado = pd.NA if v is None else int((v * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+        if not (esperado is pd.NA and c is pd.NA) and esperado != c:
+            raise SystemExit(f"Centavos divergentes: {v} -> {c} (esperado {esperado})")
+    print(f"[OK] centavos: {n_casos} valores idênticos ao Decimal arredondado.")
+
+
+def medir(funcao, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=1_000_000)
+    parser.add_argument('--casos', type=int, default=50_000)
+    args = parser.parse_args()
+
+    conferir_datas(args.casos)
+    conferir_moeda(args.casos)
+    conferir_centavos(args.casos)
+
+    # Competência do detalhe: poucas distintas repetidas em todas as linhas de rubrica
+    competencias = pd.Series(np.random.default_rng(0).choice(
+        [f"{m:02d}/2023" for m in range(1, 13)], size=args.linhas), dtype=object)
+    t_antigo = medir(lambda: competencias.apply(parse_date_seguro), repeticoes=1)
+    t_novo = medir(lambda: parse_date_series(competencias))
+    print(f"competencia ({args.linhas} linhas): apply {t_antigo:.2f}s  vetorizado {t_novo:.3f}s  "
+          f"ganho {t_antigo / t_novo:.0f}x")
+
+    # Valores das rubricas como saem do PDF ('1.234,56')
+    valores = pd.Series([f"{v:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+                         for v in np.random.default_rng(0).uniform(0, 50000, size=args.linhas)], dtype=object)
+    t_antigo = medir(lambda: valores.apply(limpar_valor_moeda), repeticoes=1)
+    t_novo = medir(lambda: limpar_valor_moeda_series(valores))
+    print(f"valor_rubrica ({args.linhas} linhas): apply {t_antigo:.2f}s  vetorizado {t_novo:.3f}s  "
+          f"ganho {t_antigo / t_novo:.1f}x")
+
+    reais = limpar_valor_moeda_series(valores)
+    t_antigo = medir(lambda: reais.apply(converter_para_decimal), repeticoes=1)
+    t_novo = medir(lambda: converter_para_centavos(reais))
+    mb_antigo = reais.apply(converter_para_decimal).memory_usage(deep=True) / 1024 ** 2
+    mb_novo = pd.Series(converter_para_centavos(reais)).memory_usage(deep=True) / 1024 ** 2
+    print(f"valor_rubrica Decimal x centavos: {t_antigo:.2f}s / {mb_antigo:.0f} MB  ->  "
+          f"{t_novo:.3f}s / {mb_novo:.0f} MB  ({mb_antigo / mb_novo:.0f}x menos memória)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+# benchmarks/fake_solides.py
+"""
+Servidor local que imita a API Solides (só para testes e benchmarks).
+
+Implementa GET /colaboradores (paginação page/page_size, lista resumida) e
+GET /colaboradores/{id} (detalhe com os objetos aninhados que o
+transformar_dados_api achata: senior, unity, position, departament,
+address.city.state, contact, documents e benefits). Os colaboradores são
+gerados sob demanda e de forma determinística a partir do id, então o
+servidor aguenta dezenas de milhares sem guardar nada em memória.
+
+Comportamentos configuráveis: latência por requisição, taxa de erro nos
+detalhes (respostas 500, que o cliente troca pelo item da listagem) e limite
+de taxa: acima de `limite_rps` responde 429 com Retry-After (ou sem o
+cabeçalho, para exercitar o backoff exponencial do cliente).
+
+Uso isolado:
+    python benchmarks/fake_solides.py [--colaboradores 500] [--latencia 0.05] [--limite-rps 0]
+                                      [--taxa-erro 0] [--retry-after 1] [--porta 8765]
+Depois: SOLIDES_API_URL=http://127.0.0.1:8765 python main.py
+"""
+import re
+import sys
+import json
+import time
+import random
+import threading
+import argparse
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+RE_DETALHE = re.compile(r'^/colaboradores/(\d+)$')
+ID_INICIAL = 1000
+
+NOMES = ['ANA', 'BRUNO', 'CARLA', 'DIEGO', 'ELISA', 'FÁBIO', 'GISELE', 'HUGO', 'ÍRIS', 'JOÃO', 'LUÍSA', 'MÁRCIO']
+SOBRENOMES = ['SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'PEREIRA', 'LIMA', 'CARVALHO', 'GONÇALVES', "D'ÁVILA"]
+CIDADES = [('Belém', 'PA'), ('Ananindeua', 'PA'), ('São Paulo', 'SP'), ('Manaus', 'AM'), ('Fortaleza', 'CE')]
+UNIDADES = [(1, 'MATRIZ BELÉM'), (2, 'FILIAL MANAUS'), (3, 'FILIAL SÃO PAULO')]
+DEPARTAMENTOS = [(10, 'TI'), (11, 'RH'), (12, 'OPERAÇÕES; CAMPO'), (13, 'FINANCEIRO'), (14, 'COMERCIAL "EXTERNO"')]
+CARGOS = [(100, 'ANALISTA'), (101, 'ASSISTENTE ADMINISTRATIVO'), (102, 'COORDENADOR'), (103, 'TÉCNICO'), (104, 'GERENTE')]
+BENEFICIOS = [('Vale Refeição', 'Alimentação'), ('Vale Transporte', 'Transporte'),
+              ('Plano de Saúde', 'Saúde'), ('Plano Odontológico', 'Saúde'), ('Gympass', 'Bem-estar')]
+
+
+def _cpf(i):
+    """
+    CPF formatado com dígitos verificadores válidos, único por colaborador
+    (7919 é primo com 10^9, então i -> base não se repete).
+    """
+    base = [int(d) for d in f"{(i * 7919 + 123_456_789) % 10 ** 9:09d}"]
+    for tamanho in (9, 10):
+        soma = sum(d * (tamanho + 1 - k) for k, d in enumerate(base[:tamanho]))
+        base.append((soma * 10 % 11) % 10)
+    digitos = ''.join(map(str, base))
+    return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"
+
+
+def _moeda(valor):
+    inteiro, centavos = divmod(round(valor * 100), 100)
+    return f"R$ {inteiro:,}".replace(',', '.') + f",{centavos:02d}"
+
+
+def _data(rng, ano_min, ano_max, formato='%Y-%m-%d'):
+    return time.strftime(formato, (rng.randint(ano_min, ano_max), rng.randint(1, 12), rng.randint(1, 28),
+                                   0, 0, 0, 0, 1, -1))
+
+
+def gerar_colaborador(i):
+    """
+    Detalhe sintético do i-ésimo colaborador (id a partir de ID_INICIAL), no
+    formato do GET /colaboradores/{id}. Mesmo i, mesmo payload.
+    """
+    rng = random.Random(i)
+    nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)} {i}"
+    ativo = i % 7 != 0
+    cidade, uf = rng.choice(CIDADES)
+    unidade, departamento, cargo = rng.choice(UNIDADES), rng.choice(DEPARTAMENTOS), rng.choice(CARGOS)
+    salario = rng.randint(1_500_00, 25_000_00) / 100
+    beneficios = [{
+        'benefitName': nome_beneficio, 'typeBenefit': tipo,
+        'value': _moeda(rng.randint(50_00, 1_500_00) / 100),
+        'valueDiscount': rng.choice([None, '0,00', _moeda(rng.randint(1_00, 100_00) / 100)]),
+        'dates': rng.choice(['Mensal', 'Diário']), 'discountOption': rng.choice(['Folha', 'Não descontar']),
+        'benefitAppliedAs': rng.choice(['Valor', 'Percentual']),
+    } for nome_beneficio, tipo in rng.sample(BENEFICIOS, rng.randint(0, 3))]
+    return {
+        'id': ID_INICIAL + i, 'name': nome, 'email': f"colaborador{i}@empresa.com.br",
+        'registration': str(i), 'birthDate': _data(rng, 1960, 2004), 'gender': rng.choice(['Masculino', 'Feminino']),
+        'maritalStatus': rng.choice(['Solteiro(a)', 'Casado(a)', 'Divorciado(a)', None]),
+        'salutation': None, 'nationality': 'Brasileira', 'typeOfSpecialNeed': None,
+        'birthplace': cidade, 'fatherName': rng.choice([None, f"PAI {i}"]), 'motherName': f"MÃE {i}",
+        'disabledPerson': i % 31 == 0, 'ethnicity': rng.choice(['Parda', 'Branca', 'Preta', 'Amarela', None]),
+        'dateAdmission': _data(rng, 2010, 2024), 'dateDismissal': None if ativo else _data(rng, 2024, 2024),
+        # a API devolve o salário ora como texto formatado, ora como número
+        'salary': _moeda(salario) if i % 3 else salario,
+        'workShift': rng.choice(['Diurno', 'Noturno', '12x36']), 'typeContract': rng.choice(['CLT', 'Estágio', 'PJ']),
+        'dateContract': _data(rng, 2010, 2024), 'education': rng.choice(['Ensino Médio', 'Superior Completo']),
+        'course': rng.choice([None, 'Administração', 'Sistemas de Informação']),
+        'hierarchicalLevel': rng.choice(['Júnior', 'Pleno', 'Sênior']), 'durationContract': None,
+        'contractExpirationDate': _data(rng, 2025, 2026) if i % 11 == 0 else None,
+        'experiencePeriod': rng.choice([None, 45, 90]),
+        'formDismissal': None if ativo else 'Sem justa causa', 'decisionDismissal': None if ativo else 'Empresa',
+        'terminationAmount': None if ativo else _moeda(rng.randint(1_000_00, 50_000_00) / 100),
+        'totalBenefits': _moeda(rng.randint(0, 3_000_00) / 100), 'active': ativo,
+        'updated_at': f"2024-06-{1 + i % 28:02d}",
+        'senior': None if i % 50 == 0 else {'id': ID_INICIAL + i // 10, 'name': f"LÍDER {i // 10}"},
+        'unity': {'id': unidade[0], 'name': unidade[1]},
+        'position': {'id': cargo[0], 'name': cargo[1]},
+        'departament': {'id': departamento[0], 'name': departamento[1]},
+        'address': {
+            'zipCode': f"{rng.randint(10000, 99999)}-{rng.randint(0, 999):03d}",
+            'streetName': f"Rua {rng.choice(SOBRENOMES).title()}",
+            # número ora texto, ora inteiro, ora ausente
+            'number': rng.choice([str(rng.randint(1, 3000)), rng.randint(1, 3000), None, 'S/N']),
+            'additionalInformation': rng.choice([None, 'Apto 101', 'Bloco B; Casa 2']),
+            'neighborhood': rng.choice(['Centro', 'Umarizal', 'Marco', 'Batista Campos']),
+            'city': {'name': cidade, 'state': {'initials': uf}},
+        },
+        'contact': {'cellPhone': f"(91) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+                    'personalEmail': f"pessoal{i}@email.com", 'emergencyPhoneNumber': None},
+        'documents': {
+            'idNumber': _cpf(i), 'rg': str(rng.randint(1_000_000, 9_999_999)),
+            'dispatchDate': _data(rng, 2000, 2020, '%d/%m/%Y'), 'issuingBody': 'SSP/PA',
+            'voterRegistration': f"{rng.randint(0, 10 ** 12 - 1):012d}", 'electoralZone': str(rng.randint(1, 99)),
+            'electoralSection': str(rng.randint(1, 999)), 'ctpsNum': str(rng.randint(10000, 99999)),
+            'ctpsSerie': f"{rng.randint(1, 999):03d}", 'pis': f"{rng.randint(0, 10 ** 11 - 1):011d}",
+            'bank': rng.choice(['Banco do Brasil', 'Caixa', 'Itaú', 'Nubank']),
+            'agency': f"{rng.randint(1, 9999):04d}", 'checkingsAccount': f"{rng.randint(1, 99999)}-{rng.randint(0, 9)}",
+        },
+        'benefits': beneficios,
+    }
+
+
+def item_listagem(colaborador):
+    """
+    Resumo de um colaborador como vem no GET /colaboradores.
+    """
+    return {campo: colaborador[campo] for campo in ('id', 'name', 'registration', 'active', 'updated_at')}
+
+
+class EstadoServidor:
+    """
+    Configuração e contadores compartilhados entre as threads do servidor.
+    """
+
+    def __init__(self, n_colaboradores, latencia=0.0, limite_rps=0, taxa_erro=0.0, retry_after='1', semente=0):
+        self.n_colaboradores = n_colaboradores
+        self.latencia = latencia
+        self.limite_rps = limite_rps
+        self.taxa_erro = taxa_erro
+        self.retry_after = retry_after
+        self.requisicoes = 0
+        self.respostas_429 = 0
+        self.respostas_erro = 0
+        self._rng = random.Random(semente)
+        self._janela = []
+        self._lock = threading.Lock()
+
+    @property
+    def colaboradores(self):
+        """
+        Todos os detalhes, na ordem da listagem (para conferência nos benchmarks).
+        """
+        return [gerar_colaborador(i) for i in range(self.n_colaboradores)]
+
+    def colaborador(self, colaborador_id):
+        i = colaborador_id - ID_INICIAL
+        return gerar_colaborador(i) if 0 <= i < self.n_colaboradores else None
+
+    def pagina(self, page, page_size):
+        inicio = max(0, (page - 1) * page_size)
+        return [item_listagem(gerar_colaborador(i))
+                for i in range(inicio, min(self.n_colaboradores, inicio + page_size))]
+
+    def aceitar(self):
+        """
+        Janela deslizante de 1 s: False se a requisição estoura o limite de taxa.
+        """
+        with self._lock:
+            self.requisicoes += 1
+            if not self.limite_rps:
+                return True
+            agora = time.monotonic()
+            self._janela = [t for t in self._janela if agora - t < 1.0]
+            if len(self._janela) >= self.limite_rps:
+                self.respostas_429 += 1
+                return False
+            self._janela.append(agora)
+            return True
+
+    def sortear_erro(self):
+        """
+        True para uma fração `taxa_erro` das requisições de detalhe.
+        """
+        if not self.taxa_erro:
+            return False
+        with self._lock:
+            if self._rng.random() < self.taxa_erro:
+                self.respostas_erro += 1
+                return True
+            return False
+
+
+def criar_handler(estado):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+        disable_nagle_algorithm = True  # cabeçalho e corpo saem em writes separados
+
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, status, corpo=None, cabecalhos=None):
+            dados = json.dumps(corpo).encode('utf-8') if corpo is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(dados)))
+            for nome, valor in (cabecalhos or {}).items():
+                self.send_header(nome, valor)
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            caminho = url.path.rstrip('/')
+            if not estado.aceitar():
+                cabecalhos = {'Retry-After': estado.retry_after} if estado.retry_after else None
+                return self._responder(429, {'error': 'rate limit'}, cabecalhos)
+            if estado.latencia:
+                time.sleep(estado.latencia)
+            if caminho.endswith('/colaboradores'):
+                params = parse_qs(url.query)
+                page = int(params.get('page', ['1'])[0])
+                page_size = int(params.get('page_size', ['100'])[0])
+                return self._responder(200, estado.pagina(page, page_size))
+            m = RE_DETALHE.search(caminho)
+            if m:
+                if estado.sortear_erro():
+                    return self._responder(500, {'error': 'internal server error'})
+                colaborador = estado.colaborador(int(m.group(1)))
+                if colaborador is not None:
+                    return self._responder(200, colaborador)
+            return self._responder(404, {'error': 'not found'})
+
+    return Handler
+
+
+def iniciar_servidor(n_colaboradores, latencia=0.0, limite_rps=0, porta=0, taxa_erro=0.0, retry_after='1'):
+    """
+    Sobe o servidor numa thread daemon. Devolve (servidor, estado, base_url).
+    """
+    estado = EstadoServidor(n_colaboradores, latencia, limite_rps, taxa_erro, retry_after)
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), criar_handler(estado))
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, estado, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--colaboradores', type=int, default=500)
+    parser.add_argument('--latencia', type=float, default=0.05)
+    parser.add_argument('--limite-rps', type=int, default=0)
+    parser.add_argument('--taxa-erro', type=float, default=0.0,
+                        help="Fração dos detalhes respondidos com 500 (0 a 1).")
+    parser.add_argument('--retry-after', default='1',
+                        help="Valor do Retry-After nas respostas 429 ('' omite o cabeçalho).")
+    parser.add_argument('--porta', type=int, default=8765, help="0 escolhe uma porta livre.")
+    args = parser.parse_args()
+    servidor, _, base_url = iniciar_servidor(args.colaboradores, args.latencia, args.limite_rps, args.porta,
+                                             args.taxa_erro, args.retry_after)
+    print(f"API Solides falsa em {base_url} (Ctrl+C para sair)", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
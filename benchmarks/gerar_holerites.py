@@ -0,0 +1,227 @@
+# benchmarks/gerar_holerites.py
+"""
+Gerador de PDFs sintéticos de folha (holerite mensal, recibo de férias e 13º)
+no layout que o processar_pdfs espera, para medir e conferir a extração sem
+usar holerites reais.
+
+Cada documento tem o cabeçalho com Cálculo/Competência (ou Período de Gozo),
+blocos de funcionário (Empr.:/Contr.: no holerite e no 13º, Matrícula: nas
+férias), cabeçalhos Departamento:, tabela de rubricas com códigos do
+MAPEAMENTO_CODIGOS (duas por linha no holerite) e o rodapé de totais. Os
+totais batem com as rubricas e tudo é determinístico a partir da semente.
+Um funcionário nunca é quebrado entre páginas. O PDF é escrito à mão (fonte
+Courier padrão, WinAnsiEncoding), sem dependência nova.
+
+Uso isolado:
+    python benchmarks/gerar_holerites.py pasta_saida [--funcionarios 100] [--competencia 10/2023] [--semente 42]
+"""
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.constants import MAPEAMENTO_CODIGOS
+
+LINHAS_POR_PAGINA = 80
+
+NOMES = ['ANA', 'BRUNO', 'CARLA', 'DIEGO', 'ELISA', 'FÁBIO', 'GISELE', 'HUGO', 'ÍRIS', 'JOÃO', 'LUÍSA', 'MÁRCIO']
+SOBRENOMES = ['SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'PEREIRA', 'LIMA', 'CARVALHO', 'GONÇALVES', 'CONCEIÇÃO']
+DEPARTAMENTOS = ['1 - TI', '2 - FINANCEIRO', '3 - RECURSOS HUMANOS', '4 - OPERAÇÕES', '5 - COMERCIAL']
+CARGOS = [(12, 'ANALISTA DE SISTEMAS'), (15, 'ASSISTENTE ADMINISTRATIVO'), (21, 'GERENTE DE PROJETOS'),
+          (33, 'TÉCNICO DE SUPORTE'), (40, 'ESTAGIÁRIO')]
+SITUACOES = ['Trabalhando'] * 12 + ['Férias', 'Afastado', 'Demitido']
+
+# Rubricas por documento: (código, referência) do salário base e das eventuais
+PROVENTO_BASE = {'holerite': '8781', 'ferias': '805', 'decimo_terceiro': '12'}
+PROVENTOS_EXTRAS = {'holerite': ['150', '340', '461', '995', '258'],
+                    'ferias': ['931', '808', '932'],
+                    'decimo_terceiro': ['801', '802']}
+DESCONTOS = {'holerite': ['998', '999', '48', '325', '8111', '362'],
+             'ferias': ['812', '942'],
+             'decimo_terceiro': ['825', '804']}
+
+
+def _descricao(codigo):
+    """
+    Descrição impressa da rubrica, a partir do nome no MAPEAMENTO_CODIGOS.
+    """
+    return MAPEAMENTO_CODIGOS[codigo].split('_', 2)[2].replace('_', ' ').upper()
+
+
+def _moeda(centavos):
+    inteiro, resto = divmod(centavos, 100)
+    return f"{inteiro:,}".replace(',', '.') + f",{resto:02d}"
+
+
+def _cpf(i):
+    digitos = f"{(i * 7919 + 123_456_789) % 10 ** 9:09d}{i % 100:02d}"
+    return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"
+
+
+def _data(rng, ano_min, ano_max):
+    return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(ano_min, ano_max)}"
+
+
+def _rubricas(rng, layout, salario):
+    """
+    Lista de (código, referência, centavos, 'P'/'D') de um funcionário.
+    """
+    rubricas = [(PROVENTO_BASE[layout], '30,00', salario, 'P')]
+    for codigo in rng.sample(PROVENTOS_EXTRAS[layout], rng.randint(0, 2)):
+        rubricas.append((codigo, f"{rng.randint(1, 40)},00", rng.randint(50_00, salario // 3 + 50_00), 'P'))
+    for codigo in rng.sample(DESCONTOS[layout], rng.randint(1, len(DESCONTOS[layout]))):
+        rubricas.append((codigo, f"{rng.choice([7.5, 9, 12, 14, 27.5])}%".replace('.', ','),
+                         rng.randint(10_00, salario // 6 + 10_00), 'D'))
+    return rubricas
+
+
+def _bloco_holerite(i, rng, layout):
+    """
+    Linhas de um funcionário no espelho do holerite/13º e os totais em centavos.
+    """
+    situacao = rng.choice(SITUACOES)
+    cargo = rng.choice(CARGOS)
+    salario = rng.randint(1_500_00, 25_000_00)
+    nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+    linhas = [f"{rng.choice(['Empr.', 'Empr.', 'Empr.', 'Contr.'])}: {1000 + i} {nome} Situação: {situacao} "
+              f"CPF: {_cpf(i)} Adm: {_data(rng, 2010, 2023)}"]
+    if situacao == 'Demitido':
+        linhas.append(f"DEMITIDO EM {_data(rng, 2023, 2023)} - {rng.choice(['PEDIDO DE DEMISSÃO', 'SEM JUSTA CAUSA'])}")
+    linhas.append(f"Cargo: {cargo[0]} {cargo[1]} Salário: {_moeda(salario)} C.B.O: 212405")
+    linhas.append("Código Descrição Referência Valor Código Descrição Referência Valor")
+    rubricas = _rubricas(rng, layout, salario)
+    textos = [f"{codigo} {_descricao(codigo)} {ref} {_moeda(valor)} {tipo}" for codigo, ref, valor, tipo in rubricas]
+    linhas.extend("   ".join(textos[j:j + 2]) for j in range(0, len(textos), 2))
+    proventos = sum(v for _, _, v, t in rubricas if t == 'P')
+    descontos = sum(v for _, _, v, t in rubricas if t == 'D')
+    linhas.append(f"ND: {rng.randint(0, 3)}")
+    linhas.append(f"Proventos: {_moeda(proventos)} Descontos: {_moeda(descontos)} Líquido: {_moeda(proventos - descontos)}")
+    linhas.append(f"Base INSS: {_moeda(proventos)} Base FGTS: {_moeda(proventos)} "
+                  f"Valor FGTS: {_moeda(proventos * 8 // 100)} Base IRRF: {_moeda(proventos * 85 // 100)}")
+    return linhas, rubricas, proventos - descontos
+
+
+def _bloco_ferias(i, rng):
+    """
+    Linhas de um funcionário no recibo de férias e os totais em centavos.
+    """
+    cargo = rng.choice(CARGOS)
+    salario = rng.randint(1_500_00, 25_000_00)
+    nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+    linhas = [f"Matrícula: {1000 + i} Nome do Funcionário {nome} PIS/PASEP: {rng.randint(10 ** 10, 10 ** 11 - 1)}",
+              f"CPF: {_cpf(i)} Adm: {_data(rng, 2010, 2022)}",
+              f"Cargo: {cargo[1]}",
+              "Cód Descrição Ref Valor"]
+    rubricas = _rubricas(rng, 'ferias', salario)
+    linhas.extend(f"{codigo} {_descricao(codigo)} {ref} {_moeda(valor)} {tipo}" for codigo, ref, valor, tipo in rubricas)
+    proventos = sum(v for _, _, v, t in rubricas if t == 'P')
+    descontos = sum(v for _, _, v, t in rubricas if t == 'D')
+    linhas.append(f"Total de Proventos {_moeda(proventos)}")
+    linhas.append(f"Total de Descontos {_moeda(descontos)}")
+    linhas.append(f"Líquido de Férias {_moeda(proventos - descontos)}")
+    linhas.append(f"Base INSS Férias {_moeda(proventos)} Base FGTS Férias {_moeda(proventos)}")
+    linhas.append(f"Valor FGTS Férias {_moeda(proventos * 8 // 100)} Base IRRF Férias {_moeda(proventos * 85 // 100)}")
+    return linhas, rubricas, proventos - descontos
+
+
+def gerar_documento(layout, n_funcionarios, competencia='10/2023', semente=42):
+    """
+    Páginas (listas de linhas) de um documento com `n_funcionarios` e o
+    gabarito do que a extração deve achar: funcionarios, rubricas e
+    liquido_centavos (soma do líquido de todos).
+    `layout`: 'holerite', 'ferias' ou 'decimo_terceiro'.
+    """
+    rng = random.Random(f"{layout}-{semente}")
+    mes, ano = competencia.split('/')
+    if layout == 'ferias':
+        cabecalho = ["ARQ CONSULTORIA LTDA   RECIBO DE FÉRIAS", "Cálculo: Férias",
+                     f"Período de Gozo: 01/{mes}/{ano} a 30/{mes}/{ano}"]
+    else:
+        calculo = "13º Salário Integral" if layout == 'decimo_terceiro' else "Folha Mensal"
+        cabecalho = [f"ARQ CONSULTORIA LTDA   Cálculo: {calculo}", f"Competência: {competencia}"]
+
+    paginas, pagina = [], list(cabecalho)
+    gabarito = {'funcionarios': n_funcionarios, 'rubricas': 0, 'liquido_centavos': 0}
+    for i in range(n_funcionarios):
+        linhas = []
+        if layout != 'ferias' and i % 12 == 0:
+            linhas.append(f"Departamento: {DEPARTAMENTOS[(i // 12) % len(DEPARTAMENTOS)]}")
+        bloco, rubricas, liquido = _bloco_ferias(i, rng) if layout == 'ferias' else _bloco_holerite(i, rng, layout)
+        linhas.extend(bloco)
+        linhas.append("")
+        gabarito['rubricas'] += len(rubricas)
+        gabarito['liquido_centavos'] += liquido
+        if len(pagina) + len(linhas) > LINHAS_POR_PAGINA and len(pagina) > len(cabecalho):
+            paginas.append(pagina)
+            pagina = list(cabecalho)
+        pagina.extend(linhas)
+    paginas.append(pagina)
+    return paginas, gabarito
+
+
+def _escapar(texto):
+    return texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def escrever_pdf(caminho, paginas, tamanho_fonte=7):
+    """
+    Grava um PDF mínimo (uma linha de texto por Tj, Courier, A4) com as páginas dadas.
+    """
+    objetos = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for linhas in paginas:
+        conteudo = "\n".join([f"BT /F1 {tamanho_fonte} Tf {tamanho_fonte + 2} TL 20 820 Td",
+                              *(f"({_escapar(linha)}) Tj T*" for linha in linhas), "ET"]).encode('cp1252')
+        n_pagina = len(objetos) + 1
+        kids.append(f"{n_pagina} 0 R")
+        objetos.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {n_pagina + 1} 0 R >>".encode())
+        objetos.append(f"<< /Length {len(conteudo)} >>\nstream\n".encode() + conteudo + b"\nendstream")
+    objetos[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    saida = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for numero, objeto in enumerate(objetos, start=1):
+        offsets.append(len(saida))
+        saida += f"{numero} 0 obj\n".encode() + objeto + b"\nendobj\n"
+    inicio_xref = len(saida)
+    saida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    saida += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    saida += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode()
+    with open(caminho, 'wb') as f:
+        f.write(saida)
+
+
+def gerar_pasta(pasta, n_funcionarios, competencia='10/2023', semente=42):
+    """
+    Grava holerite, férias e 13º de `n_funcionarios` cada em `pasta`.
+    Devolve {nome_arquivo: {'paginas': n, **gabarito}}.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    mes, ano = competencia.split('/')
+    resumo = {}
+    for layout, prefixo in (('holerite', 'holerite'), ('ferias', 'ferias'), ('decimo_terceiro', '13')):
+        paginas, gabarito = gerar_documento(layout, n_funcionarios, competencia, semente)
+        nome = f"{prefixo}_{mes}_{ano}.pdf"
+        escrever_pdf(os.path.join(pasta, nome), paginas)
+        resumo[nome] = {'paginas': len(paginas), **gabarito}
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pasta')
+    parser.add_argument('--funcionarios', type=int, default=100)
+    parser.add_argument('--competencia', default='10/2023')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+    for nome, info in gerar_pasta(args.pasta, args.funcionarios, args.competencia, args.semente).items():
+        print(f"[OK] {nome}: {info['paginas']} página(s), {info['funcionarios']} funcionário(s), "
+              f"{info['rubricas']} rubrica(s).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/paridade_backends.py
+"""
+Paridade e desempenho dos backends de extração de texto (src/backends.py).
+
+Roda o processar_pdfs com o backend de referência (pdfplumber) e com cada
+backend alternativo sobre os PDFs da pasta, sem cache e em modo serial, e
+compara as linhas consolidadas e de rubricas. Um backend só deve ser usado
+em produção (PDF_BACKEND / --pdf-backend) se der IGUAL nos nossos layouts.
+
+Uso:
+    python benchmarks/paridade_backends.py [pasta_pdfs] [--backends pdfium pdfminer]
+
+Sai com código 1 se algum backend divergir da referência.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backends import BACKENDS, BACKEND_PADRAO
+from src.extract import processar_pdfs
+from tests.referencia import diferencas
+
+
+def rodar(pasta, backend):
+    t0 = time.perf_counter()
+    df_consol, df_detalhe = processar_pdfs(pasta, workers=1, backend=backend)
+    return time.perf_counter() - t0, df_consol, df_detalhe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pasta', nargs='?',
+                        default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'input'))
+    parser.add_argument('--backends', nargs='+', choices=list(BACKENDS),
+                        default=[b for b in BACKENDS if b != BACKEND_PADRAO])
+    args = parser.parse_args()
+
+    t_ref, ref_consol, ref_detalhe = rodar(args.pasta, BACKEND_PADRAO)
+    if ref_consol.empty:
+        raise SystemExit(f"Nenhuma linha extraída de {args.pasta} com {BACKEND_PADRAO}.")
+
+    linhas = [(BACKEND_PADRAO, t_ref, len(ref_consol), len(ref_detalhe), 'referência')]
+    divergentes = []
+    for backend in args.backends:
+        t, consol, detalhe = rodar(args.pasta, backend)
+        diff = diferencas(ref_consol, consol) or diferencas(ref_detalhe, detalhe)
+        linhas.append((backend, t, len(consol), len(detalhe), 'IGUAL' if diff is None else 'DIFERENTE'))
+        if diff is not None:
+            divergentes.append((backend, diff))
+
+    print(f"\n{'backend':>12} {'tempo (s)':>10} {'ganho':>7} {'consol':>7} {'rubricas':>9}  paridade")
+    for backend, t, n_consol, n_detalhe, status in linhas:
+        print(f"{backend:>12} {t:>10.3f} {t_ref / t:>6.1f}x {n_consol:>7} {n_detalhe:>9}  {status}")
+
+    for backend, diff in divergentes:
+        print(f"\n[AVISO] {backend} diverge de {BACKEND_PADRAO}:\n{diff}")
+    sys.exit(1 if divergentes else 0)
+
+
+if __name__ == '__main__':
+    main()
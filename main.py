@@ -1,95 +1,408 @@
 # main.py
 import os
 import sys
+import argparse
+import pandas as pd
 from dotenv import load_dotenv
 from src.database import get_db_engine
-from src.extract import processar_pdfs, extrair_api_solides
+from src.extract import processar_pdfs, processar_pdfs_em_lotes, iterar_api_solides, replay_api_solides
+from src.manifest import carregar_manifesto, salvar_manifesto
+from src.cache import limpar_cache
+from src.backends import BACKENDS, BACKEND_PADRAO
+from src.solides import BASE_URL_PADRAO, WORKERS_PADRAO, RPS_PADRAO
+from src.landing import novo_run_id, resolver_snapshot, aplicar_retencao
+from src.metrics import STATUS_FALHA, Medidor, ativar, medir, medir_iteracao
+from src.dag import STATUS_ERRO, EtapaPulada, executar_dag, imprimir_situacao
+from src.checkpoint import (iniciar_checkpoint, abrir_checkpoint, registrar_etapa, resultados_concluidos,
+                            remover_checkpoint, aplicar_retencao_checkpoints)
+from src.bulk import METODOS_CARGA, METODO_CARGA_PADRAO, validar_metodo_carga
+from src.constants import COLUNAS_MONETARIAS_TOTAIS, COLUNAS_MONETARIAS_RUBRICAS
 from src.transform import (
+    centavos_para_texto,
     transformar_dados_pdf, 
-    transformar_dados_api, 
-    transformar_beneficios_api
+    transformar_lotes_api
 )
 from src.load import (
     garantir_schema_banco, 
     carregar_dim_calendario,
+    HORIZONTE_CALENDARIO_MESES,
+    ANO_MINIMO_CALENDARIO,
     carregar_dados_api,
+    ler_estado_sync_api,
+    identidade_destino,
     carregar_fatos_folha,
     processar_status_transferidos
 )
 
-def run_pipeline():
+def _mes_competencia(serie):
+    """
+    Chave 'AAAA-MM' da competência ('' quando ausente), a mesma granularidade da troca de meses no banco.
+    """
+    return pd.to_datetime(serie, errors='coerce').dt.strftime('%Y-%m').fillna('')
+
+
+def _gravar_csv_por_competencia(df, caminho, comps_exportadas, recriar, opcoes):
+    """
+    Grava um CSV de auditoria trocando competências inteiras, como a carga do banco:
+    as linhas existentes dos meses presentes em `df` são substituídas e as dos demais
+    meses são preservadas. Meses já exportados nesta execução (streaming) só recebem
+    as linhas novas.
+    """
+    nome = os.path.basename(caminho)
+    primeira_escrita = not any(arquivo == nome for arquivo, _ in comps_exportadas)
+    meses = set(_mes_competencia(df['competencia'])) if 'competencia' in df.columns else {''}
+    trocar = {m for m in meses if (nome, m) not in comps_exportadas}
+    comps_exportadas.update((nome, m) for m in meses)
+    if primeira_escrita:
+        # Marca o arquivo como escrito nesta execução mesmo que o lote não tenha competência
+        comps_exportadas.add((nome, None))
+
+    if not os.path.exists(caminho) or (recriar and primeira_escrita):
+        df.to_csv(caminho, mode='w', header=True, **opcoes)
+        return
+    if not trocar:
+        df.to_csv(caminho, mode='a', header=False, **opcoes)
+        return
+
+    existente = pd.read_csv(caminho, sep=opcoes['sep'], encoding=opcoes['encoding'],
+                            dtype=str, keep_default_na=False)
+    if list(existente.columns) != list(df.columns):
+        print(f"[AVISO] Layout de {nome} mudou; o CSV será recriado só com os dados desta execução.")
+        df.to_csv(caminho, mode='w', header=True, **opcoes)
+        return
+    manter = existente[~_mes_competencia(existente['competencia']).isin(trocar)]
+    manter.to_csv(caminho, mode='w', header=True, **opcoes)
+    df.to_csv(caminho, mode='a', header=False, **opcoes)
+
+
+def exportar_csv_folha(df_consol, df_detalhe, path_output, comps_exportadas=None, recriar=False):
+    """
+    Exporta os CSVs de auditoria da folha. As competências presentes nos dados
+    substituem as do CSV existente e as demais são preservadas, de modo que uma
+    execução parcial (manifesto) não apaga os meses que não foram reprocessados.
+    No modo streaming, `comps_exportadas` é um set compartilhado entre os lotes
+    (como em carregar_fatos_folha). recriar=True (full refresh) descarta o CSV anterior.
+    Os valores monetários (centavos) voltam para reais só aqui.
+    """
+    if comps_exportadas is None:
+        comps_exportadas = set()
+    df_consol = df_consol.assign(**{c: centavos_para_texto(df_consol[c])
+                                    for c in COLUNAS_MONETARIAS_TOTAIS if c in df_consol.columns})
+    df_detalhe = df_detalhe.assign(**{c: centavos_para_texto(df_detalhe[c])
+                                      for c in COLUNAS_MONETARIAS_RUBRICAS if c in df_detalhe.columns})
+    opcoes = dict(index=False, sep=';', decimal=',', encoding='utf-8-sig')
+    _gravar_csv_por_competencia(df_consol, os.path.join(path_output, 'FOPAG_Consolidada_Tratada.csv'),
+                                comps_exportadas, recriar, opcoes)
+    if not df_detalhe.empty:
+        _gravar_csv_por_competencia(df_detalhe, os.path.join(path_output, 'FOPAG_Detalhada_Tratada.csv'),
+                                    comps_exportadas, recriar, opcoes)
+
+
+def run_pipeline(full_refresh=False, stream=None, pdf_backend=None, load_method=None, api_full_resync=False,
+                 replay_api=None, metrics_textfile=None, resume=None):
     print("\n=======================================================")
     print("   INICIANDO PIPELINE DE DADOS - ARQ PEOPLE INTEL")
     print("=======================================================\n")
 
     load_dotenv()
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    PATH_INPUT = os.path.join(BASE_DIR, 'input')
     PATH_OUTPUT = os.path.join(BASE_DIR, 'output')
+    PATH_CHECKPOINTS = os.path.join(PATH_OUTPUT, 'checkpoints')
 
     if not os.path.exists(PATH_OUTPUT):
         os.makedirs(PATH_OUTPUT)
 
+    # Métricas da execução (tempo, CPU, linhas e pico de memória por etapa):
+    # relatório JSON em output/relatorios e, opcionalmente, textfile do Prometheus
+    medidor = Medidor(novo_run_id())
+    metrics_textfile = metrics_textfile or os.getenv("METRICS_TEXTFILE")
+
+    # Checkpoint das etapas: o --resume reusa as opções da execução original e
+    # o resultado das etapas que ela concluiu, e recomeça da primeira incompleta
+    opcoes = dict(full_refresh=full_refresh, stream=stream, pdf_backend=pdf_backend, load_method=load_method,
+                  api_full_resync=api_full_resync, replay_api=replay_api)
+    if resume:
+        try:
+            dir_checkpoint, estado = abrir_checkpoint(PATH_CHECKPOINTS, resume)
+        except FileNotFoundError as e:
+            print(f"[ERRO FATAL] {e}")
+            sys.exit(1)
+        opcoes = estado['opcoes']
+        concluidas = resultados_concluidos(dir_checkpoint, estado)
+        print(f"Retomando a execução {estado['run_id']} (opções originais: "
+              f"{', '.join(f'{k}={v}' for k, v in opcoes.items() if v) or 'padrão'}). "
+              f"Etapas concluídas: {', '.join(concluidas) or 'nenhuma'}.")
+    else:
+        dir_checkpoint = iniciar_checkpoint(PATH_CHECKPOINTS, medidor.run_id, opcoes)
+        concluidas = {}
+
+    try:
+        with ativar(medidor):
+            situacao = _executar_etapas(BASE_DIR, medidor, dir_checkpoint, concluidas, **opcoes)
+    finally:
+        print("\n--- Métricas da Execução ---")
+        medidor.imprimir_resumo()
+        caminho = medidor.gravar_json(os.path.join(PATH_OUTPUT, 'relatorios', f"execucao_{medidor.run_id}.json"))
+        print(f"[OK] Relatório da execução: {caminho}")
+        if metrics_textfile:
+            try:
+                medidor.gravar_prometheus(metrics_textfile)
+                print(f"[OK] Métricas Prometheus: {metrics_textfile}")
+            except OSError as e:
+                print(f"[AVISO] Não foi possível gravar as métricas Prometheus: {e}")
+
+    # Nenhuma etapa falha em silêncio: erro ou cancelamento encerram com código 1
+    falhas = [nome for nome, s in situacao.items() if s['status'] in STATUS_FALHA]
+    print("\n=======================================================")
+    print("   PIPELINE FINALIZADO" + (" COM FALHAS: " + ", ".join(falhas) if falhas else ""))
+    print("=======================================================\n")
+    # CHECKPOINT_KEEP: checkpoints de outras execuções que falharam mantidos para o --resume
+    aplicar_retencao_checkpoints(PATH_CHECKPOINTS, int(os.getenv("CHECKPOINT_KEEP") or 5),
+                                 atual=os.path.basename(dir_checkpoint))
+    if falhas:
+        print(f"[AVISO] Para recomeçar da primeira etapa incompleta: "
+              f"python main.py --resume {os.path.basename(dir_checkpoint)}")
+        sys.exit(1)
+    remover_checkpoint(dir_checkpoint)
+
+
+def _descartar_busca_sem_snapshot(concluidas):
+    """
+    O snapshot de uma busca concluída pode ter saído pela retenção: sem ele, a
+    busca da API sai das etapas reaproveitadas e roda de novo.
+    """
+    busca_anterior = concluidas.get('api_busca')
+    if busca_anterior and not os.path.isdir(busca_anterior['dir_snapshot']):
+        print(f"[AVISO] Snapshot {busca_anterior['dir_snapshot']} não existe mais; a busca da API roda de novo.")
+        return {nome: r for nome, r in concluidas.items() if nome != 'api_busca'}
+    return concluidas
+
+
+def _executar_etapas(BASE_DIR, medidor, dir_checkpoint, concluidas, full_refresh=False, stream=None,
+                     pdf_backend=None, load_method=None, api_full_resync=False, replay_api=None):
+    """
+    Monta o DAG de etapas da execução (src/dag.py) e roda. A extração dos PDFs
+    e a busca da API não dependem uma da outra e rodam ao mesmo tempo; as
+    cargas que tocam dim_colaboradores_base (folha primeiro, depois API) e o
+    pós-processamento esperam o que precisam; o calendário roda depois das
+    cargas, para cobrir o que elas trouxeram. As etapas em `concluidas` (de
+    uma execução retomada) não rodam de novo; o status e o resultado de cada
+    etapa vão para o checkpoint. Devolve a situação de cada etapa.
+    """
+    PATH_INPUT = os.path.join(BASE_DIR, 'input')
+    PATH_OUTPUT = os.path.join(BASE_DIR, 'output')
+    PATH_MANIFESTO = os.path.join(PATH_OUTPUT, 'manifesto_pdfs.json')
+    PATH_CACHE_TEXTO = os.path.join(PATH_OUTPUT, 'cache_texto')
+    PATH_LANDING_API = os.path.join(PATH_OUTPUT, 'landing_api')
+
     try:
-        engine, schema = get_db_engine()
-        garantir_schema_banco(engine, schema)
+        with medir('conexao'):
+            engine, schema = get_db_engine()
+            garantir_schema_banco(engine, schema)
         print(f"[OK] Conexão com banco estabelecida. Schema: {schema}")
     except Exception as e:
+        # Sem banco nenhuma etapa roda; a execução termina como falha, com o checkpoint e a dica do --resume
         print(f"[ERRO FATAL] Não foi possível conectar ao banco: {e}")
-        sys.exit(1)
+        return {'conexao': {'status': STATUS_ERRO, 'motivo': f"{type(e).__name__}: {e}", 'segundos': None}}
+
+    # Carga dos stagings: COPY (padrão) ou to_sql
+    metodo_carga = validar_metodo_carga(load_method or os.getenv("LOAD_METHOD") or METODO_CARGA_PADRAO)
+    print(f"Método de carga dos stagings: {metodo_carga}")
+
+    # 1. DIMENSÃO CALENDÁRIO (depois das cargas: o intervalo sai das competências e admissões carregadas)
+    def etapa_calendario(resultados):
+        horizonte = os.getenv("CALENDARIO_HORIZONTE_MESES")
+        ano_minimo = os.getenv("CALENDARIO_ANO_MINIMO")
+        carregar_dim_calendario(engine, schema, int(horizonte) if horizonte else HORIZONTE_CALENDARIO_MESES,
+                                int(ano_minimo) if ano_minimo else ANO_MINIMO_CALENDARIO)
+
+    # 2. PIPELINE FOLHA DE PAGAMENTO (PDFs)
+    def opcoes_pdf():
+        if not os.path.exists(PATH_INPUT):
+            raise EtapaPulada(f"pasta de input não encontrada: {PATH_INPUT}")
+        # PDF_WORKERS=1 força o modo serial; vazio/0 usa todos os núcleos
+        workers_pdf = int(os.getenv("PDF_WORKERS") or 0) or None
+        # Manifesto: pula PDFs já carregados (mesmo hash e mesma versão do parser)
+        # O manifesto vale para um destino (servidor/banco/schema): outro destino reprocessa tudo
+        destino = identidade_destino(engine, schema)
+        if full_refresh:
+            manifesto = {'arquivos': {}, 'destino': destino}
+        else:
+            manifesto = carregar_manifesto(PATH_MANIFESTO, destino)
+        # Cache do texto extraído por página (limite em MB, LRU)
+        cache_max_bytes = int(os.getenv("PDF_TEXT_CACHE_MAX_MB") or 512) * 1024 ** 2
+        # Biblioteca de extração de texto: pdfplumber (padrão), pdfminer ou pdfium
+        backend_pdf = pdf_backend or os.getenv("PDF_BACKEND") or BACKEND_PADRAO
+        print(f"Backend de extração de texto: {backend_pdf}")
+        return dict(workers=workers_pdf, manifesto=manifesto, dir_cache=PATH_CACHE_TEXTO,
+                    cache_max_bytes=cache_max_bytes, backend=backend_pdf)
+
+    def etapa_pdf_extracao(resultados):
+        opcoes = opcoes_pdf()
+        with medir('extracao') as m:
+            df_raw_consol, df_raw_detalhe = processar_pdfs(PATH_INPUT, **opcoes)
+            m['linhas_saida'] = len(df_raw_consol)
+        if df_raw_consol.empty:
+            print("[AVISO] Nenhum dado novo extraído dos PDFs.")
+            return {'manifesto': opcoes['manifesto'], 'consolidado': None, 'detalhado': None}
 
-    # 1. DIMENSÃO CALENDÁRIO (Independente)
-    print("\n--- [ETAPA 1] Dimensão Calendário ---")
-    carregar_dim_calendario(engine, schema)
-
-    # 2. PIPELINE FOLHA DE PAGAMENTO (PDFs) - PRIMEIRO A RODAR
-    if os.path.exists(PATH_INPUT):
-        print(f"\n--- [ETAPA 2] Pipeline Folha de Pagamento (PDFs) ---")
-        
-        df_raw_consol, df_raw_detalhe = processar_pdfs(PATH_INPUT)
-        
-        if not df_raw_consol.empty:
-            print("Transformando dados da Folha...")
+        print("Transformando dados da Folha...")
+        with medir('transformacao', linhas_entrada=len(df_raw_consol) + len(df_raw_detalhe)):
             df_final_consol, df_final_detalhe = transformar_dados_pdf(df_raw_consol, df_raw_detalhe)
-            
-            # Exportação CSV
-            path_csv_consol = os.path.join(PATH_OUTPUT, 'FOPAG_Consolidada_Tratada.csv')
-            path_csv_detalhe = os.path.join(PATH_OUTPUT, 'FOPAG_Detalhada_Tratada.csv')
-            df_final_consol.to_csv(path_csv_consol, index=False, sep=';', decimal=',', encoding='utf-8-sig')
-            if not df_final_detalhe.empty:
-                df_final_detalhe.to_csv(path_csv_detalhe, index=False, sep=';', decimal=',', encoding='utf-8-sig')
-            print(f"[OK] CSVs gerados em output.")
-
-            # Load Banco
-            print("Carregando Fatos de Folha no Banco...")
-            carregar_fatos_folha(df_final_consol, df_final_detalhe, engine, schema)
+
+        # Exportação CSV
+        with medir('csv', linhas_entrada=len(df_final_consol)):
+            exportar_csv_folha(df_final_consol, df_final_detalhe, PATH_OUTPUT, recriar=full_refresh)
+        print(f"[OK] CSVs gerados em output.")
+        return {'manifesto': opcoes['manifesto'], 'consolidado': df_final_consol, 'detalhado': df_final_detalhe}
+
+    def etapa_pdf_carga(resultados):
+        if stream:
+            # Streaming: extrai -> transforma -> carrega um lote por vez (memória limitada a um lote)
+            opcoes = opcoes_pdf()
+            manifesto = opcoes['manifesto']
+            comps_carregadas = set()
+            comps_exportadas = set()
+            n_lotes = 0
+            lotes_pdf = medir_iteracao(processar_pdfs_em_lotes(PATH_INPUT, agrupar_por=stream, **opcoes),
+                                       'extracao', contar=lambda lote: len(lote[0]))
+            for df_raw_consol, df_raw_detalhe in lotes_pdf:
+                with medir('transformacao', linhas_entrada=len(df_raw_consol) + len(df_raw_detalhe)):
+                    df_final_consol, df_final_detalhe = transformar_dados_pdf(df_raw_consol, df_raw_detalhe)
+                with medir('csv', linhas_entrada=len(df_final_consol)):
+                    exportar_csv_folha(df_final_consol, df_final_detalhe, PATH_OUTPUT,
+                                       comps_exportadas=comps_exportadas, recriar=full_refresh)
+                carregar_fatos_folha(df_final_consol, df_final_detalhe, engine, schema,
+                                     comps_carregadas=comps_carregadas, metodo_carga=metodo_carga)
+                n_lotes += 1
+            if n_lotes:
+                print(f"[OK] {n_lotes} lote(s) carregado(s) em modo streaming.")
+            else:
+                print("[AVISO] Nenhum dado novo extraído dos PDFs.")
         else:
-            print("[AVISO] Nenhum dado extraído dos PDFs.")
-    else:
-        print(f"\n[ERRO] Pasta de input não encontrada: {PATH_INPUT}")
+            extraido = resultados['pdf_extracao']
+            if extraido is None:
+                raise EtapaPulada("extração dos PDFs pulada")
+            manifesto = extraido['manifesto']
+            if extraido['consolidado'] is not None:
+                print("Carregando Fatos de Folha no Banco...")
+                carregar_fatos_folha(extraido['consolidado'], extraido['detalhado'], engine, schema,
+                                     metodo_carga=metodo_carga)
 
-    # 3. PIPELINE API SOLIDES (DIMENSÕES RICAS) - SEGUNDO A RODAR
+        # Só grava o manifesto depois da carga, para reprocessar se ela falhar
+        salvar_manifesto(manifesto, PATH_MANIFESTO)
+
+    # 3. PIPELINE API SOLIDES (DIMENSÕES RICAS)
+    # A busca grava as respostas na zona de pouso enquanto os PDFs são extraídos;
+    # a carga relê o snapshot página a página (memória limitada a um lote) depois
+    # da carga da folha. API_LANDING_KEEP=0: o snapshot é apagado no fim da execução.
     token_api = os.getenv("SOLIDES_API_TOKEN")
-    if token_api:
-        print("\n--- [ETAPA 3] Pipeline API Solides ---")
-        dados_brutos_api = extrair_api_solides(token_api)
-        
-        print("Transformando dados da API...")
-        df_colaboradores = transformar_dados_api(dados_brutos_api)
-        df_beneficios = transformar_beneficios_api(dados_brutos_api)
-        
-        print("Carregando dados da API no Banco...")
-        carregar_dados_api(df_colaboradores, df_beneficios, engine, schema)
-    else:
-        print("\n[AVISO] Token da API não encontrado. Pulando etapa API.")
+    snapshots_mantidos = int(os.getenv("API_LANDING_KEEP") or 10)
+
+    def etapa_api_busca(resultados):
+        if replay_api:
+            print("Pipeline API Solides: replay de snapshot, sem rede")
+            return {'dir_snapshot': resolver_snapshot(PATH_LANDING_API, replay_api)}
+        if not token_api:
+            raise EtapaPulada("token da API não encontrado (SOLIDES_API_TOKEN)")
+        # Incremental: só busca o detalhe de quem mudou desde a última marca d'água (updated_at)
+        marca, ids_locais = (None, set()) if api_full_resync else ler_estado_sync_api(engine, schema)
+        print("Sincronização API: " + (f"incremental (marca {marca})" if marca else "completa"))
+        # SOLIDES_WORKERS=1 busca os detalhes em série; SOLIDES_RPS=0 desliga o limite de taxa
+        paginas_api = iterar_api_solides(
+            token_api, marca=marca, ids_locais=ids_locais,
+            base_url=os.getenv("SOLIDES_API_URL") or BASE_URL_PADRAO,
+            workers=int(os.getenv("SOLIDES_WORKERS") or WORKERS_PADRAO),
+            rps=float(os.getenv("SOLIDES_RPS") or RPS_PADRAO),
+            dir_landing=PATH_LANDING_API, run_id=medidor.run_id,
+        )
+        for _ in paginas_api:
+            pass
+        return {'dir_snapshot': os.path.join(PATH_LANDING_API, medidor.run_id)}
+
+    def etapa_api_carga(resultados):
+        if resultados['api_busca'] is None:
+            raise EtapaPulada("busca da API pulada")
+        paginas_api, metadados = replay_api_solides(resultados['api_busca']['dir_snapshot'])
+        print("Transformando e carregando dados da API no Banco...")
+        paginas_api = medir_iteracao(paginas_api, 'leitura_snapshot', contar=lambda pagina: len(pagina[0]))
+        carregar_dados_api(transformar_lotes_api(paginas_api), engine, schema, metodo_carga=metodo_carga,
+                           incremental=metadados.get('modo') == 'incremental')
 
     # 4. PÓS PROCESSAMENTO
-    print("\n--- [ETAPA 4] Pós-Processamento ---")
-    processar_status_transferidos(engine, schema)
+    def etapa_pos_processamento(resultados):
+        processar_status_transferidos(engine, schema)
 
-    print("\n=======================================================")
-    print("   PIPELINE FINALIZADO")
-    print("=======================================================\n")
+    etapas = [('api_busca', etapa_api_busca, ())]
+    if stream:
+        etapas.append(('pdf_carga', etapa_pdf_carga, ()))
+    else:
+        etapas += [('pdf_extracao', etapa_pdf_extracao, ()),
+                   ('pdf_carga', etapa_pdf_carga, ('pdf_extracao',))]
+    etapas += [
+        ('api_carga', etapa_api_carga, ('api_busca', 'pdf_carga')),
+        ('pos_processamento', etapa_pos_processamento, ('pdf_carga', 'api_carga')),
+        ('calendario', etapa_calendario, ('pdf_carga', 'api_carga')),
+    ]
+
+    concluidas = _descartar_busca_sem_snapshot(concluidas)
+
+    def registrar_checkpoint(nome, situacao_etapa, resultado):
+        try:
+            with medir(f'{nome}/checkpoint'):
+                registrar_etapa(dir_checkpoint, nome, situacao_etapa['status'], resultado, situacao_etapa['motivo'])
+        except OSError as e:
+            print(f"[AVISO] Checkpoint da etapa {nome} não gravado: {e}")
+
+    # PIPELINE_MAX_PARALELO=1 roda as etapas uma de cada vez, na ordem da lista
+    situacao = {}
+    try:
+        _, situacao = executar_dag(etapas, max_paralelo=int(os.getenv("PIPELINE_MAX_PARALELO") or 0) or None,
+                                   concluidas=concluidas, ao_concluir=registrar_checkpoint)
+    finally:
+        if token_api and not replay_api:
+            # API_LANDING_KEEP=0: o snapshot desta execução só fica se ela falhou (para o --resume)
+            falhou = not situacao or any(s['status'] in STATUS_FALHA for s in situacao.values())
+            aplicar_retencao(PATH_LANDING_API, snapshots_mantidos or int(falhou), run_id=medidor.run_id)
+
+    print("\n--- Situação das Etapas ---")
+    imprimir_situacao(etapas, situacao)
+    return situacao
 
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pipeline de dados ARQ People Intelligence")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="Ignora o manifesto e reprocessa todos os PDFs da pasta input/.")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="Apaga o cache de texto extraído dos PDFs (output/cache_texto) e sai.")
+    parser.add_argument('--stream', nargs='?', const='arquivo', choices=['arquivo', 'competencia'],
+                        help="Extrai, transforma e carrega os PDFs em lotes (por arquivo ou por competência), "
+                             "limitando o pico de memória a um lote.")
+    parser.add_argument('--pdf-backend', choices=list(BACKENDS),
+                        help="Biblioteca de extração de texto dos PDFs (padrão: PDF_BACKEND do .env ou pdfplumber). "
+                             "'pdfium' é bem mais rápido em PDFs digitais.")
+    parser.add_argument('--load-method', choices=list(METODOS_CARGA),
+                        help="Como carregar as tabelas de staging (padrão: LOAD_METHOD do .env ou copy). "
+                             "'to_sql' usa os INSERTs do pandas.")
+    parser.add_argument('--api-full-resync', action='store_true',
+                        help="Ignora a marca d'água e busca o detalhe de todos os colaboradores da API Solides.")
+    parser.add_argument('--replay', metavar='SNAPSHOT',
+                        help="Reprocessa um snapshot da zona de pouso da API (run_id em output/landing_api ou "
+                             "caminho do diretório) no lugar de chamar a API Solides.")
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help="Retoma uma execução que falhou (run_id em output/checkpoints) a partir da primeira "
+                             "etapa incompleta, reaproveitando os DataFrames dos PDFs e o snapshot da API já "
+                             "obtidos. Usa as opções da execução original.")
+    parser.add_argument('--metrics-textfile', metavar='ARQUIVO',
+                        help="Grava as métricas da execução neste arquivo no formato textfile do Prometheus "
+                             "(node_exporter). Padrão: METRICS_TEXTFILE do .env; o relatório JSON vai sempre "
+                             "para output/relatorios.")
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        limpar_cache(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output', 'cache_texto'))
+        sys.exit(0)
+
+    run_pipeline(full_refresh=args.full_refresh, stream=args.stream, pdf_backend=args.pdf_backend,
+                 load_method=args.load_method, api_full_resync=args.api_full_resync,
+                 replay_api=args.replay, metrics_textfile=args.metrics_textfile, resume=args.resume)
\ No newline at end of file
@@ -0,0 +1,101 @@
+# src/backends.py
+import pdfplumber
+import pypdfium2
+import pdfminer
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTTextContainer
+
+# -----------------------------------------------------------------------------
+# BACKENDS DE EXTRAÇÃO DE TEXTO (PDF -> lista de textos por página)
+# -----------------------------------------------------------------------------
+# Todos recebem o caminho do PDF e devolvem uma string por página. O regex de
+# extract.py espera linhas separadas por '\n', então cada backend normaliza
+# as quebras. A configuração de cada um entra na chave do cache de texto.
+
+# Parâmetros do extract_text do pdfplumber
+PARAMS_EXTRACT_TEXT = {'x_tolerance': 1, 'y_tolerance': 1}
+
+BACKEND_PADRAO = 'pdfplumber'
+
+
+def _paginas_pdfplumber(caminho_pdf, max_paginas=None):
+    """
+    Layout completo do pdfplumber (agrupa caracteres em palavras/linhas). Mais lento.
+    """
+    with pdfplumber.open(caminho_pdf) as pdf:
+        paginas = pdf.pages[:max_paginas] if max_paginas else pdf.pages
+        textos = []
+        for page in paginas:
+            textos.append(page.extract_text(**PARAMS_EXTRACT_TEXT) or "")
+            # libera os objetos de layout da página (sem isso o PDF inteiro fica na memória)
+            page.close()
+        return textos
+
+
+def _paginas_pdfminer(caminho_pdf, max_paginas=None):
+    """
+    pdfminer puro: concatena as caixas de texto do LAParams padrão, sem o
+    reagrupamento por caractere do pdfplumber.
+    """
+    paginas = []
+    for layout in extract_pages(caminho_pdf, maxpages=max_paginas or 0, laparams=LAParams()):
+        texto = "".join(el.get_text() for el in layout if isinstance(el, LTTextContainer))
+        paginas.append(texto.rstrip("\n"))
+    return paginas
+
+
+def _paginas_pdfium(caminho_pdf, max_paginas=None):
+    """
+    Text page nativo do PDFium (C++). Ordem de magnitude mais rápido em PDFs
+    digitais; não serve para PDFs escaneados (sem camada de texto).
+    """
+    paginas = []
+    pdf = pypdfium2.PdfDocument(caminho_pdf)
+    try:
+        n_paginas = min(len(pdf), max_paginas) if max_paginas else len(pdf)
+        for i in range(n_paginas):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            texto = textpage.get_text_range()
+            textpage.close()
+            page.close()
+            paginas.append(texto.replace("\r\n", "\n").replace("\r", "\n"))
+    finally:
+        pdf.close()
+    return paginas
+
+
+BACKENDS = {
+    'pdfplumber': _paginas_pdfplumber,
+    'pdfminer': _paginas_pdfminer,
+    'pdfium': _paginas_pdfium,
+}
+
+_VERSOES = {
+    'pdfplumber': lambda: {'versao': pdfplumber.__version__, **PARAMS_EXTRACT_TEXT},
+    'pdfminer': lambda: {'versao': pdfminer.__version__},
+    'pdfium': lambda: {'versao': str(pypdfium2.PYPDFIUM_INFO), 'pdfium': str(pypdfium2.PDFIUM_INFO)},
+}
+
+
+def validar_backend(nome):
+    """
+    Garante que o backend existe; levanta ValueError com as opções válidas.
+    """
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend de PDF desconhecido: '{nome}'. Opções: {', '.join(BACKENDS)}")
+    return nome
+
+
+def configuracao_backend(nome):
+    """
+    Identificação completa do backend (nome + versões + parâmetros), usada na chave do cache.
+    """
+    return {'extrator': nome, **_VERSOES[validar_backend(nome)]()}
+
+
+def extrair_paginas(caminho_pdf, backend=BACKEND_PADRAO, max_paginas=None):
+    """
+    Extrai o texto por página com o backend escolhido.
+    """
+    return BACKENDS[validar_backend(backend)](caminho_pdf, max_paginas)
@@ -0,0 +1,151 @@
+# src/bulk.py
+import io
+import pandas as pd
+from psycopg2 import sql
+from sqlalchemy import MetaData, Table, Column, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.types import Integer, BigInteger, Float, Boolean, Date, DateTime, String, Text
+
+# Como os DataFrames vão para as tabelas de staging (temporárias, DDL explícito):
+#   copy   -> COPY FROM STDIN (CSV) pelo psycopg2 (padrão)
+#   to_sql -> DataFrame.to_sql do pandas (INSERTs via SQLAlchemy), mantido como alternativa
+METODOS_CARGA = ('copy', 'to_sql')
+METODO_CARGA_PADRAO = 'copy'
+
+# Marcador de nulo no CSV do COPY. Com ele, o texto vazio ('') continua sendo
+# texto vazio no banco, como acontece no to_sql.
+NULO_COPY = '\\N'
+
+LINHAS_POR_LOTE_COPY = 100_000
+
+
+def validar_metodo_carga(nome):
+    """
+    Garante que o método de carga existe; levanta ValueError com as opções válidas.
+    """
+    if nome not in METODOS_CARGA:
+        raise ValueError(f"Método de carga desconhecido: '{nome}'. Opções: {', '.join(METODOS_CARGA)}")
+    return nome
+
+
+def _tipo_inferido(serie):
+    """
+    Tipo SQL de uma coluna sem tipo declarado (mesmo critério do to_sql do pandas).
+    """
+    if pd.api.types.is_bool_dtype(serie):
+        return Boolean()
+    if pd.api.types.is_integer_dtype(serie):
+        return BigInteger()
+    if pd.api.types.is_float_dtype(serie):
+        return Float(precision=53)
+    if isinstance(serie.dtype, pd.DatetimeTZDtype):
+        return DateTime(timezone=True)
+    if pd.api.types.is_datetime64_dtype(serie):
+        return DateTime()
+    inferido = pd.api.types.infer_dtype(serie, skipna=True)
+    if inferido == 'date':
+        return Date()
+    if inferido == 'boolean':
+        return Boolean()
+    if inferido == 'integer':
+        return BigInteger()
+    if inferido in ('floating', 'mixed-integer-float'):
+        return Float(precision=53)
+    return Text()
+
+
+def _preparar_coluna(serie, tipo):
+    """
+    Ajusta a coluna ao texto que o COPY espera para o tipo: inteiros que vieram
+    como float (por causa de nulos) são escritos sem o '.0', inclusive em
+    colunas de texto (como o Postgres faria ao converter o float para texto).
+    """
+    if isinstance(tipo, Integer) and not pd.api.types.is_integer_dtype(serie):
+        return pd.to_numeric(serie).round().astype('Int64')
+    if isinstance(tipo, String) and pd.api.types.is_float_dtype(serie):
+        valores = serie.dropna()
+        if ((valores == valores.round()) & (valores.abs() < 2 ** 53)).all():
+            return serie.astype('Int64')
+    return serie
+
+
+def _tabela_temporaria(df, nome_tabela, dtype=None):
+    """
+    Tabela temporária da sessão (apagada no COMMIT) com os tipos de `dtype`
+    (dicionário de tipos SQLAlchemy, como os SCHEMA_* do constants.py);
+    colunas fora dele têm o tipo inferido do DataFrame.
+    """
+    dtype = dtype or {}
+    colunas = [Column(c, dtype.get(c) or _tipo_inferido(df[c])) for c in df.columns]
+    return Table(nome_tabela, MetaData(), *colunas, prefixes=['TEMPORARY'], postgresql_on_commit='DROP')
+
+
+def copiar_dataframe(df, tabela, conn, linhas_por_lote=LINHAS_POR_LOTE_COPY):
+    """
+    Carrega o DataFrame na tabela já criada com COPY FROM STDIN (CSV), em lotes
+    de `linhas_por_lote` linhas para não montar o CSV inteiro em memória.
+    Roda no cursor da própria conexão, dentro da transação dela.
+    """
+    df = df.assign(**{c.name: _preparar_coluna(df[c.name], c.type) for c in tabela.columns})
+    comando_copy = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL {})").format(
+        sql.Identifier('pg_temp', tabela.name), sql.SQL(', ').join(map(sql.Identifier, df.columns)),
+        sql.Literal(NULO_COPY))
+    with conn.connection.cursor() as cur:
+        for inicio in range(0, len(df), linhas_por_lote):
+            buffer = io.StringIO()
+            df.iloc[inicio:inicio + linhas_por_lote].to_csv(
+                buffer, index=False, header=False, na_rep=NULO_COPY, lineterminator='\n')
+            buffer.seek(0)
+            cur.copy_expert(comando_copy, buffer)
+
+
+def criar_staging(df, nome_tabela, conn, dtype=None):
+    """
+    Cria a tabela de staging como TEMPORARY ... ON COMMIT DROP, com as colunas
+    do DataFrame (pode ser vazio, só como modelo). Devolve a Table.
+    """
+    tabela = _tabela_temporaria(df, nome_tabela, dtype)
+    conn.execute(CreateTable(tabela))
+    return tabela
+
+
+def anexar_staging(df, tabela, conn, metodo=METODO_CARGA_PADRAO):
+    """
+    Acrescenta as linhas do DataFrame a um staging criado por criar_staging.
+    Pode ser chamada várias vezes (carga lote a lote).
+    """
+    validar_metodo_carga(metodo)
+    if df.empty:
+        return
+    if metodo == 'copy':
+        copiar_dataframe(df, tabela, conn)
+    else:
+        # tabela sem schema: o to_sql acha a temporária pelo search_path (pg_temp vem primeiro)
+        df.to_sql(tabela.name, conn, if_exists='append', index=False)
+
+
+def indexar_staging(nome_tabela, conn, indices=()):
+    """
+    Cria os índices do staging depois da carga, seguidos de ANALYZE (o
+    autovacuum não analisa tabelas temporárias).
+    """
+    for coluna in indices:
+        conn.execute(text(f'CREATE INDEX ON pg_temp."{nome_tabela}" ("{coluna}")'))
+    conn.execute(text(f'ANALYZE pg_temp."{nome_tabela}"'))
+
+
+def carregar_staging(df, nome_tabela, conn, dtype=None, indices=(), metodo=METODO_CARGA_PADRAO):
+    """
+    Cria a tabela de staging como TEMPORARY ... ON COMMIT DROP e a preenche
+    com o DataFrame pelo método escolhido.
+
+    Deve ser chamada dentro de um `engine.begin()`: a tabela só existe nessa
+    conexão e some no fim da transação, então o SQL que lê o staging precisa
+    rodar no mesmo `conn` (referenciando `pg_temp.<nome>`). Não gera WAL nem
+    deixa tabelas para trás no schema do warehouse. Os índices em `indices`
+    são criados depois da carga, seguidos de ANALYZE.
+    """
+    validar_metodo_carga(metodo)
+    tabela = criar_staging(df, nome_tabela, conn, dtype)
+    anexar_staging(df, tabela, conn, metodo)
+    indexar_staging(nome_tabela, conn, indices)
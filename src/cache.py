@@ -0,0 +1,109 @@
+# src/cache.py
+import os
+import gzip
+import json
+import shutil
+import hashlib
+
+# Cada entrada do cache é um diretório <chave>/ com um arquivo comprimido por
+# página (0001.txt.gz, 0002.txt.gz, ...) e um índice gravado por último.
+# A entrada só é considerada válida depois que o índice existe.
+ARQUIVO_INDICE = 'indice.json'
+
+
+def chave_cache(sha256_pdf, configuracao):
+    """
+    Monta a chave da entrada: hash do PDF + configuração do extrator
+    (versão da biblioteca, tolerâncias etc.).
+    """
+    config_str = json.dumps(configuracao, sort_keys=True)
+    return hashlib.sha256(f"{sha256_pdf}|{config_str}".encode('utf-8')).hexdigest()
+
+
+def ler_paginas(dir_cache, chave):
+    """
+    Retorna a lista de textos por página, ou None se a entrada não existir.
+    A leitura atualiza o mtime do índice (base da política LRU).
+    """
+    dir_entrada = os.path.join(dir_cache, chave)
+    caminho_indice = os.path.join(dir_entrada, ARQUIVO_INDICE)
+    try:
+        with open(caminho_indice, 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+        paginas = []
+        for nome in indice['paginas']:
+            with gzip.open(os.path.join(dir_entrada, nome), 'rt', encoding='utf-8') as f:
+                paginas.append(f.read())
+        os.utime(caminho_indice)
+        return paginas
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def gravar_paginas(dir_cache, chave, paginas):
+    """
+    Grava uma entrada nova. Escreve num diretório temporário e renomeia no
+    final, para que workers concorrentes nunca leiam uma entrada pela metade.
+    """
+    dir_entrada = os.path.join(dir_cache, chave)
+    if os.path.exists(os.path.join(dir_entrada, ARQUIVO_INDICE)):
+        return
+
+    dir_tmp = f"{dir_entrada}.tmp{os.getpid()}"
+    os.makedirs(dir_tmp, exist_ok=True)
+    try:
+        nomes = []
+        for i, texto in enumerate(paginas, start=1):
+            nome = f"{i:04d}.txt.gz"
+            with gzip.open(os.path.join(dir_tmp, nome), 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(texto)
+            nomes.append(nome)
+        with open(os.path.join(dir_tmp, ARQUIVO_INDICE), 'w', encoding='utf-8') as f:
+            json.dump({'paginas': nomes}, f)
+        os.replace(dir_tmp, dir_entrada)
+    except OSError:
+        # Outro worker pode ter gravado a mesma entrada antes; o cache é só otimização.
+        shutil.rmtree(dir_tmp, ignore_errors=True)
+
+
+def _entradas(dir_cache):
+    """
+    Lista (mtime_indice, tamanho_bytes, caminho) das entradas completas.
+    """
+    entradas = []
+    if not os.path.isdir(dir_cache):
+        return entradas
+    for nome in os.listdir(dir_cache):
+        dir_entrada = os.path.join(dir_cache, nome)
+        caminho_indice = os.path.join(dir_entrada, ARQUIVO_INDICE)
+        if not os.path.isfile(caminho_indice):
+            continue
+        tamanho = sum(e.stat().st_size for e in os.scandir(dir_entrada) if e.is_file())
+        entradas.append((os.path.getmtime(caminho_indice), tamanho, dir_entrada))
+    return entradas
+
+
+def aplicar_limite(dir_cache, max_bytes):
+    """
+    Remove as entradas usadas há mais tempo (LRU) até o cache caber em `max_bytes`.
+    """
+    entradas = sorted(_entradas(dir_cache))
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    removidas = 0
+    for _, tamanho, dir_entrada in entradas:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(dir_entrada, ignore_errors=True)
+        total -= tamanho
+        removidas += 1
+    if removidas:
+        print(f"Cache de texto: {removidas} entrada(s) removida(s) (limite {max_bytes / 1024 ** 2:.0f} MB).")
+
+
+def limpar_cache(dir_cache):
+    """
+    Apaga todo o cache de texto extraído.
+    """
+    if os.path.isdir(dir_cache):
+        shutil.rmtree(dir_cache)
+    print(f"Cache de texto removido: {dir_cache}")
@@ -0,0 +1,141 @@
+# src/checkpoint.py
+import os
+import json
+import shutil
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (engine do to_parquet)
+    FORMATO_FRAMES = 'parquet'
+except ImportError:
+    FORMATO_FRAMES = 'pickle'
+
+# Checkpoints das etapas do main.py: cada execução tem um diretório <run_id>/
+# com o estado.json (opções da execução e status de cada etapa) e os
+# DataFrames devolvidos pelas etapas concluídas, em Parquet (com pyarrow) ou
+# pickle. O --resume <run_id> relê o estado e pula as etapas já concluídas,
+# reaproveitando o que elas devolveram. Os DataFrames têm CPF e salários: o
+# checkpoint é apagado quando a execução (ou a retomada) termina sem falhas, e
+# os de execuções que falharam e não foram retomadas saem pela retenção.
+ARQUIVO_ESTADO = 'estado.json'
+
+
+def _gravar_estado(dir_checkpoint, estado):
+    caminho = os.path.join(dir_checkpoint, ARQUIVO_ESTADO)
+    tmp = f"{caminho}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp, caminho)
+
+
+def iniciar_checkpoint(dir_checkpoints, run_id, opcoes):
+    """
+    Cria o checkpoint de uma execução nova com as opções dela. Devolve o diretório.
+    Avisa se os DataFrames vão cair no pickle por falta do pyarrow.
+    """
+    dir_checkpoint = os.path.join(dir_checkpoints, run_id)
+    os.makedirs(dir_checkpoint, exist_ok=True)
+    if FORMATO_FRAMES == 'pickle':
+        print("[AVISO] pyarrow não instalado (requirements.txt): os DataFrames do checkpoint serão gravados "
+              "em pickle, que é maior e só relê com versões compatíveis do pandas.")
+    _gravar_estado(dir_checkpoint, {'run_id': run_id, 'inicio': datetime.now().isoformat(timespec='seconds'),
+                                    'opcoes': opcoes, 'etapas': {}})
+    return dir_checkpoint
+
+
+def abrir_checkpoint(dir_checkpoints, referencia):
+    """
+    Aceita o run_id (procurado em dir_checkpoints) ou o caminho do checkpoint.
+    Devolve (diretório, estado). Levanta FileNotFoundError se não existir.
+    """
+    dir_checkpoint = referencia if os.path.isdir(referencia) else os.path.join(dir_checkpoints, referencia)
+    caminho = os.path.join(dir_checkpoint, ARQUIVO_ESTADO)
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(f"Checkpoint não encontrado: {dir_checkpoint}")
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return dir_checkpoint, json.load(f)
+
+
+def _gravar_frame(dir_checkpoint, nome_base, df):
+    """
+    Grava o DataFrame em Parquet; sem pyarrow, ou se alguma coluna não couber
+    no Parquet (objetos de tipos misturados), em pickle. Devolve o nome do arquivo.
+    """
+    if FORMATO_FRAMES == 'parquet':
+        arquivo = f"{nome_base}.parquet"
+        try:
+            df.to_parquet(os.path.join(dir_checkpoint, arquivo), index=False)
+            return arquivo
+        except (ValueError, TypeError) as e:
+            print(f"[AVISO] {nome_base} não coube em Parquet ({e}); gravando em pickle.")
+    arquivo = f"{nome_base}.pkl"
+    df.to_pickle(os.path.join(dir_checkpoint, arquivo))
+    return arquivo
+
+
+def _ler_frame(dir_checkpoint, arquivo):
+    caminho = os.path.join(dir_checkpoint, arquivo)
+    return pd.read_parquet(caminho) if arquivo.endswith('.parquet') else pd.read_pickle(caminho)
+
+
+def registrar_etapa(dir_checkpoint, nome, status, resultado=None, motivo=None):
+    """
+    Grava o status da etapa e, se concluída, o que ela devolveu: um dict cujos
+    DataFrames vão para arquivos próprios e o resto (JSON) para o estado.
+    """
+    _, estado = abrir_checkpoint(dir_checkpoint, dir_checkpoint)
+    registro = {'status': status, 'motivo': motivo, 'fim': datetime.now().isoformat(timespec='seconds')}
+    if status == 'ok' and resultado is not None:
+        registro['valores'], registro['frames'] = {}, {}
+        for chave, valor in resultado.items():
+            if isinstance(valor, pd.DataFrame):
+                registro['frames'][chave] = _gravar_frame(dir_checkpoint, f"{nome}__{chave}", valor)
+            else:
+                registro['valores'][chave] = valor
+    estado['etapas'][nome] = registro
+    _gravar_estado(dir_checkpoint, estado)
+
+
+def resultados_concluidos(dir_checkpoint, estado):
+    """
+    {etapa: resultado} das etapas concluídas, com os DataFrames relidos.
+    """
+    resultados = {}
+    for nome, registro in estado['etapas'].items():
+        if registro['status'] != 'ok':
+            continue
+        if 'valores' not in registro:
+            resultados[nome] = None
+            continue
+        resultado = dict(registro['valores'])
+        for chave, arquivo in registro['frames'].items():
+            resultado[chave] = _ler_frame(dir_checkpoint, arquivo)
+        resultados[nome] = resultado
+    return resultados
+
+
+def remover_checkpoint(dir_checkpoint):
+    shutil.rmtree(dir_checkpoint, ignore_errors=True)
+
+
+def aplicar_retencao_checkpoints(dir_checkpoints, manter, atual=None):
+    """
+    Mantém só os `manter` checkpoints de outras execuções gravados mais
+    recentemente (os DataFrames têm CPF e salários). O da execução `atual`
+    nunca é apagado aqui. A ordem é a da última gravação do estado, para
+    que um checkpoint antigo em retomada conte como recente.
+    """
+    if not os.path.isdir(dir_checkpoints):
+        return
+    gravados = []
+    for nome in os.listdir(dir_checkpoints):
+        caminho = os.path.join(dir_checkpoints, nome, ARQUIVO_ESTADO)
+        if nome != atual and os.path.exists(caminho):
+            gravados.append((os.path.getmtime(caminho), nome))
+    removidos = [nome for _, nome in sorted(gravados)[:max(0, len(gravados) - manter)]]
+    for nome in removidos:
+        remover_checkpoint(os.path.join(dir_checkpoints, nome))
+    if removidos:
+        print(f"[OK] Checkpoints: {len(removidos)} checkpoint(s) antigo(s) removido(s).")
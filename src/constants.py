@@ -71,7 +71,16 @@ MAPEAMENTO_CODIGOS = {**sorted_proventos, **sorted_descontos}
 
 
 # --- SCHEMAS PARA VALIDAÇÃO DE DADOS COM SQLALCHEMY ---
-from sqlalchemy.types import String, Date, Numeric
+from sqlalchemy.types import String, Date, DateTime, BigInteger, Boolean, Float
+
+# Colunas monetárias da folha: no DataFrame e no staging ficam em centavos
+# inteiros (Int64); viram NUMERIC(12,2) só no INSERT das tabelas fato (/ 100.0).
+COLUNAS_MONETARIAS_TOTAIS = [
+    'salario_contratual', 'total_proventos', 'total_descontos',
+    'valor_liquido', 'base_inss', 'base_fgts', 'valor_fgts',
+    'base_irrf'
+]
+COLUNAS_MONETARIAS_RUBRICAS = ['valor_rubrica']
 
 SCHEMA_TOTAIS = {
     'competencia': Date(),
@@ -85,14 +94,7 @@ SCHEMA_TOTAIS = {
     'cargo': String(),
     'data_admissao': Date(),
     'cpf': String(11),
-    'salario_contratual': Numeric(10, 2),
-    'total_proventos': Numeric(10, 2),
-    'total_descontos': Numeric(10, 2),
-    'valor_liquido': Numeric(10, 2),
-    'base_inss': Numeric(10, 2),
-    'base_fgts': Numeric(10, 2),
-    'valor_fgts': Numeric(10, 2),
-    'base_irrf': Numeric(10, 2)
+    **{col: BigInteger() for col in COLUNAS_MONETARIAS_TOTAIS}  # centavos
 }
 
 SCHEMA_RUBRICAS = {
@@ -102,8 +104,64 @@ SCHEMA_RUBRICAS = {
     'vinculo': String(),
     'nome_funcionario': String(),
     'cpf': String(11),
+    'situacao': String(),
     'codigo_rubrica': String(),
     'nome_rubrica': String(),
     'tipo_rubrica': String(),
-    'valor_rubrica': Numeric(10, 2)
-}
\ No newline at end of file
+    'valor_rubrica': BigInteger()  # centavos
+}
+
+SCHEMA_BASE_CSV = {
+    'cpf': String(11),
+    'nome_colaborador': String(),
+    'data_admissao_csv': Date(),
+    'data_demissao_csv': Date(),
+    'situacao_csv': String(),
+    'departamento_csv': String(),
+    'cargo_csv': String()
+}
+
+# Staging da API Solides: tipos explícitos para que um lote com a coluna toda
+# nula não vire TEXT (o upsert insere esses campos em colunas DATE/INTEGER).
+SCHEMA_STAGING_API = {
+    **{col: BigInteger() for col in (
+        'colaborador_id_solides', 'periodo_experiencia_dias', 'lider_id_solides',
+        'unidade_id_solides', 'cargo_id_solides', 'departamento_id_solides')},
+    **{col: Date() for col in (
+        'data_nascimento', 'data_admissao', 'data_demissao', 'data_contrato',
+        'data_expiracao_contrato', 'data_emissao_rg', 'data_ultima_atualizacao_api')},
+    **{col: Float(precision=53) for col in ('salario_api', 'valor_rescisao', 'total_beneficios_api')},
+    'pcd': Boolean(),
+    'ativo': Boolean(),
+}
+# Demais colunas do staging da API são texto. O tipo tem de ser fixo: a carga
+# é feita lote a lote e não pode depender do que veio no primeiro lote.
+SCHEMA_STAGING_API.update({col: String() for col in (
+    'cpf', 'nome_completo', 'matricula', 'email_corporativo', 'genero', 'estado_civil', 'saudacao',
+    'nacionalidade', 'tipo_necessidade_especial', 'naturalidade', 'nome_pai', 'nome_mae',
+    'turno_trabalho', 'tipo_contrato', 'escolaridade', 'curso_formacao', 'nivel_hierarquico',
+    'duracao_contrato', 'forma_demissao', 'decisao_demissao', 'etnia', 'nome_lider_imediato',
+    'unidade_nome', 'cargo_nome_api', 'departamento_nome_api', 'cep', 'logradouro',
+    'numero_endereco', 'complemento_endereco', 'bairro', 'cidade', 'estado', 'celular',
+    'email_pessoal', 'telefone_emergencia', 'rg', 'orgao_emissor_rg', 'titulo_eleitor',
+    'zona_eleitoral', 'secao_eleitoral', 'ctps_numero', 'ctps_serie', 'pis', 'banco_nome',
+    'banco_agencia', 'banco_conta')})
+
+# Listagem da API (ids e updated_at de todos os colaboradores): snapshot e marca d'água
+# (detalhe_falhou: o detalhe não veio e a marca não pode passar do updated_at dele)
+SCHEMA_LISTAGEM_API = {
+    'colaborador_id_solides': BigInteger(),
+    'updated_at': DateTime(),
+    'detalhe_falhou': Boolean(),
+}
+
+SCHEMA_BENEFICIOS_API = {
+    'colaborador_id_solides': BigInteger(),
+    'nome_beneficio': String(),
+    'tipo_beneficio': String(),
+    'periodicidade': String(),
+    'opcao_desconto': String(),
+    'aplicado_como': String(),
+    'valor_beneficio': Float(precision=53),
+    'valor_desconto': Float(precision=53),
+}
@@ -0,0 +1,164 @@
+# src/dag.py
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .metrics import STATUS_FALHA, medidor_ativo, medir, contexto_atual
+
+# Agendador das etapas do main.py: cada etapa declara de quais depende e roda
+# numa thread assim que todas elas terminam, em paralelo com as outras etapas
+# prontas (a extração dos PDFs, que usa CPU, junto com a busca da API, que
+# espera rede). Uma etapa que falha cancela as que dependem dela; uma etapa
+# pulada (EtapaPulada) não impede as dependentes, que decidem se têm o que
+# fazer. Na retomada de uma execução, as etapas já concluídas entram prontas,
+# com o resultado salvo. Toda etapa termina com um status, e o resumo mostra todas.
+
+STATUS_OK = 'ok'
+STATUS_ERRO = 'erro'
+STATUS_PULADA = 'pulada'
+STATUS_CANCELADA = 'cancelada'
+STATUS_REAPROVEITADA = 'reaproveitada'  # concluída numa execução anterior (checkpoint)
+
+
+class EtapaPulada(Exception):
+    """
+    Levantada pela etapa que não tem o que fazer nesta execução (ex: sem
+    token da API). A mensagem é o motivo, que aparece no resumo.
+    """
+
+
+def validar_dag(etapas):
+    """
+    Confere nomes repetidos, dependências inexistentes e ciclos.
+    `etapas` é uma lista de (nome, funcao, dependencias).
+    """
+    nomes = [nome for nome, _, _ in etapas]
+    repetidos = {nome for nome in nomes if nomes.count(nome) > 1}
+    if repetidos:
+        raise ValueError(f"Etapas repetidas: {sorted(repetidos)}")
+    dependencias = {nome: tuple(deps) for nome, _, deps in etapas}
+    for nome, deps in dependencias.items():
+        faltando = [d for d in deps if d not in dependencias]
+        if faltando:
+            raise ValueError(f"Etapa '{nome}' depende de etapa inexistente: {faltando}")
+
+    visitando, visitadas = set(), set()
+
+    def visitar(nome, caminho):
+        if nome in visitadas:
+            return
+        if nome in visitando:
+            raise ValueError(f"Ciclo entre as etapas: {' -> '.join(caminho + [nome])}")
+        visitando.add(nome)
+        for dep in dependencias[nome]:
+            visitar(dep, caminho + [nome])
+        visitando.discard(nome)
+        visitadas.add(nome)
+
+    for nome in nomes:
+        visitar(nome, [])
+
+
+def _rodar_etapa(nome, funcao, resultados, continuar):
+    """
+    Executa uma etapa na thread do pool. Devolve (status, resultado, motivo, segundos).
+    """
+    print(f"\n--- [{nome}] iniciando ---")
+    t0 = time.perf_counter()
+    resultado = pulada = erro = None
+    with continuar():
+        try:
+            with medir(nome):
+                try:
+                    resultado = funcao(resultados)
+                except EtapaPulada as e:
+                    pulada = str(e) or "sem motivo informado"
+        except Exception as e:
+            erro = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        medidor = medidor_ativo()
+        if pulada is not None and medidor is not None:
+            medidor.marcar(nome, STATUS_PULADA, pulada)
+    segundos = time.perf_counter() - t0
+    if erro is not None:
+        print(f"[ERRO] Etapa {nome} falhou após {segundos:.1f}s: {erro}")
+        return STATUS_ERRO, None, erro, segundos
+    if pulada is not None:
+        print(f"[AVISO] Etapa {nome} pulada: {pulada}")
+        return STATUS_PULADA, None, pulada, segundos
+    print(f"[OK] Etapa {nome} concluída em {segundos:.1f}s.")
+    return STATUS_OK, resultado, None, segundos
+
+
+def executar_dag(etapas, max_paralelo=None, concluidas=None, ao_concluir=None):
+    """
+    Roda as etapas respeitando as dependências, em paralelo quando possível.
+
+    `etapas`: lista de (nome, funcao, dependencias); `funcao(resultados)`
+    recebe o dict com o retorno das etapas já concluídas. Etapas prontas ao
+    mesmo tempo começam na ordem da lista. `concluidas` ({nome: resultado})
+    são etapas que não rodam de novo (retomada). `ao_concluir(nome, situacao,
+    resultado)` é chamado na thread do agendador ao fim de cada etapa
+    (inclusive cancelada), antes de liberar as dependentes.
+
+    :return: (resultados, situacao) - situacao[nome] = {'status', 'motivo', 'segundos'}
+    """
+    validar_dag(etapas)
+    funcoes = {nome: funcao for nome, funcao, _ in etapas}
+    dependencias = {nome: tuple(deps) for nome, _, deps in etapas}
+    pendentes = [nome for nome, _, _ in etapas]
+    resultados, situacao, em_execucao = {}, {}, {}
+    continuar = contexto_atual()
+    medidor = medidor_ativo()
+
+    for nome, resultado in (concluidas or {}).items():
+        if nome not in funcoes:
+            continue
+        resultados[nome] = resultado
+        situacao[nome] = {'status': STATUS_REAPROVEITADA, 'motivo': "concluída na execução retomada",
+                          'segundos': None}
+        if medidor is not None:
+            medidor.marcar(nome, STATUS_REAPROVEITADA, situacao[nome]['motivo'])
+        pendentes.remove(nome)
+        print(f"[OK] Etapa {nome} reaproveitada do checkpoint.")
+
+    with ThreadPoolExecutor(max_workers=max_paralelo or len(etapas) or 1, thread_name_prefix='etapa') as executor:
+        while pendentes or em_execucao:
+            for nome in list(pendentes):
+                falhas = [d for d in dependencias[nome] if situacao.get(d, {}).get('status') in STATUS_FALHA]
+                if falhas:
+                    motivo = f"dependência {', '.join(falhas)} não concluiu"
+                    situacao[nome] = {'status': STATUS_CANCELADA, 'motivo': motivo, 'segundos': 0.0}
+                    if medidor is not None:
+                        medidor.marcar(nome, STATUS_CANCELADA, motivo)
+                    print(f"[ERRO] Etapa {nome} cancelada: {motivo}")
+                    pendentes.remove(nome)
+                    if ao_concluir is not None:
+                        ao_concluir(nome, situacao[nome], None)
+                elif all(d in situacao for d in dependencias[nome]):
+                    em_execucao[executor.submit(_rodar_etapa, nome, funcoes[nome], resultados, continuar)] = nome
+                    pendentes.remove(nome)
+
+            if not em_execucao:
+                continue
+            prontos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                nome = em_execucao.pop(futuro)
+                status, resultado, motivo, segundos = futuro.result()
+                resultados[nome] = resultado
+                situacao[nome] = {'status': status, 'motivo': motivo, 'segundos': segundos}
+                if ao_concluir is not None:
+                    ao_concluir(nome, situacao[nome], resultado)
+
+    return resultados, situacao
+
+
+def imprimir_situacao(etapas, situacao):
+    """
+    Resumo com o status de todas as etapas (nenhuma some do relatório).
+    """
+    print(f"{'etapa':<22} {'status':<10} {'tempo':>8}  motivo")
+    for nome, _, _ in etapas:
+        s = situacao.get(nome, {'status': '?', 'motivo': None, 'segundos': None})
+        tempo = f"{s['segundos']:.1f}s" if s['segundos'] is not None else '-'
+        print(f"{nome:<22} {s['status']:<10} {tempo:>8}  {s['motivo'] or ''}")
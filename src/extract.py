@@ -1,10 +1,26 @@
 import os
 import re
-import requests
-import pdfplumber
+import queue
+import threading
+import multiprocessing
+from contextlib import nullcontext
+from bisect import bisect_left
+from collections import deque
+from itertools import islice
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import pandas as pd
 from .constants import MAPEAMENTO_CODIGOS
-from .utils import limpar_valor_moeda
+from .utils import limpar_valor_moeda_series
+from .manifest import hash_arquivo, versao_extrator, arquivo_inalterado, registrar_arquivo
+from .cache import chave_cache, ler_paginas, gravar_paginas, aplicar_limite
+from .backends import BACKEND_PADRAO, configuracao_backend, extrair_paginas
+from .solides import (BASE_URL_PADRAO, WORKERS_PADRAO, RPS_PADRAO, LimitadorTaxa,
+                      criar_sessao, iterar_paginas_colaboradores, buscar_detalhes, selecionar_para_detalhe,
+                      marca_da_listagem, ids_com_falha)
+from .landing import (novo_run_id, iniciar_snapshot, gravar_pagina_listagem, gravar_lote_detalhes,
+                      finalizar_snapshot, ler_indice, iterar_paginas)
+from .metrics import Medidor, ativar, medidor_ativo, medir, medir_iteracao, contexto_atual
 
 # -----------------------------------------------------------------------------
 # 1. FUNÇÕES AUXILIARES DE EXTRAÇÃO (PDF)
@@ -71,247 +87,847 @@ def extrair_info_base(texto_pagina):
 # 2. PROCESSAMENTO DE PDF (Lógica Original Restaurada)
 # -----------------------------------------------------------------------------
 
-def processar_pdfs(pasta_path):
+# Início de cada bloco de funcionário (holerite: "Empr.:"/"Contr.:"; férias: "Matrícula:")
+RE_INICIO_BLOCO = re.compile(r'(?=(?:Empr|Contr)\.?\s*:\s*\d+|Matrícula:\s*\d+)', re.IGNORECASE)
+RE_DEPARTAMENTO = re.compile(r'Departamento:\s*(.+)')
+
+
+def segmentar_blocos(texto):
     """
-    Varre a pasta e retorna DOIS DataFrames: (df_consolidado, df_detalhado).
+    Gera (inicio, fim) de cada bloco de funcionário numa única passada.
+    Equivale ao re.split pelo RE_INICIO_BLOCO, mas entrega os offsets direto,
+    sem precisar procurar o bloco de volta no texto.
+    """
+    inicio = 0
+    for match in RE_INICIO_BLOCO.finditer(texto):
+        if match.start() > inicio:
+            yield inicio, match.start()
+        inicio = match.start()
+    if inicio < len(texto):
+        yield inicio, len(texto)
+
+
+def departamento_do_bloco(posicao, depto_indices, depto_nomes):
+    """
+    Departamento vigente na posição: o último "Departamento:" antes dela (busca binária).
+    """
+    i = bisect_left(depto_indices, posicao)
+    return depto_nomes[i - 1] if i > 0 else None
+
+
+# -----------------------------------------------------------------------------
+# LAYOUTS DE DOCUMENTO (holerite mensal / 13º / recibo de férias)
+# -----------------------------------------------------------------------------
+# Campos do bloco de funcionário. Cada regex começa num rótulo literal
+# ("CPF:", "Cargo:", ...); o par (regex, rótulos) permite achar os candidatos
+# com str.find e só rodar o regex ancorado ali (ver _buscar_campo).
+def _campo(regex, flags, *rotulos):
+    ignora_caixa = bool(flags & re.IGNORECASE)
+    if ignora_caixa:
+        rotulos = tuple(r.casefold() for r in rotulos)
+    return re.compile(regex, flags), rotulos, ignora_caixa
+
+
+CAMPO_VINCULO = _campo(r'(Empr|Contr)\.?', 0, 'Empr', 'Contr')
+CAMPO_SITUACAO = _campo(r'Situação:\s*([^\n\r]+)', 0, 'Situação:')
+CAMPO_CABECALHO = _campo(r'(?:Empr|Contr)\.?\s*:\s*\d+.*?(?=\n|CPF:)', re.DOTALL, 'Empr', 'Contr')
+CAMPO_DEMITIDO = _campo(r'DEMITIDO EM\s+(\d{2}/\d{2}/\d{4})\s*-\s*(.*?)(?=\n|$)', re.IGNORECASE | re.DOTALL, 'DEMITIDO EM')
+CAMPO_DEMISSAO = _campo(r'(?:Data Demissão|Demissão):\s*(\d{2}/\d{2}/\d{4})', re.IGNORECASE, 'Data Demissão', 'Demissão')
+CAMPO_NOME = _campo(r'(?:Empr|Contr)\.?\s*:\s*\d+\s+(.*?)(?=\s*Situação:|\s*CPF:|\s*Adm:|\n)',
+                    re.DOTALL | re.IGNORECASE, 'Empr', 'Contr')
+CAMPO_NOME_FERIAS = _campo(r'Nome do Funcionário\s+(.*?)(?=\s*Situação:|\s*PIS/PASEP:|\s*Matrícula:|\n)',
+                           re.DOTALL | re.IGNORECASE, 'Nome do Funcionário')
+CAMPO_CPF = _campo(r'CPF:\s*([\d\.\-]+)', 0, 'CPF:')
+CAMPO_ADMISSAO = _campo(r'Adm?:\s*(\d{2}/\d{2}/\d{4})', 0, 'Ad')
+CAMPO_CARGO = _campo(r'Cargo:\s*\d+\s+(.*?)(?=\s+Salário:|\s+C\.|С\.)', re.DOTALL, 'Cargo:')
+CAMPO_CARGO_FERIAS = _campo(r'Cargo:\s+(.*?)(?=\s+Data de Pagamento:|\n)', re.DOTALL, 'Cargo:')
+CAMPO_SALARIO = _campo(r'Salário:\s*([\d\.,]+)', 0, 'Salário:')
+
+RE_FIM_SITUACAO = re.compile(r'\s+(?:CPF:|Adm:|PIS/PASEP:|Matrícula:)')
+RE_SITUACAO_SEM_ROTULO = re.compile(r'\s(Trabalhando|Afastado|Férias|Demitido)\s*$', re.IGNORECASE)
+RE_ROTULO_FINAL = re.compile(r'[^\s]+:\s*$')
+
+# Rodapé de totais: (rótulo do holerite "Proventos: 1.234,56", rótulo do recibo de férias "Total de Proventos 1.234,56")
+_IC, _ICD = re.IGNORECASE, re.IGNORECASE | re.DOTALL
+RODAPE_TOTAIS = {
+    'total_proventos': (_campo(r'Proventos:\s*([\d\.,]+)', _IC, 'Proventos:'),
+                        _campo(r'Total de Proventos\s+([\d\.,]+)', _ICD, 'Total de Proventos')),
+    'total_descontos': (_campo(r'Descontos:\s*([\d\.,]+)', _IC, 'Descontos:'),
+                        _campo(r'Total de Descontos\s+([\d\.,]+)', _ICD, 'Total de Descontos')),
+    'valor_liquido':   (_campo(r'L[íi]quido:\s*([\d\.,]+)', _IC, 'Líquido:', 'Liquido:'),
+                        _campo(r'L[íi]quido de F[ée]rias\s+([\d\.,]+)', _ICD, 'Líquido de F', 'Liquido de F')),
+    'base_inss':       (_campo(r'Base INSS:\s*([\d\.,]+)', _IC, 'Base INSS:'),
+                        _campo(r'Base INSS F[ée]rias\s+([\d\.,]+)', _ICD, 'Base INSS F')),
+    'base_fgts':       (_campo(r'Base FGTS:\s*([\d\.,]+)', _IC, 'Base FGTS:'),
+                        _campo(r'Base FGTS F[ée]rias\s+([\d\.,]+)', _ICD, 'Base FGTS F')),
+    'valor_fgts':      (_campo(r'Valor FGTS:\s*([\d\.,]+)', _IC, 'Valor FGTS:'),
+                        _campo(r'Valor FGTS F[ée]rias\s+([\d\.,]+)', _ICD, 'Valor FGTS F')),
+    'base_irrf':       (_campo(r'Base IRRF:\s*([\d\.,]+)', _IC, 'Base IRRF:'),
+                        _campo(r'Base IRRF F[ée]rias\s+([\d\.,]+)', _ICD, 'Base IRRF F')),
+}
+
+# Linha da tabela de rubricas: código, descrição, valor e P/D (até 2 rubricas por linha).
+# A descrição preguiçosa absorve a coluna de referência ("30,00", "14,00%"), então
+# o mesmo padrão serve para holerite e férias. O antigo padrão de férias (referência
+# como coluna separada) nunca acha mais rubricas que este e por isso nunca era escolhido.
+RE_RUBRICA = re.compile(r'(\d+)\s+(.*?)\s+([\d\.,]+)\s+([PD])(?=\s+\d{2,}|$)')
+
+# Cada perfil diz quais regex de rodapé tentar (em ordem) e onde termina a tabela de rubricas.
+# O layout é decidido pela primeira página, mas páginas seguintes podem trazer blocos
+# do outro layout: cada perfil tenta primeiro o próprio padrão e cai no do outro
+# (um find a mais só quando o próprio não acha nada).
+PERFIS_LAYOUT = {
+    'holerite': {
+        'rodape': {campo: (holerite, ferias) for campo, (holerite, ferias) in RODAPE_TOTAIS.items()},
+        # Holerite sem a linha "ND:" cai nos marcadores do rodapé, como sempre caiu
+        'fim_tabela': ("\nND:", "Total de Proventos", "Base INSS Férias"),
+    },
+    'ferias': {
+        'rodape': {campo: (ferias, holerite) for campo, (holerite, ferias) in RODAPE_TOTAIS.items()},
+        'fim_tabela': ("Total de Proventos", "Base INSS Férias", "\nND:"),
+    },
+    # Layout não reconhecido: tenta tudo, na ordem original (holerite primeiro)
+    'generico': {
+        'rodape': RODAPE_TOTAIS,
+        'fim_tabela': ("\nND:", "Total de Proventos", "Base INSS Férias"),
+    },
+}
+# O 13º sai no mesmo espelho do holerite mensal
+PERFIS_LAYOUT['decimo_terceiro'] = PERFIS_LAYOUT['holerite']
+
+MARCADORES_HOLERITE = ("ND:", "Proventos:", "Base INSS:")
+MARCADORES_FERIAS = ("Total de Proventos", "Líquido de Férias", "Base INSS Férias")
+RE_CALCULO_13 = re.compile(r'Cálculo\s*:\s*13', re.IGNORECASE)
+
+
+def classificar_layout(texto_primeira_pagina):
+    """
+    Identifica o layout do documento pela primeira página.
+    Só classifica quando os marcadores de um único layout aparecem; documento
+    misto ou desconhecido cai no 'generico', que tenta todos os padrões.
+    """
+    eh_holerite = any(m in texto_primeira_pagina for m in MARCADORES_HOLERITE)
+    eh_ferias = any(m in texto_primeira_pagina for m in MARCADORES_FERIAS)
+    if eh_holerite and not eh_ferias:
+        return 'decimo_terceiro' if RE_CALCULO_13.search(texto_primeira_pagina) else 'holerite'
+    if eh_ferias and not eh_holerite:
+        return 'ferias'
+    return 'generico'
+
+
+def _buscar_campo(campo, bloco, bloco_dobrado):
+    """
+    Equivale a regex.search(bloco): acha as ocorrências dos rótulos com
+    str.find (em C, bem mais rápido que o regex varrendo o bloco inteiro) e
+    roda o regex ancorado em cada uma, da esquerda para a direita.
+    Para regex IGNORECASE a busca dos rótulos é feita no bloco em casefold.
+    """
+    padrao, rotulos, ignora_caixa = campo
+    if ignora_caixa:
+        if bloco_dobrado is None:
+            return padrao.search(bloco)
+        texto = bloco_dobrado
+    else:
+        texto = bloco
+
+    if len(rotulos) == 1:
+        rotulo = rotulos[0]
+        pos = texto.find(rotulo)
+        while pos != -1:
+            match = padrao.match(bloco, pos)
+            if match:
+                return match
+            pos = texto.find(rotulo, pos + 1)
+        return None
+
+    posicoes = []
+    for rotulo in rotulos:
+        pos = texto.find(rotulo)
+        while pos != -1:
+            posicoes.append(pos)
+            pos = texto.find(rotulo, pos + 1)
+    for pos in sorted(posicoes):
+        match = padrao.match(bloco, pos)
+        if match:
+            return match
+    return None
+
+
+def extrair_campos_bloco(bloco, perfil):
+    """
+    Extrai os campos de cabeçalho (vínculo, situação, demissão, nome, CPF,
+    admissão, cargo, salário) e os totais do rodapé de um bloco de funcionário.
+    Os valores monetários saem como texto ('1.234,56'); a conversão para
+    float é feita em lote ao montar os DataFrames (ver _montar_dataframes).
+    """
+    # casefold preserva os offsets em texto latino; se mudar o tamanho
+    # (ex: 'ß' -> 'ss'), os campos IGNORECASE voltam para o search normal.
+    bloco_dobrado = bloco.casefold()
+    if len(bloco_dobrado) != len(bloco):
+        bloco_dobrado = None
+
+    def buscar(campo):
+        return _buscar_campo(campo, bloco, bloco_dobrado)
+
+    dados = {}
+
+    # --- VINCULO ---
+    vinculo_match = buscar(CAMPO_VINCULO)
+    dados['vinculo'] = 'Empregado' if vinculo_match and 'Empr' in vinculo_match.group(0) else 'Contribuinte' if vinculo_match else None
+
+    # --- SITUAÇÃO ---
+    situacao_match = buscar(CAMPO_SITUACAO)
+    if situacao_match:
+        dados['situacao'] = RE_FIM_SITUACAO.split(situacao_match.group(1), maxsplit=1)[0].strip()
+    else:
+        header_chunk_match = buscar(CAMPO_CABECALHO)
+        if header_chunk_match:
+            unlabeled_status_match = RE_SITUACAO_SEM_ROTULO.search(header_chunk_match.group(0))
+            dados['situacao'] = unlabeled_status_match.group(1) if unlabeled_status_match else None
+        else:
+            dados['situacao'] = None
+
+    # --- DEMISSÃO ---
+    demissao_motivo_match = buscar(CAMPO_DEMITIDO)
+    if demissao_motivo_match:
+        dados['data_demissao'] = demissao_motivo_match.group(1).strip()
+        dados['motivo_demissao'] = demissao_motivo_match.group(2).strip()
+    else:
+        demissao_match_antigo = buscar(CAMPO_DEMISSAO)
+        dados['data_demissao'] = demissao_match_antigo.group(1).strip() if demissao_match_antigo else None
+        dados['motivo_demissao'] = None
+
+    # --- NOME ---
+    nome_match = buscar(CAMPO_NOME) or buscar(CAMPO_NOME_FERIAS)
+    if nome_match:
+        nome_limpo = nome_match.group(1).replace('\n', ' ').strip()
+        status_encontrado = dados['situacao']
+        if status_encontrado != None and nome_limpo.lower().endswith(status_encontrado.lower()):
+            nome_limpo = nome_limpo[:-len(status_encontrado)].strip()
+        dados['nome_funcionario'] = RE_ROTULO_FINAL.sub('', nome_limpo).strip()
+    else:
+        dados['nome_funcionario'] = None
+
+    # --- CPF / ADMISSAO ---
+    cpf_match = buscar(CAMPO_CPF)
+    dados['cpf'] = cpf_match.group(1).strip() if cpf_match else None
+
+    admissao_match = buscar(CAMPO_ADMISSAO)
+    dados['data_admissao'] = admissao_match.group(1).strip() if admissao_match else None
+
+    # --- CARGO ---
+    cargo_match = buscar(CAMPO_CARGO) or buscar(CAMPO_CARGO_FERIAS)
+    dados['cargo'] = cargo_match.group(1).replace('\n', ' ').strip() if cargo_match else None
+
+    # --- SALARIO ---
+    salario_match = buscar(CAMPO_SALARIO)
+    dados['salario_contratual'] = salario_match.group(1) if salario_match else None
+
+    # --- [RODAPÉ (TOTAIS)] ---
+    for nome_campo, campos in perfil['rodape'].items():
+        match_total = next((m for m in map(buscar, campos) if m), None)
+        dados[nome_campo] = match_total.group(1) if match_total else None
+
+    return dados
+
+
+def valor_diferente_de_zero(valor_bruto):
+    """
+    Equivale a bool(limpar_valor_moeda(valor_bruto)) para o texto da coluna de
+    valor da rubrica (só dígitos, pontos e vírgulas), sem converter para float:
+    mais de uma vírgula é inválido (None) e sem dígito de 1 a 9 o valor é zero.
+    """
+    return valor_bruto.count(',') <= 1 and valor_bruto.strip('0.,') != ''
+
+
+def _chave_texto(caminho_pdf, backend=BACKEND_PADRAO):
+    return chave_cache(hash_arquivo(caminho_pdf), configuracao_backend(backend))
+
+
+def extrair_texto_paginas(caminho_pdf, dir_cache=None, backend=BACKEND_PADRAO):
+    """
+    Retorna a lista de textos por página do PDF, usando o `backend` de
+    extração escolhido (ver src/backends.py).
+    Com `dir_cache`, reaproveita o texto já extraído (chave = hash do arquivo +
+    backend + versão da biblioteca + parâmetros), pulando a extração, que é a parte cara.
+    """
+    chave = None
+    if dir_cache:
+        chave = _chave_texto(caminho_pdf, backend)
+        paginas = ler_paginas(dir_cache, chave)
+        if paginas is not None:
+            return paginas
+
+    paginas = extrair_paginas(caminho_pdf, backend)
+
+    if chave:
+        os.makedirs(dir_cache, exist_ok=True)
+        gravar_paginas(dir_cache, chave, paginas)
+    return paginas
+
+
+def _processar_arquivo_pdf(caminho_pdf, dir_cache=None, backend=BACKEND_PADRAO):
+    """
+    Lê um único PDF e retorna (consolidados, rubricas, sucesso).
+    Roda isolado (inclusive dentro de um processo worker); em caso de erro
+    devolve o que já tinha sido extraído até o ponto da falha e sucesso=False.
+    """
+    nome_arquivo = os.path.basename(caminho_pdf)
+    lista_rubricas_detalhadas = []
+    lista_consolidados = []
+
+    print(f" -> Lendo: {nome_arquivo}")
+    try:
+        with medir('texto') as m:
+            paginas = extrair_texto_paginas(caminho_pdf, dir_cache, backend)
+            m['linhas_saida'] = len(paginas)
+        with medir('regex', linhas_entrada=len(paginas)) as m:
+            _extrair_blocos(paginas, lista_consolidados, lista_rubricas_detalhadas)
+            m['linhas_saida'] = len(lista_consolidados)
+
+    except Exception as e:
+        print(f"Erro ao ler PDF {nome_arquivo}: {e}")
+        return lista_consolidados, lista_rubricas_detalhadas, False
+
+    return lista_consolidados, lista_rubricas_detalhadas, True
+
+
+def _extrair_blocos(paginas, lista_consolidados, lista_rubricas_detalhadas):
+    """
+    Camada de regex: segmenta o texto das páginas em blocos de funcionário e
+    acrescenta às listas os campos de cada bloco e as rubricas da tabela.
+    """
+    texto_completo_pdf = "".join(pagina + "\n" for pagina in paginas)
+
+    info_base = extrair_info_base(texto_completo_pdf)
+    perfil = PERFIS_LAYOUT[classificar_layout(paginas[0] if paginas else "")]
+    
+    # Offsets dos cabeçalhos "Departamento:" (já em ordem crescente)
+    depto_indices, depto_nomes = [], []
+    for match in RE_DEPARTAMENTO.finditer(texto_completo_pdf):
+        depto_indices.append(match.start())
+        depto_nomes.append(match.group(1).strip())
+
+    for inicio_bloco, fim_bloco in segmentar_blocos(texto_completo_pdf):
+        bloco = texto_completo_pdf[inicio_bloco:fim_bloco]
+        if len(bloco) < 50: continue
+        if "CPF:" not in bloco and "Matrícula:" not in bloco: continue
+
+        departamento_atual = departamento_do_bloco(inicio_bloco, depto_indices, depto_nomes)
+
+        dados_funcionario = {'departamento': departamento_atual, **info_base}
+
+        dados_funcionario.update(extrair_campos_bloco(bloco, perfil))
+
+        lista_consolidados.append(dados_funcionario.copy())
+
+        # --- RUBRICAS (DETALHE) ---
+        chaves_rubrica = {
+            'competencia': dados_funcionario.get('competencia'),
+            'tipo_calculo': dados_funcionario.get('tipo_calculo'),
+            'departamento': dados_funcionario.get('departamento'),
+            'vinculo': dados_funcionario.get('vinculo'),
+            'nome_funcionario': dados_funcionario.get('nome_funcionario'),
+            'cpf': dados_funcionario.get('cpf'),
+            # --- CORREÇÃO APLICADA AQUI ---
+            'situacao': dados_funcionario.get('situacao')
+        }
+
+        inicio_tabela = bloco.find("CPF:")
+        if inicio_tabela == -1: inicio_tabela = bloco.find("Matrícula:")
+
+        fim_tabela = next((f for f in (bloco.find(m) for m in perfil['fim_tabela']) if f != -1), -1)
+
+        rubricas_neste_func = []
+        if inicio_tabela != -1 and fim_tabela != -1:
+            tabela_str = bloco[inicio_tabela:fim_tabela].split('\n')[1:]
+            for linha in tabela_str:
+                if not re.search(r'\d', linha): continue
+
+                for match in RE_RUBRICA.finditer(linha):
+                    valor_bruto = match.group(3)
+                    if not valor_diferente_de_zero(valor_bruto): continue
+
+                    cod_l, nome_l, tipo_l_map = mapear_rubrica_codigo(match.group(1), match.group(2))
+                    tipo_detectado = match.group(4)
+                    tipo_final = tipo_l_map if tipo_l_map else ('Provento' if tipo_detectado == 'P' else 'Desconto')
+
+                    if tipo_l_map and tipo_l_map[0] != tipo_detectado:
+                         tipo_final = 'Provento' if tipo_detectado == 'P' else 'Desconto'
+
+                    rubricas_neste_func.append({
+                        **chaves_rubrica,
+                        'codigo_rubrica': cod_l,
+                        'nome_rubrica': nome_l,
+                        'tipo_rubrica': tipo_final,
+                        'valor_rubrica': valor_bruto
+                    })
+        
+        if rubricas_neste_func:
+            lista_rubricas_detalhadas.extend(rubricas_neste_func)
+        else:
+            vazia = chaves_rubrica.copy()
+            vazia.update({'codigo_rubrica': None, 'nome_rubrica': None, 'tipo_rubrica': None, 'valor_rubrica': 0.0})
+            lista_rubricas_detalhadas.append(vazia)
+
+
+def _processar_arquivo_medido(caminho_pdf, dir_cache=None, backend=BACKEND_PADRAO):
+    """
+    _processar_arquivo_pdf medido como uma etapa por arquivo (ver src/metrics.py).
+    """
+    with medir(os.path.basename(caminho_pdf), detalhe=True) as m:
+        resultado = _processar_arquivo_pdf(caminho_pdf, dir_cache, backend)
+        m['linhas_saida'] = len(resultado[0])
+    return resultado
+
+
+def _processar_arquivo_em_worker(caminho_pdf, dir_cache=None, backend=BACKEND_PADRAO):
+    """
+    Versão do worker com medição: devolve (resultado, etapas medidas no worker),
+    que o processo principal incorpora ao seu medidor.
+    """
+    medidor = Medidor()
+    with ativar(medidor):
+        resultado = _processar_arquivo_medido(caminho_pdf, dir_cache, backend)
+    return resultado, medidor.exportar()
+
+
+# Os pools de PDF são criados de dentro de uma etapa do DAG, com outras threads
+# vivas (busca da API, produtor do streaming, amostrador de RSS do Medidor): um
+# fork copiaria locks presos por elas (ex: o do stdout) e o worker travaria.
+# Os workers saem de um forkserver (spawn no Windows), que já importou este módulo.
+if 'forkserver' in multiprocessing.get_all_start_methods():
+    CONTEXTO_WORKERS = multiprocessing.get_context('forkserver')
+    CONTEXTO_WORKERS.set_forkserver_preload(['__main__', __name__])
+else:
+    CONTEXTO_WORKERS = multiprocessing.get_context('spawn')
+
+
+def _enviar(executor, tarefa, caminho, dir_cache, backend):
+    """
+    executor.submit que, com o pool quebrado, devolve um futuro já falho em vez
+    de levantar: quem consome trata a quebra num lugar só (no .result()).
+    """
+    try:
+        return executor.submit(tarefa, caminho, dir_cache, backend)
+    except BrokenProcessPool as e:
+        futuro = Future()
+        futuro.set_exception(e)
+        return futuro
+
+
+def _executar_isolado(caminho, tarefa, dir_cache, backend):
+    """
+    Processa um arquivo sozinho num pool de um worker novo. Se o worker morrer
+    de novo, o culpado é este arquivo, que é perdido.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=CONTEXTO_WORKERS) as executor:
+        try:
+            return executor.submit(tarefa, caminho, dir_cache, backend).result()
+        except BrokenProcessPool:
+            print(f"[ERRO] O worker morreu ao ler o PDF {os.path.basename(caminho)}; arquivo ignorado.")
+            raise
+
+
+def _executar_arquivos(caminhos, workers, dir_cache=None, backend=BACKEND_PADRAO):
+    """
+    Gera (caminho, (consolidados, rubricas, sucesso)) na ordem de `caminhos`,
+    em série ou num ProcessPoolExecutor. No modo paralelo mantém no máximo
+    2x `workers` arquivos em voo, para não acumular resultados na memória.
+
+    Se um worker morrer (ex: PDF que derruba o processo), o pool inteiro quebra
+    e todos os arquivos em voo falham juntos: eles são reprocessados um por vez,
+    cada um num pool próprio, para achar o culpado (só ele é perdido), e o resto
+    segue num pool novo. Com um medidor ativo, as métricas de cada arquivo
+    (inclusive as medidas nos workers) entram sob a etapa aberta de quem consome o gerador.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(caminhos))
+    if workers <= 1:
+        for c in caminhos:
+            yield c, _processar_arquivo_medido(c, dir_cache, backend)
+        return
+
+    medidor = medidor_ativo()
+    tarefa = _processar_arquivo_em_worker if medidor else _processar_arquivo_pdf
+
+    def resultado_de(obter):
+        resultado = obter()
+        if medidor:
+            resultado, etapas = resultado
+            medidor.incorporar(etapas)
+        return resultado
+
+    fila = iter(caminhos)
+    while True:
+        suspeitos = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=CONTEXTO_WORKERS) as executor:
+            em_voo = deque((c, _enviar(executor, tarefa, c, dir_cache, backend)) for c in islice(fila, workers * 2))
+            while em_voo:
+                caminho, futuro = em_voo[0]
+                try:
+                    resultado = resultado_de(futuro.result)
+                except BrokenProcessPool:
+                    suspeitos = [c for c, _ in em_voo]
+                    break
+                except Exception as e:
+                    print(f"Erro ao ler PDF {os.path.basename(caminho)}: {e}")
+                    resultado = ([], [], False)
+                em_voo.popleft()
+                proximo = next(fila, None)
+                if proximo is not None:
+                    em_voo.append((proximo, _enviar(executor, tarefa, proximo, dir_cache, backend)))
+                yield caminho, resultado
+
+        if not suspeitos:
+            return
+        print(f"[AVISO] Um worker do pool morreu; reprocessando {len(suspeitos)} arquivo(s) um por vez.")
+        for caminho in suspeitos:
+            try:
+                resultado = resultado_de(lambda: _executar_isolado(caminho, tarefa, dir_cache, backend))
+            except BrokenProcessPool:
+                resultado = ([], [], False)
+            except Exception as e:
+                print(f"Erro ao ler PDF {os.path.basename(caminho)}: {e}")
+                resultado = ([], [], False)
+            yield caminho, resultado
+
+
+def _iterar_incremental(caminhos, workers, manifesto, dir_cache=None, backend=BACKEND_PADRAO):
+    """
+    Processa apenas os PDFs novos/alterados (hash, tamanho ou versão do parser
+    diferentes do manifesto; trocar de backend também conta como versão nova). Como a carga apaga e reinsere competências
+    inteiras, os PDFs inalterados que compartilham competência com algum
+    arquivo alterado também são reprocessados. Atualiza o manifesto em memória.
+    """
+    versao = versao_extrator(backend)
+    arquivos = manifesto.setdefault('arquivos', {})
+    assinaturas = {c: (hash_arquivo(c), os.path.getsize(c)) for c in caminhos}
+
+    pendentes = [
+        c for c in caminhos
+        if not arquivo_inalterado(manifesto, os.path.basename(c), *assinaturas[c], versao)
+    ]
+    n_alterados = len(pendentes)
+    comps_afetadas = set()
+    processados = set()
+
+    while pendentes:
+        for c in pendentes:
+            comps_afetadas.update(arquivos.get(os.path.basename(c), {}).get('competencias', []))
+
+        for caminho, (consolidados, rubricas, sucesso) in _executar_arquivos(pendentes, workers, dir_cache, backend):
+            processados.add(caminho)
+            nome_arquivo = os.path.basename(caminho)
+            comps = {d['competencia'] for d in consolidados if d.get('competencia')}
+            comps_afetadas.update(comps)
+            if sucesso:
+                registrar_arquivo(manifesto, nome_arquivo, *assinaturas[caminho], versao,
+                                  comps, len(consolidados), len(rubricas))
+            else:
+                arquivos.pop(nome_arquivo, None)
+            yield caminho, (consolidados, rubricas, sucesso)
+
+        pendentes = [
+            c for c in caminhos
+            if c not in processados
+            and comps_afetadas.intersection(arquivos.get(os.path.basename(c), {}).get('competencias', []))
+        ]
+
+    print(f"Manifesto: {n_alterados} PDF(s) novo(s)/alterado(s), "
+          f"{len(processados) - n_alterados} reprocessado(s) por competência, "
+          f"{len(caminhos) - len(processados)} inalterado(s) pulado(s).")
+
+
+def _listar_pdfs(pasta_path):
+    """
+    Lista os caminhos dos PDFs da pasta em ordem alfabética.
     """
     if not os.path.exists(pasta_path):
         print(f"Pasta não encontrada: {pasta_path}")
-        return pd.DataFrame(), pd.DataFrame()
+        return []
 
-    arquivos_pdf = [f for f in os.listdir(pasta_path) if f.lower().endswith('.pdf')]
+    arquivos_pdf = sorted(f for f in os.listdir(pasta_path) if f.lower().endswith('.pdf'))
     if not arquivos_pdf:
         print(f"Nenhum arquivo PDF encontrado em: {pasta_path}")
+        return []
+
+    print(f"Processando {len(arquivos_pdf)} PDFs...")
+    return [os.path.join(pasta_path, f) for f in arquivos_pdf]
+
+
+# Campos monetários que a extração devolve como texto
+CAMPOS_MONETARIOS = ('salario_contratual', *RODAPE_TOTAIS)
+
+
+def _montar_dataframes(consolidados, rubricas):
+    """
+    Monta (df_consolidado, df_detalhado) e converte os valores monetários em
+    lote (limpar_valor_moeda_series) em vez de valor a valor dentro do parser.
+    """
+    df_consol, df_detalhe = pd.DataFrame(consolidados), pd.DataFrame(rubricas)
+    for col in CAMPOS_MONETARIOS:
+        if col in df_consol.columns:
+            df_consol[col] = limpar_valor_moeda_series(df_consol[col])
+    if 'valor_rubrica' in df_detalhe.columns:
+        df_detalhe['valor_rubrica'] = limpar_valor_moeda_series(df_detalhe['valor_rubrica'])
+    return df_consol, df_detalhe
+
+
+def _iterar_resultados(caminhos, workers, manifesto, dir_cache, backend=BACKEND_PADRAO):
+    if manifesto is None:
+        return _executar_arquivos(caminhos, workers, dir_cache, backend)
+    return _iterar_incremental(caminhos, workers, manifesto, dir_cache, backend)
+
+
+def processar_pdfs(pasta_path, workers=None, manifesto=None, dir_cache=None, cache_max_bytes=None,
+                   backend=BACKEND_PADRAO):
+    """
+    Varre a pasta e retorna DOIS DataFrames: (df_consolidado, df_detalhado).
+
+    Cada PDF é processado em um processo separado (workers=None usa todos os
+    núcleos; workers=1 força o modo serial). O resultado é sempre concatenado
+    na ordem alfabética dos arquivos, independente de qual worker terminou antes.
+
+    Se um `manifesto` (ver src/manifest.py) for informado, só entram no
+    resultado os PDFs novos/alterados e os que dividem competência com eles.
+
+    Com `dir_cache`, o texto extraído de cada página fica em cache no disco
+    (ver src/cache.py) e o cache é podado para `cache_max_bytes` ao final.
+
+    `backend` escolhe a biblioteca de extração de texto: 'pdfplumber' (padrão),
+    'pdfminer' ou 'pdfium' (ver src/backends.py).
+    """
+    caminhos = _listar_pdfs(pasta_path)
+    if not caminhos:
         return pd.DataFrame(), pd.DataFrame()
 
+    resultados = dict(_iterar_resultados(caminhos, workers, manifesto, dir_cache, backend))
+
+    if dir_cache and cache_max_bytes:
+        with medir('poda_cache'):
+            aplicar_limite(dir_cache, cache_max_bytes)
+
     lista_geral_rubricas_detalhadas = []
     lista_geral_consolidados = []
+    for caminho in caminhos:
+        if caminho not in resultados:
+            continue
+        consolidados, rubricas, _ = resultados[caminho]
+        lista_geral_consolidados.extend(consolidados)
+        lista_geral_rubricas_detalhadas.extend(rubricas)
 
-    print(f"Processando {len(arquivos_pdf)} PDFs...")
+    with medir('montagem', linhas_entrada=len(lista_geral_consolidados)) as m:
+        df_consol, df_detalhe = _montar_dataframes(lista_geral_consolidados, lista_geral_rubricas_detalhadas)
+        m['linhas_saida'] = len(df_consol)
+    return df_consol, df_detalhe
 
-    for nome_arquivo in arquivos_pdf:
-        print(f" -> Lendo: {nome_arquivo}")
-        try:
-            with pdfplumber.open(os.path.join(pasta_path, nome_arquivo)) as pdf:
-                texto_completo_pdf = "".join([(page.extract_text(x_tolerance=1, y_tolerance=1) or "") + "\n" for page in pdf.pages])
-                
-                info_base = extrair_info_base(texto_completo_pdf)
-                
-                depto_map = {match.start(): match.group(1).strip() for match in re.finditer(r'Departamento:\s*(.+)', texto_completo_pdf)}
-                depto_indices = sorted(depto_map.keys())
-
-                blocos_texto = re.split(r'(?=(?:Empr|Contr)\.?\s*:\s*\d+|Matrícula:\s*\d+)', texto_completo_pdf, flags=re.IGNORECASE)
-
-                for bloco in blocos_texto:
-                    if len(bloco) < 50: continue
-                    if "CPF:" not in bloco and "Matrícula:" not in bloco: continue
-
-                    posicao_bloco = texto_completo_pdf.find(bloco)
-                    departamento_atual = next((depto_map[idx] for idx in reversed(depto_indices) if idx < posicao_bloco), None)
-
-                    dados_funcionario = {'departamento': departamento_atual, **info_base}
-
-                    # --- VINCULO ---
-                    vinculo_match = re.search(r'(Empr|Contr)\.?', bloco)
-                    dados_funcionario['vinculo'] = 'Empregado' if vinculo_match and 'Empr' in vinculo_match.group(0) else 'Contribuinte' if vinculo_match else None
-
-                    # --- SITUAÇÃO ---
-                    situacao_match = re.search(r'Situação:\s*([^\n\r]+)', bloco)
-                    if situacao_match:
-                        situacao_str = re.split(r'\s+(?:CPF:|Adm:|PIS/PASEP:|Matrícula:)', situacao_match.group(1), maxsplit=1)[0].strip()
-                        dados_funcionario['situacao'] = situacao_str
-                    else:
-                        header_chunk_match = re.search(r'(?:Empr|Contr)\.?\s*:\s*\d+.*?(?=\n|CPF:)', bloco, re.DOTALL)
-                        if header_chunk_match:
-                            header_chunk = header_chunk_match.group(0)
-                            unlabeled_status_match = re.search(r'\s(Trabalhando|Afastado|Férias|Demitido)\s*$', header_chunk, re.IGNORECASE)
-                            dados_funcionario['situacao'] = unlabeled_status_match.group(1) if unlabeled_status_match else None
-                        else:
-                            dados_funcionario['situacao'] = None
-
-                    # --- DEMISSÃO ---
-                    demissao_motivo_match = re.search(r'DEMITIDO EM\s+(\d{2}/\d{2}/\d{4})\s*-\s*(.*?)(?=\n|$)', bloco, re.IGNORECASE | re.DOTALL)
-                    if demissao_motivo_match:
-                        dados_funcionario['data_demissao'] = demissao_motivo_match.group(1).strip()
-                        dados_funcionario['motivo_demissao'] = demissao_motivo_match.group(2).strip()
-                    else:
-                        demissao_match_antigo = re.search(r'(?:Data Demissão|Demissão):\s*(\d{2}/\d{2}/\d{4})', bloco, re.IGNORECASE)
-                        dados_funcionario['data_demissao'] = demissao_match_antigo.group(1).strip() if demissao_match_antigo else None
-                        dados_funcionario['motivo_demissao'] = None
-
-                    # --- NOME ---
-                    regex_nome = r'(?:Empr|Contr)\.?\s*:\s*\d+\s+(.*?)' + r'(?=\s*Situação:|\s*CPF:|\s*Adm:|\n)'
-                    nome_match = re.search(regex_nome, bloco, re.DOTALL | re.IGNORECASE)
-
-                    if not nome_match:
-                        regex_nome_ferias = r'Nome do Funcionário\s+(.*?)' + r'(?=\s*Situação:|\s*PIS/PASEP:|\s*Matrícula:|\n)'
-                        nome_match = re.search(regex_nome_ferias, bloco, re.DOTALL | re.IGNORECASE)
-
-                    if nome_match:
-                        nome_capturado = nome_match.group(1).replace('\n', ' ').strip()
-                        status_encontrado = dados_funcionario.get('situacao', None)
-                        nome_limpo = nome_capturado
-                        if status_encontrado != None and nome_limpo.lower().endswith(status_encontrado.lower()):
-                            tamanho_status = len(status_encontrado)
-                            nome_limpo = nome_limpo[:-tamanho_status].strip()
-                        nome_limpo = re.sub(r'[^\s]+:\s*$', '', nome_limpo).strip()
-                        dados_funcionario['nome_funcionario'] = nome_limpo
-                    else:
-                        dados_funcionario['nome_funcionario'] = None
-
-                    # --- CPF / ADMISSAO ---
-                    cpf_match = re.search(r'CPF:\s*([\d\.\-]+)', bloco)
-                    dados_funcionario['cpf'] = cpf_match.group(1).strip() if cpf_match else None
-                    
-                    admissao_match = re.search(r'Adm?:\s*(\d{2}/\d{2}/\d{4})', bloco)
-                    dados_funcionario['data_admissao'] = admissao_match.group(1).strip() if admissao_match else None
-
-                    # --- CARGO ---
-                    cargo_match = re.search(r'Cargo:\s*\d+\s+(.*?)(?=\s+Salário:|\s+C\.|С\.)', bloco, re.DOTALL)
-                    if not cargo_match:
-                         cargo_match = re.search(r'Cargo:\s+(.*?)(?=\s+Data de Pagamento:|\n)', bloco, re.DOTALL)
-                    dados_funcionario['cargo'] = cargo_match.group(1).replace('\n', ' ').strip() if cargo_match else None
-
-                    # --- SALARIO ---
-                    salario_match = re.search(r'Salário:\s*([\d\.,]+)', bloco)
-                    dados_funcionario['salario_contratual'] = limpar_valor_moeda(salario_match.group(1)) if salario_match else None
-
-                    # --- [RODAPÉ (TOTAIS)] ---
-                    dados_funcionario.update({
-                        'total_proventos': None, 'total_descontos': None, 'valor_liquido': None,
-                        'base_inss': None, 'base_fgts': None, 'valor_fgts': None, 'base_irrf': None
-                    })
 
-                    match_proventos = re.search(r'Proventos:\s*([\d\.,]+)', bloco, re.IGNORECASE)
-                    if not match_proventos: match_proventos = re.search(r'Total de Proventos\s+([\d\.,]+)', bloco, re.IGNORECASE | re.DOTALL)
-
-                    match_descontos = re.search(r'Descontos:\s*([\d\.,]+)', bloco, re.IGNORECASE)
-                    if not match_descontos: match_descontos = re.search(r'Total de Descontos\s+([\d\.,]+)', bloco, re.IGNORECASE | re.DOTALL)
-
-                    match_liquido = re.search(r'L[íi]quido:\s*([\d\.,]+)', bloco, re.IGNORECASE)
-                    if not match_liquido: match_liquido = re.search(r'L[íi]quido de F[ée]rias\s+([\d\.,]+)', bloco, re.IGNORECASE | re.DOTALL)
-
-                    match_inss = re.search(r'Base INSS:\s*([\d\.,]+)', bloco, re.IGNORECASE)
-                    if not match_inss: match_inss = re.search(r'Base INSS F[ée]rias\s+([\d\.,]+)', bloco, re.IGNORECASE | re.DOTALL)
-
-                    match_fgts = re.search(r'Base FGTS:\s*([\d\.,]+)', bloco, re.IGNORECASE)
-                    if not match_fgts: match_fgts = re.search(r'Base FGTS F[ée]rias\s+([\d\.,]+)', bloco, re.IGNORECASE | re.DOTALL)
-
-                    match_vlr_fgts = re.search(r'Valor FGTS:\s*([\d\.,]+)', bloco, re.IGNORECASE)
-                    if not match_vlr_fgts: match_vlr_fgts = re.search(r'Valor FGTS F[ée]rias\s+([\d\.,]+)', bloco, re.IGNORECASE | re.DOTALL)
-
-                    match_irrf = re.search(r'Base IRRF:\s*([\d\.,]+)', bloco, re.IGNORECASE)
-                    if not match_irrf: match_irrf = re.search(r'Base IRRF F[ée]rias\s+([\d\.,]+)', bloco, re.IGNORECASE | re.DOTALL)
-
-                    dados_funcionario['total_proventos'] = limpar_valor_moeda(match_proventos.group(1) if match_proventos else None)
-                    dados_funcionario['total_descontos'] = limpar_valor_moeda(match_descontos.group(1) if match_descontos else None)
-                    dados_funcionario['valor_liquido'] =   limpar_valor_moeda(match_liquido.group(1) if match_liquido else None)
-                    dados_funcionario['base_inss'] =       limpar_valor_moeda(match_inss.group(1) if match_inss else None)
-                    dados_funcionario['base_fgts'] =       limpar_valor_moeda(match_fgts.group(1) if match_fgts else None)
-                    dados_funcionario['valor_fgts'] =      limpar_valor_moeda(match_vlr_fgts.group(1) if match_vlr_fgts else None)
-                    dados_funcionario['base_irrf'] =       limpar_valor_moeda(match_irrf.group(1) if match_irrf else None)
-
-                    lista_geral_consolidados.append(dados_funcionario.copy())
-
-                    # --- RUBRICAS (DETALHE) ---
-                    chaves_rubrica = {
-                        'competencia': dados_funcionario.get('competencia'),
-                        'tipo_calculo': dados_funcionario.get('tipo_calculo'),
-                        'departamento': dados_funcionario.get('departamento'),
-                        'vinculo': dados_funcionario.get('vinculo'),
-                        'nome_funcionario': dados_funcionario.get('nome_funcionario'),
-                        'cpf': dados_funcionario.get('cpf'),
-                        # --- CORREÇÃO APLICADA AQUI ---
-                        'situacao': dados_funcionario.get('situacao')
-                    }
-
-                    inicio_tabela = bloco.find("CPF:")
-                    if inicio_tabela == -1: inicio_tabela = bloco.find("Matrícula:")
-
-                    fim_tabela_padrao = bloco.find("\nND:")
-                    fim_tabela_ferias = bloco.find("Total de Proventos")
-                    if fim_tabela_ferias == -1: fim_tabela_ferias = bloco.find("Base INSS Férias")
-
-                    fim_tabela = fim_tabela_padrao if fim_tabela_padrao != -1 else fim_tabela_ferias
-
-                    rubricas_neste_func = []
-                    if inicio_tabela != -1 and fim_tabela != -1:
-                        tabela_str = bloco[inicio_tabela:fim_tabela].split('\n')[1:]
-                        for linha in tabela_str:
-                            if not re.search(r'\d', linha): continue
-
-                            padrao_holerite = r'(\d+)\s+(.*?)\s+([\d\.,]+)\s+([PD])(?=\s+\d{2,}|$)'
-                            padrao_ferias = r'(\d+)\s+(.*?)\s+[\d\.,/%]+\s+([\d\.,]+)\s+([PD])(?=\s+\d{2,}|$)'
-
-                            matches_ferias = list(re.finditer(padrao_ferias, linha))
-                            matches_holerite = list(re.finditer(padrao_holerite, linha))
-                            
-                            # Lógica original de prioridade
-                            matches = matches_ferias if len(matches_ferias) > len(matches_holerite) else matches_holerite
-
-                            for match in matches:
-                                valor_limpo = limpar_valor_moeda(match.group(3))
-                                if not valor_limpo: continue
-
-                                cod_l, nome_l, tipo_l_map = mapear_rubrica_codigo(match.group(1), match.group(2))
-                                tipo_detectado = match.group(4)
-                                tipo_final = tipo_l_map if tipo_l_map else ('Provento' if tipo_detectado == 'P' else 'Desconto')
-
-                                if tipo_l_map and tipo_l_map[0] != tipo_detectado:
-                                     tipo_final = 'Provento' if tipo_detectado == 'P' else 'Desconto'
-
-                                rubricas_neste_func.append({
-                                    **chaves_rubrica,
-                                    'codigo_rubrica': cod_l,
-                                    'nome_rubrica': nome_l,
-                                    'tipo_rubrica': tipo_final,
-                                    'valor_rubrica': valor_limpo
-                                })
-                    
-                    if rubricas_neste_func:
-                        lista_geral_rubricas_detalhadas.extend(rubricas_neste_func)
-                    else:
-                        vazia = chaves_rubrica.copy()
-                        vazia.update({'codigo_rubrica': None, 'nome_rubrica': None, 'tipo_rubrica': None, 'valor_rubrica': 0.0})
-                        lista_geral_rubricas_detalhadas.append(vazia)
-
-        except Exception as e:
-            print(f"Erro ao ler PDF {nome_arquivo}: {e}")
-
-    return pd.DataFrame(lista_geral_consolidados), pd.DataFrame(lista_geral_rubricas_detalhadas)
+def _chave_competencia(caminho_pdf, dir_cache=None, backend=BACKEND_PADRAO):
+    """
+    Descobre a competência provável do PDF só pela primeira página
+    (ou pelo cache de texto, se existir), para ordenar os arquivos.
+    Retorna uma chave ordenável (ano, mês); desconhecida vai para o final.
+    """
+    try:
+        paginas = ler_paginas(dir_cache, _chave_texto(caminho_pdf, backend)) if dir_cache else None
+        if paginas is None:
+            paginas = extrair_paginas(caminho_pdf, backend, max_paginas=1) or [""]
+        competencia = extrair_info_base(paginas[0])['competencia']
+        mes, ano = competencia.split('/')
+        return int(ano), int(mes)
+    except Exception:
+        return 9999, 99
+
+
+def processar_pdfs_em_lotes(pasta_path, workers=None, manifesto=None, dir_cache=None,
+                            cache_max_bytes=None, agrupar_por='arquivo', backend=BACKEND_PADRAO):
+    """
+    Versão streaming do processar_pdfs: gera (df_consolidado, df_detalhado)
+    por lote em vez de montar a pasta inteira na memória.
+
+    agrupar_por='arquivo' gera um lote por PDF. agrupar_por='competencia'
+    ordena os PDFs pela competência da primeira página e junta os PDFs
+    consecutivos da mesma competência num único lote.
+    """
+    caminhos = _listar_pdfs(pasta_path)
+    if not caminhos:
+        return
+
+    if agrupar_por == 'competencia':
+        caminhos = sorted(caminhos, key=lambda c: _chave_competencia(c, dir_cache, backend))
+
+    lote_consol, lote_detalhe, chave_lote = [], [], None
+    for caminho, (consolidados, rubricas, _) in _iterar_resultados(caminhos, workers, manifesto, dir_cache, backend):
+        if not consolidados:
+            continue
+        if agrupar_por == 'competencia':
+            chave = frozenset(d.get('competencia') for d in consolidados)
+        else:
+            chave = caminho
+        if lote_consol and chave != chave_lote:
+            yield _montar_dataframes(lote_consol, lote_detalhe)
+            lote_consol, lote_detalhe = [], []
+        lote_consol.extend(consolidados)
+        lote_detalhe.extend(rubricas)
+        chave_lote = chave
+
+    if lote_consol:
+        yield _montar_dataframes(lote_consol, lote_detalhe)
+
+    if dir_cache and cache_max_bytes:
+        aplicar_limite(dir_cache, cache_max_bytes)
 
 
 # -----------------------------------------------------------------------------
 # 3. EXTRAÇÃO API SOLIDES
 # -----------------------------------------------------------------------------
 
-def extrair_api_solides(token):
-    base_url = "https://app.solides.com/pt-BR/api/v1"
-    headers = {"Authorization": f"Token token={token}", "Accept": "application/json"}
-    colabs_lista = []
-    page = 1
-    
-    print("--- API Solides: Buscando lista de IDs... ---")
-    while True:
-        try:
-            r = requests.get(f"{base_url}/colaboradores", headers=headers, params={'page': page, 'page_size': 100, 'status': 'todos'})
-            if r.status_code != 200: break
-            data = r.json()
-            if not data: break
-            colabs_lista.extend(data)
-            print(f"Página {page} carregada...")
-            page += 1
-        except Exception: break
-
-    print(f"--- API Solides: Buscando detalhes de {len(colabs_lista)} colaboradores... ---")
-    detalhes_finais = []
-    for i, item in enumerate(colabs_lista):
-        cid = item.get('id')
-        if not cid: continue
+def _em_segundo_plano(gerador, tamanho_fila=2, continuar=nullcontext):
+    """
+    Consome o gerador numa thread produtora, com no máximo `tamanho_fila` itens
+    adiantados: quem consome (transformação/carga) trabalha enquanto as próximas
+    páginas ainda estão sendo baixadas. Exceções do produtor sobem no consumidor;
+    se o consumidor parar antes do fim, o produtor é encerrado (gerador fechado).
+    `continuar()` dá o contexto das medições feitas na thread produtora (ver
+    contexto_atual em src/metrics.py).
+    """
+    fila = queue.Queue(maxsize=tamanho_fila)
+    parar = threading.Event()
+
+    def colocar(mensagem):
+        while not parar.is_set():
+            try:
+                fila.put(mensagem, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produzir():
         try:
-            r_det = requests.get(f"{base_url}/colaboradores/{cid}", headers=headers)
-            if r_det.status_code == 200: detalhes_finais.append(r_det.json())
-            else: detalhes_finais.append(item)
-        except: detalhes_finais.append(item)
-            
-    return detalhes_finais
\ No newline at end of file
+            with continuar():
+                for item in gerador:
+                    if not colocar(('item', item)):
+                        return
+            colocar(('fim', None))
+        except BaseException as e:
+            colocar(('erro', e))
+        finally:
+            gerador.close()
+
+    threading.Thread(target=produzir, daemon=True).start()
+    try:
+        while True:
+            tipo, valor = fila.get()
+            if tipo == 'fim':
+                return
+            if tipo == 'erro':
+                raise valor
+            yield valor
+    finally:
+        parar.set()
+
+
+def _paginas_api_solides(token, marca, ids_locais, base_url, workers, rps, dir_landing, run_id=None):
+    limitador = LimitadorTaxa(rps)
+    dir_tmp = iniciar_snapshot(dir_landing, run_id or novo_run_id()) if dir_landing else None
+    n_listagem = n_detalhes = n_falhas = 0
+    marca_sync = None
+    limite = f"até {rps:g} req/s" if rps else "sem limite de taxa"
+    print(f"--- API Solides: listagem e detalhes página a página ({workers} conexão(ões), {limite})... ---")
+    with criar_sessao(token, workers) as sessao, ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        paginas = medir_iteracao(iterar_paginas_colaboradores(sessao, base_url, limitador), 'busca/listagem', len)
+        for numero, itens in enumerate(paginas, start=1):
+            if dir_tmp:
+                with medir('busca/landing', linhas_entrada=len(itens)):
+                    gravar_pagina_listagem(dir_tmp, numero, itens)
+            selecionados = selecionar_para_detalhe(itens, marca, ids_locais)
+            with medir('busca/detalhes', linhas_entrada=len(selecionados)) as m:
+                detalhes = buscar_detalhes(sessao, base_url, selecionados, limitador, executor=executor)
+                m['linhas_saida'] = len(detalhes)
+            if dir_tmp:
+                with medir('busca/landing', linhas_entrada=len(detalhes)):
+                    gravar_lote_detalhes(dir_tmp, numero, detalhes)
+            n_listagem += len(itens)
+            n_detalhes += len(detalhes)
+            n_falhas += len(ids_com_falha(detalhes))
+            marca_pagina = marca_da_listagem(itens)
+            if marca_pagina is not None and (marca_sync is None or marca_pagina > marca_sync):
+                marca_sync = marca_pagina
+            yield itens, detalhes
+
+    if marca is not None:
+        print(f"Sincronização incremental (desde {marca}): {n_detalhes} de "
+              f"{n_listagem} colaboradores alterados ou novos.")
+    print(f"[OK] API Solides: {n_detalhes} detalhe(s) de {n_listagem} colaborador(es) listado(s).")
+    if n_falhas:
+        print(f"[AVISO] {n_falhas} detalhe(s) não puderam ser buscados: entram com os dados da listagem e "
+              f"a marca d'água não passa deles (serão rebuscados na próxima sincronização).")
+    if dir_tmp:
+        dir_snapshot = finalizar_snapshot(dir_tmp, {
+            'base_url': base_url,
+            'modo': 'incremental' if marca is not None else 'completa',
+            'marca_anterior': marca,
+            'marca_sync': marca_sync,
+            'n_listagem': n_listagem,
+            'n_detalhes': n_detalhes,
+            'n_falhas_detalhe': n_falhas,
+        })
+        print(f"[OK] Respostas brutas da API gravadas em {dir_snapshot}")
+
+
+def iterar_api_solides(token, marca=None, ids_locais=None, base_url=BASE_URL_PADRAO,
+                       workers=WORKERS_PADRAO, rps=RPS_PADRAO, dir_landing=None, run_id=None):
+    """
+    Sincroniza com a API Solides página a página: gera (itens da página da
+    listagem, detalhes buscados para ela), sem acumular a listagem inteira.
+
+    Com `marca` (maior updated_at da última sincronização), só busca o detalhe de
+    quem mudou desde então ou ainda não existe em `ids_locais`; sem marca, de todos.
+    Os detalhes são buscados por `workers` threads sobre uma Session com
+    keep-alive, limitadas a `rps` requisições por segundo (token bucket que
+    respeita 429/Retry-After), e saem na ordem da listagem. A busca roda numa
+    thread à frente do consumidor (até 2 páginas adiantadas).
+
+    Com `dir_landing`, as respostas brutas ficam gravadas num snapshot NDJSON
+    comprimido (src/landing.py), que depois pode ser reprocessado sem rede;
+    `run_id` dá o nome do snapshot (padrão: data/hora atual).
+    """
+    return _em_segundo_plano(_paginas_api_solides(token, marca, ids_locais, base_url, workers, rps, dir_landing,
+                                                  run_id),
+                             continuar=contexto_atual())
+
+
+def sincronizar_api_solides(token, marca=None, ids_locais=None, base_url=BASE_URL_PADRAO,
+                            workers=WORKERS_PADRAO, rps=RPS_PADRAO, dir_landing=None):
+    """
+    Como iterar_api_solides, mas junta tudo em memória.
+
+    :return: (detalhes, listagem completa)
+    """
+    detalhes, colabs_lista = [], []
+    for itens, detalhes_pagina in iterar_api_solides(token, marca, ids_locais, base_url, workers, rps, dir_landing):
+        colabs_lista.extend(itens)
+        detalhes.extend(detalhes_pagina)
+    return detalhes, colabs_lista
+
+
+def replay_api_solides(dir_snapshot):
+    """
+    Lê um snapshot da zona de pouso no lugar da API (sem rede). As páginas vêm
+    no mesmo formato de iterar_api_solides, uma por vez, lidas do disco.
+
+    :return: (gerador de (itens da listagem, detalhes), metadados do snapshot)
+    """
+    metadados = ler_indice(dir_snapshot)
+    print(f"--- API Solides: replay de {dir_snapshot} ({metadados['modo']}, "
+          f"{metadados['n_detalhes']} detalhes de {metadados['n_listagem']} colaboradores) ---")
+    return iterar_paginas(dir_snapshot), metadados
+
+
+def extrair_api_solides(token, base_url=BASE_URL_PADRAO, workers=WORKERS_PADRAO, rps=RPS_PADRAO):
+    """
+    Sincronização completa: detalhe de todos os colaboradores da listagem.
+    """
+    detalhes, _ = sincronizar_api_solides(token, base_url=base_url, workers=workers, rps=rps)
+    return detalhes
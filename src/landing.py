@@ -0,0 +1,142 @@
+# src/landing.py
+import os
+import gzip
+import json
+import shutil
+import time
+from datetime import datetime
+
+# Zona de pouso da API Solides: cada execução grava um snapshot <run_id>/ com
+# as respostas brutas em NDJSON comprimido, uma página da listagem por arquivo
+# (listagem_0001.ndjson.gz, ...) e os detalhes buscados para cada página em
+# detalhes_0001.ndjson.gz, ... (páginas sem detalhe não geram arquivo), na ordem
+# da listagem. O índice é gravado por último: sem ele o snapshot não é válido.
+ARQUIVO_INDICE = 'snapshot.json'
+
+# Um .tmp de outra execução só é lixo depois disso: antes pode ser uma busca
+# ainda em andamento (execuções sobrepostas gravam na mesma zona de pouso).
+IDADE_MAXIMA_TMP = 24 * 3600
+
+
+def novo_run_id():
+    """
+    Identificador da execução (data/hora local, ordenável).
+    """
+    return datetime.now().strftime('%Y%m%dT%H%M%S')
+
+
+def _gravar_ndjson(caminho, registros):
+    with gzip.open(caminho, 'wt', encoding='utf-8', compresslevel=6) as f:
+        for registro in registros:
+            f.write(json.dumps(registro, ensure_ascii=False))
+            f.write('\n')
+
+
+def iniciar_snapshot(dir_landing, run_id):
+    """
+    Cria o diretório temporário do snapshot e devolve o caminho dele.
+    """
+    dir_tmp = os.path.join(dir_landing, f"{run_id}.tmp")
+    shutil.rmtree(dir_tmp, ignore_errors=True)
+    os.makedirs(dir_tmp)
+    return dir_tmp
+
+
+def gravar_pagina_listagem(dir_tmp, pagina, registros):
+    """
+    Grava uma página da listagem de /colaboradores assim que ela chega.
+    """
+    _gravar_ndjson(os.path.join(dir_tmp, f"listagem_{pagina:04d}.ndjson.gz"), registros)
+
+
+def gravar_lote_detalhes(dir_tmp, pagina, detalhes):
+    """
+    Grava os detalhes buscados para uma página da listagem (nada se vazio).
+    """
+    if detalhes:
+        _gravar_ndjson(os.path.join(dir_tmp, f"detalhes_{pagina:04d}.ndjson.gz"), detalhes)
+
+
+def finalizar_snapshot(dir_tmp, metadados):
+    """
+    Grava o índice (metadados + lista de arquivos) e publica o snapshot com
+    um rename atômico. Devolve o caminho final.
+    """
+    arquivos = sorted(n for n in os.listdir(dir_tmp) if n.endswith('.ndjson.gz'))
+    indice = {'run_id': os.path.basename(dir_tmp)[:-len('.tmp')],
+              'data_captura': datetime.now().isoformat(timespec='seconds'),
+              **metadados,
+              'listagem': [n for n in arquivos if n.startswith('listagem_')],
+              'detalhes': [n for n in arquivos if n.startswith('detalhes_')]}
+    with open(os.path.join(dir_tmp, ARQUIVO_INDICE), 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2, default=str)
+    dir_final = dir_tmp[:-len('.tmp')]
+    shutil.rmtree(dir_final, ignore_errors=True)
+    os.replace(dir_tmp, dir_final)
+    return dir_final
+
+
+def resolver_snapshot(dir_landing, referencia):
+    """
+    Aceita o caminho de um snapshot ou só o run_id (procurado em dir_landing).
+    Levanta FileNotFoundError se o snapshot não existir ou estiver incompleto.
+    """
+    dir_snapshot = referencia if os.path.isdir(referencia) else os.path.join(dir_landing, referencia)
+    if not os.path.exists(os.path.join(dir_snapshot, ARQUIVO_INDICE)):
+        raise FileNotFoundError(f"Snapshot da API não encontrado ou incompleto: {dir_snapshot}")
+    return dir_snapshot
+
+
+def aplicar_retencao(dir_landing, manter, run_id=None):
+    """
+    Mantém só os `manter` snapshots mais recentes (os dados brutos têm CPF,
+    salário e dados bancários) e apaga diretórios .tmp de execuções interrompidas:
+    o da própria execução (run_id) e os de outras sem alteração há mais de
+    IDADE_MAXIMA_TMP segundos.
+    """
+    if not os.path.isdir(dir_landing):
+        return
+    nomes = sorted(os.listdir(dir_landing))
+    completos = [n for n in nomes if os.path.exists(os.path.join(dir_landing, n, ARQUIVO_INDICE))]
+    limite = time.time() - IDADE_MAXIMA_TMP
+    abandonados = [n for n in nomes if n.endswith('.tmp')
+                   and (n == f"{run_id}.tmp" or _modificado_em(os.path.join(dir_landing, n)) < limite)]
+    removidos = abandonados + completos[:max(0, len(completos) - manter)]
+    for nome in removidos:
+        shutil.rmtree(os.path.join(dir_landing, nome), ignore_errors=True)
+    if removidos:
+        print(f"[OK] Zona de pouso da API: {len(removidos)} snapshot(s) antigo(s) removido(s).")
+
+
+def _modificado_em(dir_snapshot):
+    """
+    Última gravação no diretório (ele mesmo ou o arquivo mais recente dele).
+    """
+    try:
+        with os.scandir(dir_snapshot) as entradas:
+            return max([os.path.getmtime(dir_snapshot)] + [e.stat().st_mtime for e in entradas])
+    except OSError:
+        return time.time()
+
+
+def ler_indice(dir_snapshot):
+    with open(os.path.join(dir_snapshot, ARQUIVO_INDICE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _ler_ndjson(caminho):
+    with gzip.open(caminho, 'rt', encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f]
+
+
+def iterar_paginas(dir_snapshot):
+    """
+    Gera (itens da listagem, detalhes) página a página, na ordem da captura,
+    sem carregar o snapshot inteiro na memória.
+    """
+    indice = ler_indice(dir_snapshot)
+    detalhes = set(indice['detalhes'])
+    for nome in indice['listagem']:
+        nome_detalhes = nome.replace('listagem_', 'detalhes_', 1)
+        yield (_ler_ndjson(os.path.join(dir_snapshot, nome)),
+               _ler_ndjson(os.path.join(dir_snapshot, nome_detalhes)) if nome_detalhes in detalhes else [])
@@ -1,35 +1,98 @@
+from datetime import date
+
 import pandas as pd
 from sqlalchemy import text
-from .constants import SCHEMA_TOTAIS, SCHEMA_RUBRICAS
+from .constants import (SCHEMA_TOTAIS, SCHEMA_RUBRICAS, SCHEMA_BASE_CSV, SCHEMA_STAGING_API,
+                        SCHEMA_BENEFICIOS_API, SCHEMA_LISTAGEM_API)
+from .bulk import carregar_staging, criar_staging, anexar_staging, indexar_staging, METODO_CARGA_PADRAO
+from .metrics import medir
+from .migrations import aplicar_migracoes, nome_particao, FATOS_PARTICIONADAS, COLUNAS_FATOS
 
 
 def garantir_schema_banco(engine, schema_name):
     """
-    Garante que o schema e a extensão unaccent existam no banco.
+    Garante que o schema e a extensão unaccent existam no banco e aplica as
+    migrações pendentes (src/migrations.py). Todo o DDL das tabelas fica lá:
+    as funções de carga abaixo só fazem DML.
     """
     with engine.begin() as conn:
         conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema_name}"'))
         conn.execute(text(f'CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA "{schema_name}"'))
+    aplicar_migracoes(engine, schema_name)
+
+
+def identidade_destino(engine, schema):
+    """
+    Identifica o destino das cargas para o manifesto de PDFs: servidor, banco e
+    schema, mais os OIDs do banco e do schema, que mudam quando eles são apagados
+    e recriados. Com o mesmo nome, um banco zerado não passa por um já carregado.
+    """
+    with engine.connect() as conn:
+        oid_banco, oid_schema = conn.execute(text(
+            "SELECT d.oid, (SELECT n.oid FROM pg_namespace n WHERE n.nspname = :schema) "
+            "FROM pg_database d WHERE d.datname = current_database()"), {'schema': schema}).one()
+    return {
+        'servidor': f"{engine.url.host}:{engine.url.port}",
+        'banco': engine.url.database,
+        'schema': schema,
+        'oid_banco': int(oid_banco),
+        'oid_schema': int(oid_schema) if oid_schema is not None else None,
+    }
 
 
 # --------------------------------------------------------------------------------
 # DIMENSÃO CALENDÁRIO
 # --------------------------------------------------------------------------------
-def carregar_dim_calendario(engine, schema):
+# Meses além da última competência (ou de hoje) que o calendário já cobre
+HORIZONTE_CALENDARIO_MESES = 24
+# Admissões anteriores a este ano não puxam o início do calendário
+ANO_MINIMO_CALENDARIO = 1950
+
+
+def intervalo_calendario(conn, schema, horizonte_meses=HORIZONTE_CALENDARIO_MESES,
+                         ano_minimo=ANO_MINIMO_CALENDARIO):
+    """
+    (início, fim) que dim_calendario precisa cobrir: de 1º de janeiro do ano da
+    competência ou admissão mais antiga carregada até 31 de dezembro do ano em
+    que cai a última competência (ou hoje, se for depois) mais o horizonte.
+    As admissões não estendem o fim: uma data errada no futuro geraria décadas de dias.
+    Pelo mesmo motivo, admissões anteriores a `ano_minimo` (01/01/1900 digitado no
+    cadastro) são ignoradas no início; as competências da folha sempre contam.
+    """
+    menor, maior = conn.execute(text(f"""
+        SELECT LEAST((SELECT MIN(competencia) FROM "{schema}".fato_folha_consolidada),
+                     (SELECT MIN(data_admissao_csv) FROM "{schema}".dim_colaboradores_base
+                      WHERE data_admissao_csv >= :piso),
+                     (SELECT MIN(data_admissao) FROM "{schema}".dim_colaboradores
+                      WHERE data_admissao >= :piso),
+                     current_date),
+               GREATEST((SELECT MAX(competencia) FROM "{schema}".fato_folha_consolidada), current_date)
+    """), {'piso': date(ano_minimo, 1, 1)}).one()
+    ano_fim = maior.year + (maior.month - 1 + horizonte_meses) // 12
+    return date(menor.year, 1, 1), date(ano_fim, 12, 31)
+
+
+def carregar_dim_calendario(engine, schema, horizonte_meses=HORIZONTE_CALENDARIO_MESES,
+                            ano_minimo=ANO_MINIMO_CALENDARIO):
+    """
+    Garante que dim_calendario cubra o intervalo_calendario. A cobertura é
+    conferida por min/max/count (na chave primária) e só as datas que faltam
+    são geradas: com o calendário em dia, a etapa não escreve nada.
+    """
     nome_tabela = "dim_calendario"
-    sql = text(f"""
-    CREATE TABLE IF NOT EXISTS "{schema}".{nome_tabela} (
-        data DATE PRIMARY KEY,
-        ano INTEGER, mes INTEGER, dia INTEGER, trimestre INTEGER, semestre INTEGER,
-        dia_da_semana INTEGER, nome_dia_da_semana VARCHAR(20),
-        nome_mes VARCHAR(20), nome_mes_abrev CHAR(3), ano_mes VARCHAR(7), 
-        dia_do_ano INTEGER, semana_do_ano INTEGER
-    );
-    DO $$
-    DECLARE
-        data_inicio DATE := '2023-01-01'; 
-        data_fim DATE := '2030-12-31';
-    BEGIN
+    with engine.begin() as conn:
+        inicio, fim = intervalo_calendario(conn, schema, horizonte_meses, ano_minimo)
+        menor, maior, dias = conn.execute(text(
+            f'SELECT MIN(data), MAX(data), COUNT(*) FROM "{schema}".{nome_tabela}')).one()
+        if dias and menor <= inicio and maior >= fim and dias == (maior - menor).days + 1:
+            print(f"Dimensão Calendário em dia ({menor} a {maior}).")
+            return
+        if dias:
+            # Preenche também eventuais buracos no que já existe
+            inicio, fim = min(inicio, menor), max(fim, maior)
+
+        conn.execute(text("""
+        DO $$
         BEGIN
             SET LOCAL lc_time = 'pt_BR.UTF-8';
         EXCEPTION WHEN OTHERS THEN
@@ -38,8 +101,9 @@ def carregar_dim_calendario(engine, schema):
             EXCEPTION WHEN OTHERS THEN
                 RAISE NOTICE 'Não foi possível definir o locale pt_BR.';
             END;
-        END;
-
+        END $$;
+        """))
+        inseridas = conn.execute(text(f"""
         INSERT INTO "{schema}".{nome_tabela} (
             data, ano, mes, dia, trimestre, semestre,
             dia_da_semana, nome_dia_da_semana, nome_mes, nome_mes_abrev,
@@ -52,30 +116,42 @@ def carregar_dim_calendario(engine, schema):
             EXTRACT(DAY FROM d) AS dia,
             EXTRACT(QUARTER FROM d) AS trimestre,
             CASE WHEN EXTRACT(MONTH FROM d) <= 6 THEN 1 ELSE 2 END AS semestre,
-            EXTRACT(DOW FROM d) AS dia_da_semana, 
+            EXTRACT(DOW FROM d) AS dia_da_semana,
             to_char(d, 'TMDay') AS nome_dia_da_semana,
             to_char(d, 'TMMonth') AS nome_mes,
             to_char(d, 'TMMon') AS nome_mes_abrev,
             to_char(d, 'YYYY-MM') AS ano_mes,
             EXTRACT(DOY FROM d) AS dia_do_ano,
             EXTRACT(WEEK FROM d) AS semana_do_ano
-        FROM generate_series(data_inicio, data_fim, '1 day'::interval) d
-        ON CONFLICT (data) DO NOTHING; 
-    END $$;
-    """)
-
-    with engine.begin() as conn:
-        conn.execute(sql)
-    print("Dimensão Calendário verificada/atualizada.")
+        FROM (
+            -- só as datas que faltam (o to_char com locale roda apenas para elas)
+            SELECT CAST(serie AS DATE) AS d
+            FROM generate_series(CAST(:inicio AS DATE), CAST(:fim AS DATE), INTERVAL '1 day') AS serie
+            WHERE NOT EXISTS (SELECT 1 FROM "{schema}".{nome_tabela} cal WHERE cal.data = CAST(serie AS DATE))
+        ) AS faltantes
+        ON CONFLICT (data) DO NOTHING;
+        """), {'inicio': inicio, 'fim': fim}).rowcount
+    print(f"Dimensão Calendário: {inseridas} data(s) incluída(s), cobre {inicio} a {fim}.")
 
 
 # --------------------------------------------------------------------------------
 # CARGA FATOS DE FOLHA (PDFs)
 # --------------------------------------------------------------------------------
-def carregar_fatos_folha(df_consol, df_detalhe, engine, schema):
+def carregar_fatos_folha(df_consol, df_detalhe, engine, schema, comps_carregadas=None,
+                         metodo_carga=METODO_CARGA_PADRAO):
     """
     Carrega as tabelas fato_folha_consolidada e fato_folha_detalhada.
+    Os stagings são tabelas temporárias da transação de cada etapa, carregadas
+    por COPY (ou to_sql, ver src/bulk.py).
+
+    As fatos são particionadas por mês de competência: cada mês recarregado é
+    montado numa partição nova e trocado pela atual (_carregar_fato_particionada).
+    No modo streaming (vários lotes na mesma execução), `comps_carregadas` é um
+    set compartilhado entre as chamadas: o mês só é trocado no primeiro lote em
+    que aparece; os lotes seguintes apenas inserem.
     """
+    if comps_carregadas is None:
+        comps_carregadas = set()
 
     # --- Parte A: Popular/Atualizar Dimensão Base ---
     if not df_consol.empty:
@@ -90,19 +166,9 @@ def carregar_fatos_folha(df_consol, df_detalhe, engine, schema):
         })
 
         # Staging: O Pandas agora manda None (NULL) real, então o SQL não precisa de CAST
-        df_base_load.to_sql("stg_base_csv_temp", engine, schema=schema, if_exists='replace', index=False)
+        # dtype explícito: um lote pequeno (modo streaming) pode ter colunas de data 100% nulas
 
         sql_base = f"""
-        CREATE TABLE IF NOT EXISTS "{schema}"."dim_colaboradores_base" (
-            colaborador_sk SERIAL PRIMARY KEY,
-            nome_colaborador VARCHAR(255) NOT NULL,
-            cpf VARCHAR(20) UNIQUE NOT NULL,
-            data_admissao_csv DATE, data_demissao_csv DATE,
-            situacao_csv VARCHAR(100), departamento_csv VARCHAR(255), cargo_csv VARCHAR(255)
-        );
-        INSERT INTO "{schema}"."dim_colaboradores_base" (colaborador_sk, nome_colaborador, cpf)
-        VALUES (0, 'Desconhecido', 'N/A') ON CONFLICT (colaborador_sk) DO NOTHING;
-
         INSERT INTO "{schema}"."dim_colaboradores_base" (
             nome_colaborador, cpf, 
             data_admissao_csv, data_demissao_csv, situacao_csv, 
@@ -113,7 +179,7 @@ def carregar_fatos_folha(df_consol, df_detalhe, engine, schema):
             data_admissao_csv,  -- Inserção direta (Python já tratou)
             data_demissao_csv, 
             situacao_csv, departamento_csv, cargo_csv
-        FROM "{schema}"."stg_base_csv_temp"
+        FROM pg_temp."stg_base_csv_temp"
         WHERE cpf IS NOT NULL AND cpf != 'N/A'
         ORDER BY cpf, nome_colaborador DESC
         ON CONFLICT (cpf) DO UPDATE SET
@@ -123,107 +189,180 @@ def carregar_fatos_folha(df_consol, df_detalhe, engine, schema):
             situacao_csv = COALESCE(EXCLUDED.situacao_csv, "{schema}"."dim_colaboradores_base".situacao_csv),
             departamento_csv = COALESCE(EXCLUDED.departamento_csv, "{schema}"."dim_colaboradores_base".departamento_csv),
             cargo_csv = COALESCE(EXCLUDED.cargo_csv, "{schema}"."dim_colaboradores_base".cargo_csv);
-
-        DROP TABLE IF EXISTS "{schema}"."stg_base_csv_temp";
         """
 
         with engine.begin() as conn:
-            conn.execute(text(sql_base))
+            with medir('dim_colaboradores_base/staging', linhas_entrada=len(df_base_load)):
+                carregar_staging(df_base_load, "stg_base_csv_temp", conn, dtype=SCHEMA_BASE_CSV,
+                                 indices=['cpf'], metodo=metodo_carga)
+            with medir('dim_colaboradores_base/sql') as m:
+                m['linhas_saida'] = conn.execute(text(sql_base)).rowcount
             print("Dimensão Colaboradores Base atualizada via CSV.")
 
     # --- Parte B: Fato Consolidada ---
     if not df_consol.empty:
-        comps_consol = tuple(df_consol['competencia'].dropna().unique())
-        if comps_consol:
-            df_consol.to_sql("stg_folha_consol", engine, schema=schema, if_exists='replace', index=False,
-                             dtype=SCHEMA_TOTAIS)
-
-            sql_consol = f"""
-                CREATE TABLE IF NOT EXISTS "{schema}"."fato_folha_consolidada" (
-                    fato_folha_id SERIAL PRIMARY KEY,
-                    colaborador_sk INTEGER, competencia DATE,
-                    nome_funcionario_csv VARCHAR(255), centro_de_custo VARCHAR(255), 
-                    cargo_nome_csv VARCHAR(255), cpf_csv VARCHAR(11),
-                    situacao_csv VARCHAR(100), tipo_calculo_csv VARCHAR(100),
-                    salario_contratual NUMERIC(12, 2), total_proventos NUMERIC(12, 2),
-                    total_descontos NUMERIC(12, 2), valor_liquido NUMERIC(12, 2),
-                    base_inss NUMERIC(12, 2), base_fgts NUMERIC(12, 2),
-                    valor_fgts NUMERIC(12, 2), base_irrf NUMERIC(12, 2),
-                    FOREIGN KEY (colaborador_sk) REFERENCES "{schema}"."dim_colaboradores_base"(colaborador_sk)
-                );
-
-                DELETE FROM "{schema}"."fato_folha_consolidada" WHERE competencia IN :comps;
-
-                INSERT INTO "{schema}"."fato_folha_consolidada" (
-                    colaborador_sk, competencia, nome_funcionario_csv, centro_de_custo, 
-                    cargo_nome_csv, cpf_csv, situacao_csv, tipo_calculo_csv,
-                    salario_contratual, total_proventos, total_descontos, valor_liquido,
-                    base_inss, base_fgts, valor_fgts, base_irrf
-                )
+        meses_consol = {_mes(c) for c in df_consol['competencia'].dropna().unique()}
+        sem_competencia = int(df_consol['competencia'].isna().sum())
+        if sem_competencia:
+            print(f"[AVISO] {sem_competencia} linha(s) da fato consolidada sem competência não serão carregadas.")
+        if meses_consol:
+            select_consol = f"""
                 SELECT
                     COALESCE(base.colaborador_sk, 0), 
                     stg.competencia, 
                     stg.nome_funcionario, stg.departamento,
                     stg.cargo, stg.cpf, stg.situacao, stg.tipo_calculo,
-                    stg.salario_contratual, stg.total_proventos, stg.total_descontos, stg.valor_liquido,
-                    stg.base_inss, stg.base_fgts, stg.valor_fgts, stg.base_irrf
-                FROM "{schema}"."stg_folha_consol" stg
-                LEFT JOIN "{schema}"."dim_colaboradores_base" base ON stg.cpf = base.cpf;
+                    -- staging em centavos (BIGINT)
+                    stg.salario_contratual / 100.0, stg.total_proventos / 100.0,
+                    stg.total_descontos / 100.0, stg.valor_liquido / 100.0,
+                    stg.base_inss / 100.0, stg.base_fgts / 100.0,
+                    stg.valor_fgts / 100.0, stg.base_irrf / 100.0
+                FROM pg_temp."stg_folha_consol" stg
+                LEFT JOIN "{schema}"."dim_colaboradores_base" base ON stg.cpf = base.cpf
             """
+            meses_trocar = sorted(m for m in meses_consol if ('consolidada', m) not in comps_carregadas)
             with engine.begin() as conn:
-                conn.execute(text(sql_consol), {'comps': comps_consol})
+                with medir('fato_folha_consolidada/staging', linhas_entrada=len(df_consol)):
+                    carregar_staging(df_consol, "stg_folha_consol", conn, dtype=SCHEMA_TOTAIS,
+                                     indices=['cpf', 'competencia'], metodo=metodo_carga)
+                with medir('fato_folha_consolidada/sql') as m:
+                    m['linhas_saida'] = _carregar_fato_particionada(conn, schema, 'fato_folha_consolidada',
+                                                                    select_consol, meses_trocar)
+            comps_carregadas.update(('consolidada', m) for m in meses_consol)
             print("Fato Consolidada carregada.")
 
     # --- Parte C: Fato Detalhada ---
     if not df_detalhe.empty:
-        comps_det = tuple(df_detalhe['competencia'].dropna().unique())
-        if comps_det:
-            df_detalhe.to_sql("stg_folha_detalhe", engine, schema=schema, if_exists='replace', index=False,
-                              dtype=SCHEMA_RUBRICAS)
-
-            sql_detalhe = f"""
-                CREATE TABLE IF NOT EXISTS "{schema}"."fato_folha_detalhada" (
-                    fato_rubrica_id SERIAL PRIMARY KEY,
-                    colaborador_sk INTEGER, competencia DATE,
-                    nome_funcionario_csv VARCHAR(255), centro_de_custo VARCHAR(255), cpf_csv VARCHAR(11),
-                    situacao_csv VARCHAR(100), tipo_calculo_csv VARCHAR(100),
-                    codigo_rubrica VARCHAR(100), nome_rubrica VARCHAR(255), tipo_rubrica VARCHAR(100),
-                    valor_rubrica NUMERIC(12, 2),
-                    FOREIGN KEY (colaborador_sk) REFERENCES "{schema}"."dim_colaboradores_base"(colaborador_sk)
-                );
-
-                DELETE FROM "{schema}"."fato_folha_detalhada" WHERE competencia IN :comps;
-
-                INSERT INTO "{schema}"."fato_folha_detalhada" (
-                    colaborador_sk, competencia, nome_funcionario_csv, centro_de_custo, cpf_csv,
-                    situacao_csv, tipo_calculo_csv, codigo_rubrica, nome_rubrica, tipo_rubrica, valor_rubrica
-                )
+        meses_det = {_mes(c) for c in df_detalhe['competencia'].dropna().unique()}
+        sem_competencia = int(df_detalhe['competencia'].isna().sum())
+        if sem_competencia:
+            print(f"[AVISO] {sem_competencia} linha(s) da fato detalhada sem competência não serão carregadas.")
+        if meses_det:
+            select_detalhe = f"""
                 SELECT
                     COALESCE(base.colaborador_sk, 0), 
                     stg.competencia, 
                     stg.nome_funcionario, stg.departamento, stg.cpf,
                     stg.situacao, stg.tipo_calculo, stg.codigo_rubrica, stg.nome_rubrica, stg.tipo_rubrica, 
-                    stg.valor_rubrica
-                FROM "{schema}"."stg_folha_detalhe" stg
-                LEFT JOIN "{schema}"."dim_colaboradores_base" base ON stg.cpf = base.cpf;
+                    stg.valor_rubrica / 100.0  -- staging em centavos (BIGINT)
+                FROM pg_temp."stg_folha_detalhe" stg
+                LEFT JOIN "{schema}"."dim_colaboradores_base" base ON stg.cpf = base.cpf
             """
+            meses_trocar = sorted(m for m in meses_det if ('detalhada', m) not in comps_carregadas)
             with engine.begin() as conn:
-                conn.execute(text(sql_detalhe), {'comps': comps_det})
+                with medir('fato_folha_detalhada/staging', linhas_entrada=len(df_detalhe)):
+                    carregar_staging(df_detalhe, "stg_folha_detalhe", conn, dtype=SCHEMA_RUBRICAS,
+                                     indices=['cpf', 'competencia'], metodo=metodo_carga)
+                with medir('fato_folha_detalhada/sql') as m:
+                    m['linhas_saida'] = _carregar_fato_particionada(conn, schema, 'fato_folha_detalhada',
+                                                                    select_detalhe, meses_trocar)
+            comps_carregadas.update(('detalhada', m) for m in meses_det)
             print("Fato Detalhada carregada.")
 
 
+def _mes(competencia):
+    return date(competencia.year, competencia.month, 1)
+
+
+def _proximo_mes(mes):
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def _carregar_fato_particionada(conn, schema, tabela, sql_select, meses_trocar):
+    """
+    Carrega na fato particionada por mês (src/migrations.py) as linhas de
+    `sql_select`: um SELECT sobre o staging, sem WHERE, com as colunas da fato
+    na ordem de COLUNAS_FATOS.
+
+    Cada mês de `meses_trocar` é montado do zero numa tabela avulsa (carga,
+    chave primária, checagem do mês e FK validadas antes de qualquer lock que
+    o BI sinta) e entra no lugar da partição atual com DETACH/ATTACH no fim da
+    transação: a troca só mexe no catálogo, e o mês antigo sai inteiro com o
+    DROP, sem DELETE nem tuplas mortas. As linhas dos outros meses (lotes
+    seguintes do modo streaming) entram por INSERT. Linhas sem competência
+    não têm partição e não são carregadas. Devolve o número de linhas carregadas.
+    """
+    coluna_id = FATOS_PARTICIONADAS[tabela]
+    nomes = ", ".join(nome for nome, _ in COLUNAS_FATOS[tabela])
+    linhas = conn.execute(text(f"""
+        INSERT INTO "{schema}"."{tabela}" ({nomes})
+        {sql_select}
+        WHERE stg.competencia IS NOT NULL
+          AND CAST(date_trunc('month', stg.competencia) AS DATE) <> ALL(CAST(:meses AS DATE[]));
+    """), {'meses': meses_trocar}).rowcount
+
+    for mes in meses_trocar:
+        nova = f"{nome_particao(tabela, mes)}_nova"
+        linhas += conn.execute(text(f"""
+            CREATE TABLE "{schema}"."{nova}" (LIKE "{schema}"."{tabela}" INCLUDING DEFAULTS);
+            INSERT INTO "{schema}"."{nova}" ({nomes})
+            {sql_select}
+            WHERE stg.competencia >= :inicio AND stg.competencia < :fim;
+        """), {'inicio': mes, 'fim': _proximo_mes(mes)}).rowcount
+        conn.execute(text(f"""
+            ALTER TABLE "{schema}"."{nova}"
+                ADD CONSTRAINT "{nova}_pkey" PRIMARY KEY ({coluna_id}, competencia),
+                ADD CONSTRAINT competencia_no_mes CHECK (competencia IS NOT NULL
+                    AND competencia >= DATE '{mes}' AND competencia < DATE '{_proximo_mes(mes)}'),
+                ADD CONSTRAINT "{nome_particao(tabela, mes)}_colaborador_sk_fkey" FOREIGN KEY (colaborador_sk)
+                    REFERENCES "{schema}"."dim_colaboradores_base"(colaborador_sk);
+            ANALYZE "{schema}"."{nova}";
+        """))
+
+    # Troca: daqui até o COMMIT a fato fica com lock exclusivo, mas só há operações de catálogo
+    # (a checagem competencia_no_mes dispensa a varredura da partição no ATTACH)
+    for mes in meses_trocar:
+        particao = nome_particao(tabela, mes)
+        nova = f"{particao}_nova"
+        sql_troca = ""
+        if conn.execute(text("SELECT to_regclass(:nome)"), {'nome': f'"{schema}"."{particao}"'}).scalar():
+            sql_troca += f"""
+            ALTER TABLE "{schema}"."{tabela}" DETACH PARTITION "{schema}"."{particao}";
+            DROP TABLE "{schema}"."{particao}";"""
+        sql_troca += f"""
+            ALTER TABLE "{schema}"."{nova}" RENAME TO "{particao}";
+            ALTER TABLE "{schema}"."{particao}" RENAME CONSTRAINT "{nova}_pkey" TO "{particao}_pkey";
+            ALTER TABLE "{schema}"."{tabela}" ATTACH PARTITION "{schema}"."{particao}"
+                FOR VALUES FROM ('{mes}') TO ('{_proximo_mes(mes)}');"""
+        conn.execute(text(sql_troca))
+    return linhas
+
+
 # --------------------------------------------------------------------------------
 # CARGA API (COLABORADORES + BENEFÍCIOS) - UPSERT COMPLETO
 # --------------------------------------------------------------------------------
-def carregar_dados_api(df_staging, df_beneficios, engine, schema):
-    if df_staging.empty:
-        print("DataFrame de colaboradores vazio. Nada a carregar.")
-        return
+NOME_CONTROLE_SYNC = "controle_sync_api"
+FONTE_SYNC_API = "solides_colaboradores"
+
+
+def ler_estado_sync_api(engine, schema):
+    """
+    Estado da sincronização incremental da API: (marca d'água, ids já em dim_colaboradores).
+    Sem marca gravada (primeira carga) a marca é None.
+    """
+    with engine.connect() as conn:
+        marca = conn.execute(text(f'SELECT marca_updated_at FROM "{schema}".{NOME_CONTROLE_SYNC} '
+                                  'WHERE fonte = :fonte'), {'fonte': FONTE_SYNC_API}).scalar()
+        ids = conn.execute(text(f'SELECT colaborador_id_solides FROM "{schema}".dim_colaboradores')).scalars()
+        return marca, set(ids)
 
-    # Garante que os DataFrames tenham as colunas esperadas
-    df_staging['cpf'] = df_staging['cpf'].astype(str).replace(['nan', 'None'], None)
-    df_beneficios['colaborador_id_solides'] = df_beneficios['colaborador_id_solides'].astype(float).astype('Int64')
 
+def carregar_dados_api(lotes_api, engine, schema, metodo_carga=METODO_CARGA_PADRAO, incremental=False):
+    """
+    Upsert de dim_colaboradores e carga de fato_beneficios_api a partir do staging da API.
+
+    `lotes_api` gera, página a página, (df_listagem, df_colaboradores,
+    df_beneficios) (ver transformar_lotes_api). Cada lote vai direto para os
+    stagings temporários (COPY), então a memória fica limitada a uma página e
+    as primeiras linhas chegam ao banco enquanto as próximas páginas ainda estão
+    sendo baixadas; o upsert roda no fim, na mesma transação.
+
+    A listagem (ids e updated_at de todos os colaboradores) alimenta o snapshot
+    usado pelo pós-processamento e a nova marca d'água (maior updated_at). Com
+    `incremental=True` o staging traz só os colaboradores alterados: os
+    benefícios são substituídos apenas para eles (no modo completo a fato é
+    truncada).
+    """
     # Helper SQL para tratamento numérico seguro
     def to_num(col):
         return f"CAST(NULLIF(REGEXP_REPLACE(CAST({col} AS TEXT), '[^0-9.-]', '', 'g'), '') AS NUMERIC)"
@@ -233,108 +372,33 @@ def carregar_dados_api(df_staging, df_beneficios, engine, schema):
     NOME_TABELA_STAGING = "staging_colaboradores"
     NOME_STAGING_BEN = "staging_beneficios_api"
     NOME_FATO_BEN = "fato_beneficios_api"
+    NOME_SNAPSHOT = "snapshot_colaboradores_api"
+    NOME_STAGING_IDS = "staging_ids_api"
+
+    if incremental:
+        # Só os colaboradores rebuscados têm os benefícios substituídos
+        sql_limpa_beneficios = f"""
+        DELETE FROM "{schema}".{NOME_FATO_BEN} fato
+        USING pg_temp.{NOME_TABELA_STAGING} stg_colab
+        JOIN "{schema}".{NOME_TABELA_BASE} base ON stg_colab.cpf = base.cpf
+        WHERE fato.colaborador_sk = base.colaborador_sk;"""
+    else:
+        sql_limpa_beneficios = f'TRUNCATE TABLE "{schema}".{NOME_FATO_BEN};'
 
     try:
-        # Carga Staging
-        print(f"Carregando {NOME_TABELA_STAGING}...")
-        df_staging.to_sql(NOME_TABELA_STAGING, engine, if_exists='replace', index=False, schema=schema)
-
-        print(f"Carregando {NOME_STAGING_BEN}...")
-        df_beneficios.to_sql(NOME_STAGING_BEN, engine, if_exists='replace', index=False, schema=schema)
-
-        sql = f"""
+        # Blocos executados em ordem, na mesma transação; cada um é medido
+        # separadamente (o rowcount é o da última instrução do bloco)
+        blocos_sql = [
+        ('dim_colaboradores_base', f"""
         -- 1. Base (Garante existência dos CPFs)
-        CREATE TABLE IF NOT EXISTS "{schema}".{NOME_TABELA_BASE} (
-            colaborador_sk SERIAL PRIMARY KEY, nome_colaborador VARCHAR(255), cpf VARCHAR(20) UNIQUE,
-            data_admissao_csv DATE, data_demissao_csv DATE, situacao_csv VARCHAR(100),
-            departamento_csv VARCHAR(255), cargo_csv VARCHAR(255)
-        );
-        INSERT INTO "{schema}".{NOME_TABELA_BASE} (colaborador_sk, nome_colaborador, cpf)
-        VALUES (0, 'Desconhecido', 'N/A') ON CONFLICT (colaborador_sk) DO NOTHING;
-
-        ALTER TABLE "{schema}".{NOME_TABELA_BASE}
-            ADD COLUMN IF NOT EXISTS data_admissao_csv DATE, ADD COLUMN IF NOT EXISTS data_demissao_csv DATE,
-            ADD COLUMN IF NOT EXISTS situacao_csv VARCHAR(100), ADD COLUMN IF NOT EXISTS departamento_csv VARCHAR(255),
-            ADD COLUMN IF NOT EXISTS cargo_csv VARCHAR(255);
-
         INSERT INTO "{schema}".{NOME_TABELA_BASE} (nome_colaborador, cpf)
         SELECT DISTINCT ON (stg.cpf) stg.nome_completo, stg.cpf
-        FROM "{schema}".{NOME_TABELA_STAGING} AS stg
+        FROM pg_temp.{NOME_TABELA_STAGING} AS stg
         WHERE stg.cpf IS NOT NULL AND stg.cpf != 'N/A' AND stg.cpf != 'nan'
         ORDER BY stg.cpf, stg.colaborador_id_solides DESC 
         ON CONFLICT (cpf) DO UPDATE SET nome_colaborador = EXCLUDED.nome_colaborador;
-
-        -- 2. Dimensão Rica (Criação se não existir)
-        CREATE TABLE IF NOT EXISTS "{schema}".{NOME_TABELA_RICA} (
-            colaborador_sk INTEGER PRIMARY KEY, colaborador_id_solides INTEGER UNIQUE NOT NULL, 
-            cpf VARCHAR(11), nome_completo VARCHAR(255), data_nascimento DATE, genero VARCHAR(50),
-            data_admissao DATE, data_demissao DATE, ativo BOOLEAN,
-            departamento_nome_api VARCHAR(255), cargo_nome_api VARCHAR(255), email VARCHAR(255),
-            data_ultima_atualizacao TIMESTAMP DEFAULT current_timestamp,
-            FOREIGN KEY (colaborador_sk) REFERENCES "{schema}".{NOME_TABELA_BASE}(colaborador_sk)
-        );
-
-        ALTER TABLE "{schema}".{NOME_TABELA_RICA} DROP COLUMN IF EXISTS total_benefits_api;
-
-        ALTER TABLE "{schema}".{NOME_TABELA_RICA}
-            ADD COLUMN IF NOT EXISTS matricula VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS email_corporativo VARCHAR(255),
-            ADD COLUMN IF NOT EXISTS estado_civil VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS saudacao VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS nacionalidade VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS tipo_necessidade_especial VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS naturalidade VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS nome_pai VARCHAR(255),
-            ADD COLUMN IF NOT EXISTS nome_mae VARCHAR(255),
-            ADD COLUMN IF NOT EXISTS pcd BOOLEAN,
-            ADD COLUMN IF NOT EXISTS salario_api NUMERIC(12, 2),
-            ADD COLUMN IF NOT EXISTS turno_trabalho VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS tipo_contrato VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS data_contrato DATE,
-            ADD COLUMN IF NOT EXISTS escolaridade VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS curso_formacao VARCHAR(255),
-            ADD COLUMN IF NOT EXISTS nivel_hierarquico VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS duracao_contrato VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS data_expiracao_contrato DATE,
-            ADD COLUMN IF NOT EXISTS periodo_experiencia_dias INTEGER,
-            ADD COLUMN IF NOT EXISTS forma_demissao VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS decisao_demissao VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS valor_rescisao NUMERIC(12, 2),
-            ADD COLUMN IF NOT EXISTS total_beneficios_api NUMERIC(12, 2),
-            ADD COLUMN IF NOT EXISTS etnia VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS nome_lider_imediato VARCHAR(255),
-            ADD COLUMN IF NOT EXISTS lider_id_solides INTEGER,
-            ADD COLUMN IF NOT EXISTS unidade_nome VARCHAR(255),
-            ADD COLUMN IF NOT EXISTS unidade_id_solides INTEGER,
-            ADD COLUMN IF NOT EXISTS cargo_id_solides INTEGER,
-            ADD COLUMN IF NOT EXISTS departamento_id_solides INTEGER,
-            ADD COLUMN IF NOT EXISTS cep VARCHAR(20),
-            ADD COLUMN IF NOT EXISTS logradouro VARCHAR(255),
-            ADD COLUMN IF NOT EXISTS numero_endereco VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS complemento_endereco VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS bairro VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS cidade VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS estado VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS celular VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS email_pessoal VARCHAR(255),
-            ADD COLUMN IF NOT EXISTS telefone_emergencia VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS rg VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS data_emissao_rg DATE,
-            ADD COLUMN IF NOT EXISTS orgao_emissor_rg VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS titulo_eleitor VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS zona_eleitoral VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS secao_eleitoral VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS ctps_numero VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS ctps_serie VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS pis VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS banco_nome VARCHAR(100),
-            ADD COLUMN IF NOT EXISTS banco_agencia VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS banco_conta VARCHAR(50),
-            ADD COLUMN IF NOT EXISTS data_ultima_atualizacao_api DATE;
-
-        INSERT INTO "{schema}".{NOME_TABELA_RICA} (colaborador_sk, colaborador_id_solides)
-        VALUES (0, -1) ON CONFLICT (colaborador_sk) DO NOTHING;
-
+        """),
+        ('dim_colaboradores/upsert', f"""
         -- UPSERT MASSIVO completo
         INSERT INTO "{schema}".{NOME_TABELA_RICA} (
             colaborador_sk, colaborador_id_solides, cpf, nome_completo, data_nascimento, genero,
@@ -370,7 +434,7 @@ def carregar_dados_api(df_staging, df_beneficios, engine, schema):
             stg.cargo_id_solides, stg.departamento_id_solides,
             stg.banco_nome, stg.banco_agencia, stg.banco_conta, stg.lider_id_solides, stg.unidade_id_solides,
             stg.data_ultima_atualizacao_api, current_timestamp
-        FROM "{schema}".{NOME_TABELA_STAGING} AS stg
+        FROM pg_temp.{NOME_TABELA_STAGING} AS stg
         JOIN "{schema}".{NOME_TABELA_BASE} AS base ON stg.cpf = base.cpf
         WHERE stg.colaborador_id_solides IS NOT NULL
         ON CONFLICT (colaborador_id_solides) DO UPDATE SET
@@ -410,17 +474,10 @@ def carregar_dados_api(df_staging, df_beneficios, engine, schema):
             banco_agencia = EXCLUDED.banco_agencia,
             banco_conta = EXCLUDED.banco_conta,
             data_ultima_atualizacao = current_timestamp;
-
+        """),
+        ('fato_beneficios_api', f"""
         -- FATO BENEFICIOS
-        CREATE TABLE IF NOT EXISTS "{schema}".{NOME_FATO_BEN} (
-            beneficio_id SERIAL PRIMARY KEY, colaborador_sk INTEGER,
-            tipo_beneficio VARCHAR(100), nome_beneficio VARCHAR(255),
-            valor_beneficio NUMERIC(12,2), valor_desconto NUMERIC(12,2),
-            periodicidade VARCHAR(50), opcao_desconto VARCHAR(50), aplicado_como VARCHAR(50),
-            data_atualizacao TIMESTAMP DEFAULT current_timestamp,
-            FOREIGN KEY (colaborador_sk) REFERENCES "{schema}".{NOME_TABELA_BASE}(colaborador_sk)
-        );
-        TRUNCATE TABLE "{schema}".{NOME_FATO_BEN};
+        {sql_limpa_beneficios}
 
         INSERT INTO "{schema}".{NOME_FATO_BEN} (
             colaborador_sk, tipo_beneficio, nome_beneficio, valor_beneficio, valor_desconto, periodicidade, opcao_desconto, aplicado_como
@@ -429,49 +486,131 @@ def carregar_dados_api(df_staging, df_beneficios, engine, schema):
             base.colaborador_sk, stg.tipo_beneficio, stg.nome_beneficio,
             {to_num('stg.valor_beneficio')}, {to_num('stg.valor_desconto')}, 
             stg.periodicidade, stg.opcao_desconto, stg.aplicado_como
-        FROM "{schema}".{NOME_STAGING_BEN} stg
-        JOIN "{schema}".{NOME_TABELA_STAGING} stg_colab ON stg.colaborador_id_solides = stg_colab.colaborador_id_solides
+        FROM pg_temp.{NOME_STAGING_BEN} stg
+        JOIN pg_temp.{NOME_TABELA_STAGING} stg_colab ON stg.colaborador_id_solides = stg_colab.colaborador_id_solides
         JOIN "{schema}".{NOME_TABELA_BASE} base ON stg_colab.cpf = base.cpf;
-        """
+        """),
+        ('snapshot', f"""
+        -- SNAPSHOT: CPFs presentes na última carga da API (entrada do pós-processamento,
+        -- já que o staging é temporário e some no fim da transação)
+        TRUNCATE TABLE "{schema}".{NOME_SNAPSHOT};
+
+        -- quem não foi rebuscado (incremental) entra com o CPF já gravado em dim_colaboradores
+        INSERT INTO "{schema}".{NOME_SNAPSHOT} (cpf, colaborador_id_solides)
+        SELECT DISTINCT ON (snap.cpf) snap.cpf, snap.colaborador_id_solides
+        FROM (
+            SELECT stg.cpf, stg.colaborador_id_solides FROM pg_temp.{NOME_TABELA_STAGING} AS stg
+            UNION ALL
+            SELECT rica.cpf, rica.colaborador_id_solides
+            FROM pg_temp.{NOME_STAGING_IDS} AS ids
+            JOIN "{schema}".{NOME_TABELA_RICA} AS rica ON rica.colaborador_id_solides = ids.colaborador_id_solides
+            WHERE NOT EXISTS (SELECT 1 FROM pg_temp.{NOME_TABELA_STAGING} AS stg
+                              WHERE stg.colaborador_id_solides = ids.colaborador_id_solides)
+        ) AS snap
+        WHERE snap.cpf IS NOT NULL
+        ORDER BY snap.cpf, snap.colaborador_id_solides DESC;
+        """),
+        ('marca_dagua', f"""
+        -- MARCA D'ÁGUA da sincronização incremental: o maior updated_at da listagem, mas
+        -- nunca além do menor updated_at de um detalhe que falhou (a seleção é >= marca,
+        -- então ele é rebuscado na próxima); com falha a marca pode até recuar
+        INSERT INTO "{schema}".{NOME_CONTROLE_SYNC} (fonte, marca_updated_at)
+        SELECT :fonte, LEAST(MAX(updated_at), MIN(updated_at) FILTER (WHERE detalhe_falhou))
+        FROM pg_temp.{NOME_STAGING_IDS}
+        ON CONFLICT (fonte) DO UPDATE SET
+            marca_updated_at = CASE
+                WHEN EXISTS (SELECT 1 FROM pg_temp.{NOME_STAGING_IDS} WHERE detalhe_falhou)
+                THEN EXCLUDED.marca_updated_at
+                ELSE GREATEST(EXCLUDED.marca_updated_at, "{schema}".{NOME_CONTROLE_SYNC}.marca_updated_at)
+            END,
+            data_sincronizacao = current_timestamp;
+        """)]
 
         with engine.begin() as conn:
-            conn.execute(text(sql))
+            # Stagings temporários (somem no COMMIT): carga lote a lote e upsert na mesma transação
+            print(f"Carregando {NOME_TABELA_STAGING} e {NOME_STAGING_BEN} página a página...")
+            stg_colab = criar_staging(pd.DataFrame(columns=list(SCHEMA_STAGING_API)), NOME_TABELA_STAGING,
+                                      conn, dtype=SCHEMA_STAGING_API)
+            stg_ben = criar_staging(pd.DataFrame(columns=list(SCHEMA_BENEFICIOS_API)), NOME_STAGING_BEN,
+                                    conn, dtype=SCHEMA_BENEFICIOS_API)
+            stg_ids = criar_staging(pd.DataFrame(columns=list(SCHEMA_LISTAGEM_API)), NOME_STAGING_IDS,
+                                    conn, dtype=SCHEMA_LISTAGEM_API)
+
+            n_listados = n_colaboradores = n_beneficios = 0
+            for df_listagem, df_staging, df_beneficios in lotes_api:
+                # Garante que os DataFrames tenham as colunas esperadas
+                df_staging['cpf'] = df_staging['cpf'].astype(str).replace(['nan', 'None'], None)
+                df_beneficios['colaborador_id_solides'] = (
+                    df_beneficios['colaborador_id_solides'].astype(float).astype('Int64'))
+                with medir('stagings', linhas_entrada=len(df_listagem) + len(df_staging) + len(df_beneficios)):
+                    anexar_staging(df_listagem, stg_ids, conn, metodo_carga)
+                    anexar_staging(df_staging, stg_colab, conn, metodo_carga)
+                    anexar_staging(df_beneficios, stg_ben, conn, metodo_carga)
+                n_listados += len(df_listagem)
+                n_colaboradores += len(df_staging)
+                n_beneficios += len(df_beneficios)
+
+            if not n_colaboradores and not n_listados:
+                print("DataFrame de colaboradores vazio. Nada a carregar.")
+                return
+            print(f"Stagings carregados: {n_colaboradores} colaborador(es), {n_beneficios} benefício(s), "
+                  f"{n_listados} id(s) listado(s).")
+
+            with medir('indices_stagings'):
+                indexar_staging(NOME_TABELA_STAGING, conn, indices=['cpf', 'colaborador_id_solides'])
+                indexar_staging(NOME_STAGING_BEN, conn, indices=['colaborador_id_solides'])
+                indexar_staging(NOME_STAGING_IDS, conn, indices=['colaborador_id_solides'])
+
+            for nome_bloco, sql_bloco in blocos_sql:
+                with medir(f'sql/{nome_bloco}') as m:
+                    m['linhas_saida'] = conn.execute(text(sql_bloco), {'fonte': FONTE_SYNC_API}).rowcount
         print("Carga API concluída com sucesso.")
 
     except Exception as e:
         print(f"Erro Carga API: {e}")
+        raise
 
 
 # --------------------------------------------------------------------------------
 # PÓS PROCESSAMENTO
 # --------------------------------------------------------------------------------
 def processar_status_transferidos(engine, schema):
+    """
+    Marca como 'Transferido' quem não está na última carga da API
+    (snapshot_colaboradores_api) nem na folha mais recente.
+    """
     print("Executando pós-processamento de transferidos...")
+    with engine.connect() as conn:
+        snapshot = conn.execute(text(f'SELECT EXISTS (SELECT 1 FROM "{schema}".snapshot_colaboradores_api)')).scalar()
+    if not snapshot:
+        print("[AVISO] Snapshot da API vazio (API nunca carregada). Pulando transferidos.")
+        return
     sql = text(f"""
         UPDATE "{schema}".dim_colaboradores_base
         SET situacao_csv = 'Transferido'
         WHERE cpf IN (
             SELECT base.cpf FROM "{schema}".dim_colaboradores_base base
-            LEFT JOIN "{schema}".staging_colaboradores api ON base.cpf = api.cpf
-            LEFT JOIN "{schema}"."stg_folha_consol" csv ON base.cpf = csv.cpf
+            LEFT JOIN "{schema}".snapshot_colaboradores_api api ON base.cpf = api.cpf
+            LEFT JOIN (
+                -- CPFs da folha mais recente já carregada (não depende do que sobrou no staging,
+                -- que no modo incremental/streaming só contém o último lote)
+                SELECT DISTINCT cpf_csv AS cpf FROM "{schema}".fato_folha_consolidada
+                WHERE competencia = (SELECT MAX(competencia) FROM "{schema}".fato_folha_consolidada)
+            ) csv ON base.cpf = csv.cpf
             WHERE api.cpf IS NULL AND csv.cpf IS NULL 
             AND base.data_demissao_csv IS NULL
             AND base.situacao_csv NOT IN ('Transferido', 'Desligado')
         );
-        DO $$
-        BEGIN
-            IF EXISTS (SELECT FROM information_schema.tables WHERE table_schema = '{schema}' AND table_name = 'dim_colaboradores') THEN
-                UPDATE "{schema}".dim_colaboradores
-                SET ativo = False, data_ultima_atualizacao = current_timestamp
-                FROM "{schema}".dim_colaboradores_base base
-                WHERE "{schema}".dim_colaboradores.colaborador_sk = base.colaborador_sk
-                AND base.situacao_csv = 'Transferido' AND "{schema}".dim_colaboradores.ativo = True;
-            END IF;
-        END $$;
+        UPDATE "{schema}".dim_colaboradores
+        SET ativo = False, data_ultima_atualizacao = current_timestamp
+        FROM "{schema}".dim_colaboradores_base base
+        WHERE "{schema}".dim_colaboradores.colaborador_sk = base.colaborador_sk
+        AND base.situacao_csv = 'Transferido' AND "{schema}".dim_colaboradores.ativo = True;
     """)
     try:
         with engine.begin() as conn:
             conn.execute(sql)
         print("Status 'Transferido' processado.")
     except Exception as e:
-        print(f"Erro Transferidos: {e}")
\ No newline at end of file
+        print(f"Erro Transferidos: {e}")
+        raise
@@ -0,0 +1,114 @@
+# src/manifest.py
+import os
+import json
+import hashlib
+from datetime import datetime
+
+# Trechos do código que definem as linhas das tabelas fato da folha: (arquivo,
+# marcador de início, marcador de fim); None = início/fim do arquivo. Qualquer
+# alteração neles invalida o manifesto e força o reprocessamento. O código da
+# API Solides, que divide alguns desses módulos, fica de fora.
+TRECHOS_EXTRATOR = (
+    ('extract.py', None, '# 3. EXTRAÇÃO API SOLIDES'),
+    ('backends.py', None, None),
+    ('utils.py', None, None),
+    ('constants.py', None, '# Staging da API Solides'),
+    ('transform.py', None, '# Colunas do staging de colaboradores'),
+    ('load.py', '# CARGA FATOS DE FOLHA (PDFs)', '# CARGA API'),
+)
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo lendo em blocos.
+    """
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _trecho(conteudo, inicio, fim):
+    """
+    Recorta o conteúdo entre os marcadores. Marcador não encontrado conta como
+    início/fim do arquivo: na dúvida, o trecho cresce (reprocessa a mais, nunca a menos).
+    """
+    a = conteudo.find(inicio.encode('utf-8')) if inicio else -1
+    b = conteudo.find(fim.encode('utf-8'), max(a, 0)) if fim else -1
+    return conteudo[max(a, 0):b if b >= 0 else len(conteudo)]
+
+
+def versao_extrator(backend='pdfplumber'):
+    """
+    Versão do parser = hash do código que gera as linhas das fatos da folha
+    (TRECHOS_EXTRATOR) + backend de texto.
+    """
+    base = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for nome, inicio, fim in TRECHOS_EXTRATOR:
+        with open(os.path.join(base, nome), 'rb') as f:
+            h.update(_trecho(f.read(), inicio, fim))
+    h.update(backend.encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def carregar_manifesto(caminho, destino=None):
+    """
+    Lê o manifesto de PDFs já processados. Retorna um manifesto vazio se o
+    arquivo não existir, estiver corrompido ou tiver sido gravado para outro
+    destino (servidor, banco ou schema diferentes, ou recriados desde então):
+    os PDFs pulados não estariam carregados no banco atual.
+    """
+    if not os.path.exists(caminho):
+        return {'arquivos': {}, 'destino': destino}
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            manifesto = json.load(f)
+        manifesto.setdefault('arquivos', {})
+    except (ValueError, OSError) as e:
+        print(f"[AVISO] Manifesto ilegível ({e}). Todos os PDFs serão reprocessados.")
+        return {'arquivos': {}, 'destino': destino}
+    if manifesto.get('destino') != destino:
+        print("[AVISO] Manifesto gravado para outro banco/schema (ou recriado desde então). "
+              "Todos os PDFs serão reprocessados.")
+        return {'arquivos': {}, 'destino': destino}
+    return manifesto
+
+
+def salvar_manifesto(manifesto, caminho):
+    """
+    Grava o manifesto de forma atômica (arquivo temporário + rename).
+    """
+    tmp = f"{caminho}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, caminho)
+
+
+def registrar_arquivo(manifesto, nome_arquivo, sha256, tamanho, versao, competencias, linhas_consol, linhas_detalhe):
+    """
+    Atualiza (ou cria) a entrada de um PDF processado com sucesso.
+    """
+    manifesto.setdefault('arquivos', {})[nome_arquivo] = {
+        'sha256': sha256,
+        'tamanho': tamanho,
+        'versao_extrator': versao,
+        'competencias': sorted(competencias),
+        'linhas_consolidado': linhas_consol,
+        'linhas_detalhe': linhas_detalhe,
+        'processado_em': datetime.now().isoformat(timespec='seconds')
+    }
+
+
+def arquivo_inalterado(manifesto, nome_arquivo, sha256, tamanho, versao):
+    """
+    True se o PDF já foi processado com o mesmo conteúdo e a mesma versão do parser.
+    """
+    entrada = manifesto.get('arquivos', {}).get(nome_arquivo)
+    return (
+        entrada is not None
+        and entrada.get('sha256') == sha256
+        and entrada.get('tamanho') == tamanho
+        and entrada.get('versao_extrator') == versao
+    )
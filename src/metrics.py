@@ -0,0 +1,341 @@
+# src/metrics.py
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage
+    resource = None
+
+# Instrumentação das etapas do pipeline: tempo de parede, tempo de CPU, linhas
+# de entrada/saída e pico de RSS de cada etapa e subetapa. As etapas se aninham
+# pelo nome, por thread ("pdf" > "pdf/extracao" > "pdf/extracao/texto"), e as
+# execuções repetidas de um mesmo nome (um lote da API, um bloco SQL por lote)
+# somam numa única linha do relatório. Sem um Medidor ativo (benchmarks,
+# chamadas avulsas), medir() não registra nada.
+
+INTERVALO_AMOSTRAGEM = 0.05
+MIB = 1024 ** 2
+# Status que contam como falha da etapa (cancelada: uma dependência falhou)
+STATUS_FALHA = ('erro', 'cancelada')
+
+_ativo = None
+
+
+def rss_atual():
+    """
+    RSS atual do processo em bytes (None onde não há /proc).
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def pico_rss_processo():
+    """
+    Maior RSS do processo desde o início, em bytes (None sem o módulo resource).
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+class Medidor:
+    """
+    Coleta as métricas de uma execução. O pico de RSS de cada etapa vem de uma
+    thread que amostra o /proc enquanto houver etapa aberta (é o RSS do processo
+    inteiro durante a etapa); sem /proc, fica o pico do processo até o fim da
+    etapa. O tempo de CPU é o da thread que executou a etapa: as subetapas de
+    cada PDF trazem o CPU do processo worker (ver incorporar).
+    """
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id or datetime.now().strftime('%Y%m%dT%H%M%S')
+        self.inicio = datetime.now()
+        self._t0 = time.perf_counter()
+        self._etapas = {}
+        self._abertas = {}  # id -> etapa aberta (dicts iguais não podem se confundir)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._amostrando = False
+
+    # --- nomes ---------------------------------------------------------------
+    def prefixo_atual(self):
+        pilha = getattr(self._local, 'pilha', None)
+        return pilha[-1] if pilha else ''
+
+    @contextmanager
+    def continuar_em(self, prefixo):
+        """
+        Aninha as etapas desta thread sob `prefixo` (usado por threads auxiliares).
+        """
+        pilha = self._local.__dict__.setdefault('pilha', [])
+        pilha.append(prefixo)
+        try:
+            yield
+        finally:
+            pilha.pop()
+
+    def _nome_completo(self, nome):
+        prefixo = self.prefixo_atual()
+        return f"{prefixo}/{nome}" if prefixo else nome
+
+    # --- memória -------------------------------------------------------------
+    def _amostrar(self):
+        while True:
+            time.sleep(INTERVALO_AMOSTRAGEM)
+            rss = rss_atual()
+            with self._lock:
+                if not self._abertas:
+                    self._amostrando = False
+                    return
+                for aberta in self._abertas.values():
+                    aberta['pico'] = max(aberta['pico'], rss)
+
+    def _abrir(self, aberta):
+        rss = rss_atual()
+        aberta['pico'] = rss or 0
+        with self._lock:
+            self._abertas[id(aberta)] = aberta
+            if rss is not None and not self._amostrando:
+                self._amostrando = True
+                threading.Thread(target=self._amostrar, name='medidor-rss', daemon=True).start()
+
+    def _fechar(self, aberta):
+        rss = rss_atual()
+        with self._lock:
+            del self._abertas[id(aberta)]
+        if rss is None:
+            return pico_rss_processo()
+        return max(aberta['pico'], rss)
+
+    # --- registro ------------------------------------------------------------
+    def _acumular(self, nome, execucoes, status, segundos, cpu_segundos, linhas_entrada, linhas_saida,
+                  pico_rss, detalhe=False, erro=None):
+        with self._lock:
+            etapa = self._etapas.get(nome)
+            if etapa is None:
+                etapa = self._etapas[nome] = {
+                    'etapa': nome, 'status': 'ok', 'execucoes': 0, 'segundos': 0.0, 'cpu_segundos': 0.0,
+                    'linhas_entrada': None, 'linhas_saida': None, 'pico_rss_mib': None, 'detalhe': detalhe}
+            etapa['execucoes'] += execucoes
+            etapa['segundos'] += segundos
+            etapa['cpu_segundos'] += cpu_segundos
+            for campo, valor in (('linhas_entrada', linhas_entrada), ('linhas_saida', linhas_saida)):
+                if valor is not None:
+                    etapa[campo] = (etapa[campo] or 0) + int(valor)
+            if pico_rss is not None:
+                etapa['pico_rss_mib'] = max(etapa['pico_rss_mib'] or 0, pico_rss)
+            if status != 'ok':
+                etapa['status'] = status
+                etapa['erro' if status == 'erro' else 'motivo'] = erro
+
+    @contextmanager
+    def etapa(self, nome, linhas_entrada=None, detalhe=False):
+        """
+        Mede o bloco como uma execução da etapa `nome` (aninhada sob a etapa
+        aberta nesta thread). Devolve um dict em que o bloco pode preencher
+        'linhas_entrada' e 'linhas_saida'. `detalhe=True` marca etapas por
+        arquivo: não viram prefixo das subetapas e ficam fora do Prometheus.
+        """
+        nome_completo = self._nome_completo(nome)
+        self._acumular(nome_completo, 0, 'ok', 0.0, 0.0, None, None, None, detalhe)  # reserva a ordem
+        contagens = {'linhas_entrada': linhas_entrada, 'linhas_saida': None}
+        aberta = {}
+        self._abrir(aberta)
+        status, erro = 'ok', None
+        pilha = self._local.__dict__.setdefault('pilha', [])
+        if not detalhe:
+            pilha.append(nome_completo)
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield contagens
+        except BaseException as e:
+            status, erro = 'erro', f"{type(e).__name__}: {e}"[:500]
+            raise
+        finally:
+            segundos, cpu = time.perf_counter() - t0, time.thread_time() - c0
+            if not detalhe:
+                pilha.pop()
+            pico = self._fechar(aberta)
+            self._acumular(nome_completo, 1, status, segundos, cpu, contagens['linhas_entrada'],
+                           contagens['linhas_saida'], pico / MIB if pico is not None else None, detalhe, erro)
+
+    def marcar(self, nome, status, motivo=None):
+        """
+        Registra o desfecho de uma etapa que não rodou até o fim (ex: 'pulada', 'cancelada').
+        """
+        self._acumular(self._nome_completo(nome), 0, status, 0.0, 0.0, None, None, None, erro=motivo)
+
+    def exportar(self):
+        """
+        Etapas registradas (na ordem em que começaram a ser medidas).
+        """
+        with self._lock:
+            return [dict(etapa) for etapa in self._etapas.values()]
+
+    def incorporar(self, etapas):
+        """
+        Soma etapas medidas em outro processo (worker) sob a etapa aberta nesta thread.
+        """
+        for etapa in etapas:
+            self._acumular(self._nome_completo(etapa['etapa']), etapa['execucoes'], etapa['status'],
+                           etapa['segundos'], etapa['cpu_segundos'], etapa['linhas_entrada'],
+                           etapa['linhas_saida'], etapa['pico_rss_mib'], etapa['detalhe'], etapa.get('erro'))
+
+    # --- saída ---------------------------------------------------------------
+    def relatorio(self):
+        pico = pico_rss_processo()
+        etapas = self.exportar()
+        return {
+            'run_id': self.run_id,
+            'status': 'erro' if any(e['status'] in STATUS_FALHA for e in etapas) else 'ok',
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            'fim': datetime.now().isoformat(timespec='seconds'),
+            'segundos': round(time.perf_counter() - self._t0, 3),
+            'cpu_segundos_processo': round(time.process_time(), 3),
+            'pico_rss_mib_processo': round(pico / MIB, 1) if pico is not None else None,
+            'etapas': [{**etapa, 'segundos': round(etapa['segundos'], 4),
+                        'cpu_segundos': round(etapa['cpu_segundos'], 4),
+                        'pico_rss_mib': round(etapa['pico_rss_mib'], 1) if etapa['pico_rss_mib'] else None}
+                       for etapa in etapas],
+        }
+
+    def gravar_json(self, caminho):
+        """
+        Grava o relatório da execução em JSON (escrita atômica).
+        """
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        tmp = f"{caminho}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.relatorio(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, caminho)
+        return caminho
+
+    def gravar_prometheus(self, caminho, prefixo='arq_pipeline'):
+        """
+        Grava as métricas no formato textfile do node_exporter (escrita atômica,
+        como o coletor exige). Etapas por arquivo (detalhe) ficam de fora.
+        """
+        relatorio = self.relatorio()
+        metricas = [
+            ('etapa_segundos', 'Tempo de parede da etapa na última execução.', 'segundos', 1),
+            ('etapa_cpu_segundos', 'Tempo de CPU da etapa na última execução.', 'cpu_segundos', 1),
+            ('etapa_linhas_entrada', 'Linhas recebidas pela etapa.', 'linhas_entrada', 1),
+            ('etapa_linhas_saida', 'Linhas produzidas pela etapa.', 'linhas_saida', 1),
+            ('etapa_pico_rss_bytes', 'Pico de RSS do processo durante a etapa.', 'pico_rss_mib', MIB),
+        ]
+        etapas = [e for e in relatorio['etapas'] if not e['detalhe']]
+        linhas = []
+        for metrica, ajuda, campo, escala in metricas:
+            linhas += [f"# HELP {prefixo}_{metrica} {ajuda}", f"# TYPE {prefixo}_{metrica} gauge"]
+            linhas += [f'{prefixo}_{metrica}{{etapa="{_rotulo(e["etapa"])}"}} {e[campo] * escala:g}'
+                       for e in etapas if e[campo] is not None]
+        linhas += [f"# HELP {prefixo}_etapa_sucesso 0 se a etapa falhou ou foi cancelada, 1 caso contrário.",
+                   f"# TYPE {prefixo}_etapa_sucesso gauge"]
+        linhas += [f'{prefixo}_etapa_sucesso{{etapa="{_rotulo(e["etapa"])}"}} '
+                   f'{int(e["status"] not in STATUS_FALHA)}' for e in etapas]
+        linhas += [f"# HELP {prefixo}_execucao_segundos Duração total da última execução.",
+                   f"# TYPE {prefixo}_execucao_segundos gauge",
+                   f"{prefixo}_execucao_segundos {relatorio['segundos']:g}",
+                   f"# HELP {prefixo}_execucao_fim_timestamp_segundos Fim da última execução (epoch).",
+                   f"# TYPE {prefixo}_execucao_fim_timestamp_segundos gauge",
+                   f"{prefixo}_execucao_fim_timestamp_segundos {time.time():.0f}"]
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        tmp = f"{caminho}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write("\n".join(linhas) + "\n")
+        os.replace(tmp, caminho)
+        return caminho
+
+    def imprimir_resumo(self):
+        """
+        Tabela das etapas (sem as por arquivo) no fim da execução.
+        """
+        print(f"{'etapa':<52} {'exec':>5} {'tempo':>9} {'CPU':>9} {'entrada':>9} {'saída':>9} {'pico RSS':>9}")
+        for e in self.relatorio()['etapas']:
+            if e['detalhe']:
+                continue
+            situacao = '' if e['status'] == 'ok' else f"  [{e['status'].upper()}]"
+            print(f"{e['etapa'][:52]:<52} {e['execucoes']:>5} {e['segundos']:>8.2f}s {e['cpu_segundos']:>8.2f}s "
+                  f"{_contagem(e['linhas_entrada']):>9} {_contagem(e['linhas_saida']):>9} "
+                  f"{_contagem(e['pico_rss_mib'], 'MiB'):>9}{situacao}")
+
+
+def _rotulo(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _contagem(valor, unidade=''):
+    return '-' if valor is None else f"{valor:.0f}{unidade}"
+
+
+# -----------------------------------------------------------------------------
+# Medidor ativo (um por processo)
+# -----------------------------------------------------------------------------
+
+def medidor_ativo():
+    return _ativo
+
+
+@contextmanager
+def ativar(medidor):
+    """
+    Torna `medidor` o destino do medir() neste processo enquanto o bloco roda.
+    """
+    global _ativo
+    anterior, _ativo = _ativo, medidor
+    try:
+        yield medidor
+    finally:
+        _ativo = anterior
+
+
+def contexto_atual():
+    """
+    Captura a etapa aberta nesta thread; o retorno, chamado em outra thread,
+    dá o contexto que aninha as medições de lá sob a mesma etapa.
+    """
+    medidor = _ativo
+    if medidor is None:
+        return nullcontext
+    prefixo = medidor.prefixo_atual()
+    return lambda: medidor.continuar_em(prefixo)
+
+
+@contextmanager
+def medir(nome, linhas_entrada=None, detalhe=False):
+    """
+    Mede o bloco no medidor ativo (ver Medidor.etapa); sem medidor, só repassa.
+    """
+    if _ativo is None:
+        yield {'linhas_entrada': linhas_entrada, 'linhas_saida': None}
+        return
+    with _ativo.etapa(nome, linhas_entrada, detalhe) as contagens:
+        yield contagens
+
+
+def medir_iteracao(iteravel, nome, contar=None):
+    """
+    Repassa os itens medindo cada next() como uma execução da etapa `nome`
+    (para geradores: o tempo gasto produzindo cada item). `contar(item)`
+    informa as linhas de saída de cada item.
+    """
+    iterador = iter(iteravel)
+    while True:
+        with medir(nome) as m:
+            try:
+                item = next(iterador)
+            except StopIteration:
+                return
+            if contar is not None:
+                m['linhas_saida'] = contar(item)
+        yield item
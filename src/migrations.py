@@ -0,0 +1,297 @@
+# src/migrations.py
+from sqlalchemy import text
+
+# DDL do warehouse versionado: cada migração roda uma única vez por schema, na
+# inicialização (garantir_schema_banco), e fica registrada em schema_version.
+# As cargas (src/load.py) só fazem DML, então uma execução normal não pega
+# nenhum lock ACCESS EXCLUSIVE nas tabelas que o BI está lendo. Migrações
+# novas entram no fim da lista, com a próxima versão; as já publicadas não
+# mudam mais (um warehouse que já as aplicou não as roda de novo).
+TABELA_VERSAO = "schema_version"
+
+# Fatos da folha particionadas por mês de competência (migração 004): uma
+# partição <tabela>_AAAAMM por mês, que a carga troca inteira (src/load.py).
+FATOS_PARTICIONADAS = {
+    'fato_folha_consolidada': 'fato_folha_id',
+    'fato_folha_detalhada': 'fato_rubrica_id',
+}
+
+# Stagings antigos, criados no schema pelo to_sql; hoje são tabelas temporárias (src/bulk.py)
+STAGINGS_LEGADOS = ('stg_base_csv_temp', 'stg_folha_consol', 'stg_folha_detalhe',
+                    'staging_colaboradores', 'staging_beneficios_api')
+
+
+def _v001_schema_inicial(schema):
+    """
+    O DDL que as cargas rodavam a cada execução. Idempotente (IF NOT EXISTS),
+    para levar ao mesmo formato tanto um schema vazio quanto um warehouse que
+    já existia antes do controle de versão.
+    """
+    return f"""
+    CREATE TABLE IF NOT EXISTS "{schema}".dim_calendario (
+        data DATE PRIMARY KEY,
+        ano INTEGER, mes INTEGER, dia INTEGER, trimestre INTEGER, semestre INTEGER,
+        dia_da_semana INTEGER, nome_dia_da_semana VARCHAR(20),
+        nome_mes VARCHAR(20), nome_mes_abrev CHAR(3), ano_mes VARCHAR(7),
+        dia_do_ano INTEGER, semana_do_ano INTEGER
+    );
+
+    CREATE TABLE IF NOT EXISTS "{schema}".dim_colaboradores_base (
+        colaborador_sk SERIAL PRIMARY KEY,
+        nome_colaborador VARCHAR(255) NOT NULL,
+        cpf VARCHAR(20) UNIQUE NOT NULL,
+        data_admissao_csv DATE, data_demissao_csv DATE,
+        situacao_csv VARCHAR(100), departamento_csv VARCHAR(255), cargo_csv VARCHAR(255)
+    );
+    ALTER TABLE "{schema}".dim_colaboradores_base
+        ADD COLUMN IF NOT EXISTS data_admissao_csv DATE, ADD COLUMN IF NOT EXISTS data_demissao_csv DATE,
+        ADD COLUMN IF NOT EXISTS situacao_csv VARCHAR(100), ADD COLUMN IF NOT EXISTS departamento_csv VARCHAR(255),
+        ADD COLUMN IF NOT EXISTS cargo_csv VARCHAR(255);
+    INSERT INTO "{schema}".dim_colaboradores_base (colaborador_sk, nome_colaborador, cpf)
+    VALUES (0, 'Desconhecido', 'N/A') ON CONFLICT (colaborador_sk) DO NOTHING;
+
+    CREATE TABLE IF NOT EXISTS "{schema}".dim_colaboradores (
+        colaborador_sk INTEGER PRIMARY KEY, colaborador_id_solides INTEGER UNIQUE NOT NULL,
+        cpf VARCHAR(11), nome_completo VARCHAR(255), data_nascimento DATE, genero VARCHAR(50),
+        data_admissao DATE, data_demissao DATE, ativo BOOLEAN,
+        departamento_nome_api VARCHAR(255), cargo_nome_api VARCHAR(255), email VARCHAR(255),
+        data_ultima_atualizacao TIMESTAMP DEFAULT current_timestamp,
+        FOREIGN KEY (colaborador_sk) REFERENCES "{schema}".dim_colaboradores_base(colaborador_sk)
+    );
+    ALTER TABLE "{schema}".dim_colaboradores DROP COLUMN IF EXISTS total_benefits_api;
+    ALTER TABLE "{schema}".dim_colaboradores
+        ADD COLUMN IF NOT EXISTS matricula VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS email_corporativo VARCHAR(255),
+        ADD COLUMN IF NOT EXISTS estado_civil VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS saudacao VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS nacionalidade VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS tipo_necessidade_especial VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS naturalidade VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS nome_pai VARCHAR(255),
+        ADD COLUMN IF NOT EXISTS nome_mae VARCHAR(255),
+        ADD COLUMN IF NOT EXISTS pcd BOOLEAN,
+        ADD COLUMN IF NOT EXISTS salario_api NUMERIC(12, 2),
+        ADD COLUMN IF NOT EXISTS turno_trabalho VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS tipo_contrato VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS data_contrato DATE,
+        ADD COLUMN IF NOT EXISTS escolaridade VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS curso_formacao VARCHAR(255),
+        ADD COLUMN IF NOT EXISTS nivel_hierarquico VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS duracao_contrato VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS data_expiracao_contrato DATE,
+        ADD COLUMN IF NOT EXISTS periodo_experiencia_dias INTEGER,
+        ADD COLUMN IF NOT EXISTS forma_demissao VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS decisao_demissao VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS valor_rescisao NUMERIC(12, 2),
+        ADD COLUMN IF NOT EXISTS total_beneficios_api NUMERIC(12, 2),
+        ADD COLUMN IF NOT EXISTS etnia VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS nome_lider_imediato VARCHAR(255),
+        ADD COLUMN IF NOT EXISTS lider_id_solides INTEGER,
+        ADD COLUMN IF NOT EXISTS unidade_nome VARCHAR(255),
+        ADD COLUMN IF NOT EXISTS unidade_id_solides INTEGER,
+        ADD COLUMN IF NOT EXISTS cargo_id_solides INTEGER,
+        ADD COLUMN IF NOT EXISTS departamento_id_solides INTEGER,
+        ADD COLUMN IF NOT EXISTS cep VARCHAR(20),
+        ADD COLUMN IF NOT EXISTS logradouro VARCHAR(255),
+        ADD COLUMN IF NOT EXISTS numero_endereco VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS complemento_endereco VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS bairro VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS cidade VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS estado VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS celular VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS email_pessoal VARCHAR(255),
+        ADD COLUMN IF NOT EXISTS telefone_emergencia VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS rg VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS data_emissao_rg DATE,
+        ADD COLUMN IF NOT EXISTS orgao_emissor_rg VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS titulo_eleitor VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS zona_eleitoral VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS secao_eleitoral VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS ctps_numero VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS ctps_serie VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS pis VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS banco_nome VARCHAR(100),
+        ADD COLUMN IF NOT EXISTS banco_agencia VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS banco_conta VARCHAR(50),
+        ADD COLUMN IF NOT EXISTS data_ultima_atualizacao_api DATE;
+    INSERT INTO "{schema}".dim_colaboradores (colaborador_sk, colaborador_id_solides)
+    VALUES (0, -1) ON CONFLICT (colaborador_sk) DO NOTHING;
+
+    CREATE TABLE IF NOT EXISTS "{schema}".fato_folha_consolidada (
+        fato_folha_id SERIAL PRIMARY KEY,
+        colaborador_sk INTEGER, competencia DATE,
+        nome_funcionario_csv VARCHAR(255), centro_de_custo VARCHAR(255),
+        cargo_nome_csv VARCHAR(255), cpf_csv VARCHAR(11),
+        situacao_csv VARCHAR(100), tipo_calculo_csv VARCHAR(100),
+        salario_contratual NUMERIC(12, 2), total_proventos NUMERIC(12, 2),
+        total_descontos NUMERIC(12, 2), valor_liquido NUMERIC(12, 2),
+        base_inss NUMERIC(12, 2), base_fgts NUMERIC(12, 2),
+        valor_fgts NUMERIC(12, 2), base_irrf NUMERIC(12, 2),
+        FOREIGN KEY (colaborador_sk) REFERENCES "{schema}".dim_colaboradores_base(colaborador_sk)
+    );
+
+    CREATE TABLE IF NOT EXISTS "{schema}".fato_folha_detalhada (
+        fato_rubrica_id SERIAL PRIMARY KEY,
+        colaborador_sk INTEGER, competencia DATE,
+        nome_funcionario_csv VARCHAR(255), centro_de_custo VARCHAR(255), cpf_csv VARCHAR(11),
+        situacao_csv VARCHAR(100), tipo_calculo_csv VARCHAR(100),
+        codigo_rubrica VARCHAR(100), nome_rubrica VARCHAR(255), tipo_rubrica VARCHAR(100),
+        valor_rubrica NUMERIC(12, 2),
+        FOREIGN KEY (colaborador_sk) REFERENCES "{schema}".dim_colaboradores_base(colaborador_sk)
+    );
+
+    CREATE TABLE IF NOT EXISTS "{schema}".fato_beneficios_api (
+        beneficio_id SERIAL PRIMARY KEY, colaborador_sk INTEGER,
+        tipo_beneficio VARCHAR(100), nome_beneficio VARCHAR(255),
+        valor_beneficio NUMERIC(12,2), valor_desconto NUMERIC(12,2),
+        periodicidade VARCHAR(50), opcao_desconto VARCHAR(50), aplicado_como VARCHAR(50),
+        data_atualizacao TIMESTAMP DEFAULT current_timestamp,
+        FOREIGN KEY (colaborador_sk) REFERENCES "{schema}".dim_colaboradores_base(colaborador_sk)
+    );
+
+    -- CPFs presentes na última carga da API (entrada do pós-processamento)
+    CREATE TABLE IF NOT EXISTS "{schema}".snapshot_colaboradores_api (
+        cpf VARCHAR(20) PRIMARY KEY, colaborador_id_solides INTEGER,
+        data_snapshot TIMESTAMP DEFAULT current_timestamp
+    );
+
+    -- Marca d'água da sincronização incremental da API
+    CREATE TABLE IF NOT EXISTS "{schema}".controle_sync_api (
+        fonte VARCHAR(50) PRIMARY KEY, marca_updated_at TIMESTAMP,
+        data_sincronizacao TIMESTAMP DEFAULT current_timestamp
+    );
+    """
+
+
+def _v002_telefone_pessoal(schema):
+    """
+    Coluna que o upsert de dim_colaboradores preenche e o DDL antigo não criava.
+    """
+    return f'ALTER TABLE "{schema}".dim_colaboradores ADD COLUMN IF NOT EXISTS telefone_pessoal VARCHAR(50);'
+
+
+def _v003_remove_stagings_legados(schema):
+    return "\n".join(f'DROP TABLE IF EXISTS "{schema}"."{tabela}";' for tabela in STAGINGS_LEGADOS)
+
+
+def nome_particao(tabela, mes):
+    return f"{tabela}_{mes:%Y%m}"
+
+
+# Colunas das fatos (fora o id), na ordem da migração 001
+COLUNAS_FATOS = {
+    'fato_folha_consolidada': [
+        ('colaborador_sk', 'INTEGER'), ('competencia', 'DATE'),
+        ('nome_funcionario_csv', 'VARCHAR(255)'), ('centro_de_custo', 'VARCHAR(255)'),
+        ('cargo_nome_csv', 'VARCHAR(255)'), ('cpf_csv', 'VARCHAR(11)'),
+        ('situacao_csv', 'VARCHAR(100)'), ('tipo_calculo_csv', 'VARCHAR(100)'),
+        ('salario_contratual', 'NUMERIC(12, 2)'), ('total_proventos', 'NUMERIC(12, 2)'),
+        ('total_descontos', 'NUMERIC(12, 2)'), ('valor_liquido', 'NUMERIC(12, 2)'),
+        ('base_inss', 'NUMERIC(12, 2)'), ('base_fgts', 'NUMERIC(12, 2)'),
+        ('valor_fgts', 'NUMERIC(12, 2)'), ('base_irrf', 'NUMERIC(12, 2)'),
+    ],
+    'fato_folha_detalhada': [
+        ('colaborador_sk', 'INTEGER'), ('competencia', 'DATE'),
+        ('nome_funcionario_csv', 'VARCHAR(255)'), ('centro_de_custo', 'VARCHAR(255)'), ('cpf_csv', 'VARCHAR(11)'),
+        ('situacao_csv', 'VARCHAR(100)'), ('tipo_calculo_csv', 'VARCHAR(100)'),
+        ('codigo_rubrica', 'VARCHAR(100)'), ('nome_rubrica', 'VARCHAR(255)'), ('tipo_rubrica', 'VARCHAR(100)'),
+        ('valor_rubrica', 'NUMERIC(12, 2)'),
+    ],
+}
+
+
+def _particionar_fato(schema, tabela):
+    """
+    Recria a fato como tabela particionada por RANGE (competencia) e move as
+    linhas da antiga para as partições, uma por mês já carregado. O id passa
+    a BIGINT (mesma sequência) e a chave primária inclui a competência, como
+    o particionamento exige. Linhas sem competência não têm partição e ficam
+    de fora: o DELETE por competência nunca as apagava, então eram cópias
+    acumuladas a cada recarga.
+    """
+    coluna_id = FATOS_PARTICIONADAS[tabela]
+    colunas = COLUNAS_FATOS[tabela]
+    nomes = ", ".join([coluna_id] + [nome for nome, _ in colunas])
+    definicoes = ",\n        ".join(f"{nome} {tipo}" for nome, tipo in colunas)
+    legado = f"{tabela}_legado"
+    sequencia = f'"{schema}".{tabela}_{coluna_id}_seq'
+    return f"""
+    ALTER TABLE "{schema}".{tabela} RENAME TO {legado};
+    ALTER TABLE "{schema}".{legado} DROP CONSTRAINT IF EXISTS {tabela}_pkey;
+    ALTER SEQUENCE {sequencia} OWNED BY NONE;
+    ALTER SEQUENCE {sequencia} AS BIGINT;
+
+    CREATE TABLE "{schema}".{tabela} (
+        {coluna_id} BIGINT NOT NULL DEFAULT nextval('{sequencia}'),
+        {definicoes},
+        PRIMARY KEY ({coluna_id}, competencia),
+        FOREIGN KEY (colaborador_sk) REFERENCES "{schema}".dim_colaboradores_base(colaborador_sk)
+    ) PARTITION BY RANGE (competencia);
+    ALTER SEQUENCE {sequencia} OWNED BY "{schema}".{tabela}.{coluna_id};
+
+    DO $$
+    DECLARE
+        mes DATE;
+    BEGIN
+        FOR mes IN SELECT DISTINCT CAST(date_trunc('month', competencia) AS DATE)
+                   FROM "{schema}".{legado} WHERE competencia IS NOT NULL LOOP
+            EXECUTE format('CREATE TABLE %I.%I PARTITION OF %I.%I FOR VALUES FROM (%L) TO (%L)',
+                           '{schema}', '{tabela}_' || to_char(mes, 'YYYYMM'), '{schema}', '{tabela}',
+                           mes, CAST(mes + INTERVAL '1 month' AS DATE));
+        END LOOP;
+    END $$;
+
+    INSERT INTO "{schema}".{tabela} ({nomes})
+    SELECT {nomes} FROM "{schema}".{legado} WHERE competencia IS NOT NULL;
+    DROP TABLE "{schema}".{legado};
+    """
+
+
+def _v004_fatos_particionadas(schema):
+    return "\n".join(_particionar_fato(schema, tabela) for tabela in FATOS_PARTICIONADAS)
+
+
+# (versão, descrição, função que devolve o SQL para o schema)
+MIGRACOES = [
+    (1, "schema inicial (dimensões, fatos, benefícios, snapshot e marca d'água da API)", _v001_schema_inicial),
+    (2, "dim_colaboradores.telefone_pessoal", _v002_telefone_pessoal),
+    (3, "remove os stagings legados do schema", _v003_remove_stagings_legados),
+    (4, "fatos da folha particionadas por mês de competência", _v004_fatos_particionadas),
+]
+
+
+def versoes_aplicadas(conn, schema):
+    """
+    Versões já registradas em schema_version (vazio se a tabela não existe).
+    """
+    if conn.execute(text(f"SELECT to_regclass('\"{schema}\".{TABELA_VERSAO}')")).scalar() is None:
+        return set()
+    return set(conn.execute(text(f'SELECT versao FROM "{schema}".{TABELA_VERSAO}')).scalars())
+
+
+def aplicar_migracoes(engine, schema):
+    """
+    Aplica, em ordem e numa única transação, as migrações que o schema ainda
+    não tem. Um advisory lock serializa execuções simultâneas do pipeline; com
+    o schema em dia, só lê schema_version. Devolve as versões aplicadas agora.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:chave))"), {'chave': f"migracoes:{schema}"})
+        aplicadas = versoes_aplicadas(conn, schema)
+        ultima = MIGRACOES[-1][0]
+        if aplicadas and max(aplicadas) > ultima:
+            print(f"[AVISO] Schema {schema} está na versão {max(aplicadas)}, à frente deste código ({ultima}).")
+        pendentes = [m for m in MIGRACOES if m[0] not in aplicadas]
+        if not pendentes:
+            return []
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS "{schema}".{TABELA_VERSAO} (
+                versao INTEGER PRIMARY KEY, descricao VARCHAR(255),
+                aplicada_em TIMESTAMP DEFAULT current_timestamp
+            )"""))
+        for versao, descricao, gerar_sql in pendentes:
+            conn.execute(text(gerar_sql(schema)))
+            conn.execute(text(f'INSERT INTO "{schema}".{TABELA_VERSAO} (versao, descricao) '
+                              'VALUES (:versao, :descricao)'), {'versao': versao, 'descricao': descricao})
+            print(f"[OK] Migração {versao:03d} aplicada: {descricao}")
+    return [versao for versao, _, _ in pendentes]
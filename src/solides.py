@@ -0,0 +1,197 @@
+# src/solides.py
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+import pandas as pd
+
+BASE_URL_PADRAO = "https://app.solides.com/pt-BR/api/v1"
+WORKERS_PADRAO = 8
+RPS_PADRAO = 5.0
+TIMEOUT_PADRAO = 30
+MAX_TENTATIVAS = 5
+
+# Respostas que indicam limite de taxa/sobrecarga: espera (Retry-After) e tenta de novo
+STATUS_RETENTATIVA = (429, 503)
+
+# Marca (com o motivo) o item da listagem que entrou no lugar de um detalhe que não veio
+CHAVE_FALHA_DETALHE = '_falha_detalhe'
+
+
+class LimitadorTaxa:
+    """
+    Token bucket compartilhado entre as threads: no máximo `taxa` requisições
+    por segundo, com rajadas de até `capacidade` (padrão 1: ritmo uniforme, que
+    não estoura limites medidos em janela deslizante). `pausar` segura todas
+    as threads (usado quando a API responde 429 com Retry-After).
+    """
+
+    def __init__(self, taxa, capacidade=1.0):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = self.capacidade
+        self._ultimo = time.monotonic()
+        self._pausa_ate = 0.0
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        """
+        Bloqueia até haver um token disponível (sem limite se taxa for 0/None).
+        """
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                if agora >= self._pausa_ate:
+                    if not self.taxa:
+                        return
+                    self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+                    self._ultimo = agora
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    espera = (1 - self._tokens) / self.taxa
+                else:
+                    espera = self._pausa_ate - agora
+            time.sleep(espera)
+
+    def pausar(self, segundos):
+        """
+        Suspende todas as requisições por `segundos` e zera o balde (sem rajada na volta).
+        """
+        with self._lock:
+            self._pausa_ate = max(self._pausa_ate, time.monotonic() + segundos)
+            self._tokens = 0.0
+            self._ultimo = self._pausa_ate
+
+
+def criar_sessao(token, workers=WORKERS_PADRAO):
+    """
+    Session com keep-alive e pool de conexões do tamanho do número de threads.
+    """
+    sessao = requests.Session()
+    sessao.headers.update({"Authorization": f"Token token={token}", "Accept": "application/json"})
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, workers))
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    return sessao
+
+
+def _segundos_retry_after(resposta, tentativa):
+    """
+    Lê o Retry-After (segundos ou data HTTP); sem o cabeçalho, backoff exponencial.
+    """
+    valor = resposta.headers.get("Retry-After")
+    if valor:
+        try:
+            return max(0.0, float(valor))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return min(60.0, 2.0 ** tentativa)
+
+
+def get_com_limite(sessao, url, limitador, params=None, timeout=TIMEOUT_PADRAO, max_tentativas=MAX_TENTATIVAS):
+    """
+    GET respeitando o limitador de taxa. Em 429/503 pausa todas as threads pelo
+    Retry-After e tenta de novo; devolve a última resposta se esgotar as tentativas.
+    """
+    for tentativa in range(max_tentativas):
+        limitador.aguardar()
+        resposta = sessao.get(url, params=params, timeout=timeout)
+        if resposta.status_code not in STATUS_RETENTATIVA or tentativa == max_tentativas - 1:
+            return resposta
+        limitador.pausar(_segundos_retry_after(resposta, tentativa))
+    return resposta
+
+
+def iterar_paginas_colaboradores(sessao, base_url, limitador, page_size=100):
+    """
+    Percorre a paginação de /colaboradores (status=todos) até uma página vazia,
+    entregando uma página (lista de itens) por vez. Erro de rede ou HTTP levanta
+    exceção: uma listagem truncada passaria por sincronização completa (e o
+    pós-processamento marcaria como transferido quem não foi listado).
+    """
+    page = 1
+    while True:
+        r = get_com_limite(sessao, f"{base_url}/colaboradores", limitador,
+                           params={'page': page, 'page_size': page_size, 'status': 'todos'})
+        r.raise_for_status()
+        data = r.json()
+        if not data: break
+        print(f"Página {page} carregada...")
+        yield data
+        page += 1
+
+
+def _detalhe_colaborador(sessao, base_url, limitador, item):
+    """
+    Detalhe de um colaborador; em erro devolve o item da listagem (como antes),
+    marcado com o motivo em CHAVE_FALHA_DETALHE.
+    """
+    try:
+        r_det = get_com_limite(sessao, f"{base_url}/colaboradores/{item['id']}", limitador)
+        if r_det.status_code == 200:
+            return r_det.json()
+        motivo = f"HTTP {r_det.status_code}"
+    except Exception as e:
+        motivo = f"{type(e).__name__}: {e}"
+    return {**item, CHAVE_FALHA_DETALHE: motivo}
+
+
+def buscar_detalhes(sessao, base_url, itens, limitador, workers=WORKERS_PADRAO, executor=None):
+    """
+    Busca /colaboradores/{id} de cada item em paralelo (threads + Session
+    compartilhada). O resultado sai na ordem da listagem; itens sem id são ignorados.
+    Detalhe que falhou vem como o item da listagem marcado (ver ids_com_falha).
+    `executor` permite reaproveitar o mesmo pool de threads entre chamadas.
+    """
+    itens = [item for item in itens if item.get('id')]
+    buscar = lambda item: _detalhe_colaborador(sessao, base_url, limitador, item)
+    if executor is not None:
+        return list(executor.map(buscar, itens))
+    if workers <= 1:
+        return [buscar(item) for item in itens]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(buscar, itens))
+
+
+def ids_com_falha(detalhes):
+    """
+    Ids dos colaboradores cujo detalhe não foi buscado (ficaram com os dados da listagem).
+    """
+    return {d.get('id') for d in detalhes if d.get(CHAVE_FALHA_DETALHE)}
+
+
+def instantes_atualizacao(itens):
+    """
+    updated_at de cada item da listagem como Timestamp (UTC, sem fuso); NaT se ausente/inválido.
+    """
+    valores = pd.Series([item.get('updated_at') for item in itens], dtype=object)
+    instantes = pd.to_datetime(valores, errors='coerce', utc=True, format='mixed', dayfirst=True)
+    return instantes.dt.tz_convert(None)
+
+
+def selecionar_para_detalhe(itens, marca=None, ids_locais=None):
+    """
+    Sincronização incremental: mantém só os itens com updated_at >= marca (ou
+    sem updated_at legível) e os que ainda não existem localmente. Sem marca,
+    devolve todos (sincronização completa).
+    """
+    if marca is None:
+        return list(itens)
+    ids_locais = ids_locais or set()
+    instantes = instantes_atualizacao(itens)
+    return [item for item, instante in zip(itens, instantes)
+            if pd.isna(instante) or instante >= marca or item.get('id') not in ids_locais]
+
+
+def marca_da_listagem(itens):
+    """
+    Nova marca d'água: o maior updated_at da listagem (None se nenhum for legível).
+    """
+    maior = instantes_atualizacao(itens).max() if itens else pd.NaT
+    return None if pd.isna(maior) else maior.to_pydatetime()
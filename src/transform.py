@@ -1,8 +1,11 @@
 import pandas as pd
 import numpy as np
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from datetime import datetime
-from .utils import clean_text_series, limpar_valor_moeda
+from .utils import clean_text_series, limpar_valor_moeda_series
+from .solides import instantes_atualizacao, ids_com_falha
+from .metrics import medir
+from .constants import COLUNAS_MONETARIAS_TOTAIS, COLUNAS_MONETARIAS_RUBRICAS
 
 
 def converter_para_decimal(val):
@@ -17,6 +20,48 @@ def converter_para_decimal(val):
         return None
 
 
+def _centavos_decimal(valor):
+    """
+    Centavos de um Decimal, arredondando meio para longe do zero (como o NUMERIC do Postgres).
+    """
+    if valor is None or not valor.is_finite():
+        return pd.NA
+    return int((valor * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def converter_para_centavos(serie):
+    """
+    Converte uma coluna monetária para centavos inteiros (Int64, nulo = <NA>).
+    Equivale ao converter_para_decimal seguido do arredondamento do banco
+    para 2 casas. Valores com até 2 casas (todos os da folha) são convertidos
+    direto no numpy; só os com mais casas passam pelo Decimal.
+    """
+    if not pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        return pd.array([_centavos_decimal(converter_para_decimal(v)) for v in serie], dtype='Int64')
+
+    valores = serie.to_numpy(dtype='float64', na_value=np.nan)
+    centavos = valores * 100
+    inteiros = np.round(centavos)
+    # Tolerância do erro de representação do float (1.10 * 100 = 110.00000000000001)
+    with np.errstate(invalid='ignore'):  # inf - inf
+        exatos = np.abs(centavos - inteiros) <= np.maximum(1e-6, 8 * np.spacing(np.abs(centavos)))
+
+    resultado = pd.array(np.where(exatos, inteiros, 0).astype('int64'), dtype='Int64')
+    resultado[np.isnan(valores)] = pd.NA
+    for i in np.flatnonzero(~exatos & ~np.isnan(valores)):
+        resultado[i] = _centavos_decimal(converter_para_decimal(float(valores[i])))
+    return resultado
+
+
+def centavos_para_texto(serie):
+    """
+    Formata centavos como o CSV sempre saiu (str do Decimal: '1234.56', '5000.0').
+    """
+    valores = serie.to_numpy(dtype='float64', na_value=np.nan) / 100
+    texto = pd.Series(valores, index=serie.index).astype(str)
+    return texto.where(~np.isnan(valores), None)
+
+
 def parse_date_seguro(val):
     """
     Tenta converter qualquer coisa para data (Date Object).
@@ -51,75 +96,152 @@ def parse_date_seguro(val):
     return None
 
 
+# Mesmos formatos do parse_date_seguro, na mesma ordem. Como cada string só
+# pode casar com um deles (separador e posição do ano diferem), a ordem da
+# cascata não muda o resultado.
+FORMATOS_DATA = ['%d/%m/%Y', '%Y-%m-%d', '%m/%Y', '%m-%Y', '%d-%m-%Y', '%Y/%m/%d']
+
+
+def parse_date_series(serie):
+    """
+    Versão vetorizada do parse_date_seguro para uma coluna inteira.
+    Trabalha só sobre os valores distintos (a competência do detalhe repete
+    milhões de vezes): aplica pd.to_datetime com cada formato em cascata sobre
+    o que ainda não foi convertido, e o que sobrar (ex: datas fora do intervalo
+    do pandas, como 31/12/9999) passa pelo parse_date_seguro.
+    Retorna objetos date / None, como o parse_date_seguro.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    if len(unicos) == 0:
+        return pd.Series([None] * len(serie), index=serie.index, dtype=object)
+
+    textos = pd.Series([str(v).strip() for v in unicos], dtype=object)
+    validos = (textos != '') & (textos.str.lower() != 'nan')
+
+    convertidas = pd.Series(pd.NaT, index=textos.index, dtype='datetime64[ns]')
+    pendentes = validos.copy()
+    for fmt in FORMATOS_DATA:
+        if not pendentes.any():
+            break
+        tentativa = pd.to_datetime(textos[pendentes], format=fmt, errors='coerce')
+        convertidas[tentativa.index] = tentativa
+        pendentes &= convertidas.isna()
+
+    datas = np.array([None] * len(unicos), dtype=object)
+    ok = convertidas.notna().to_numpy()
+    datas[ok] = [ts.date() for ts in convertidas[ok]]
+    for i in np.flatnonzero(pendentes.to_numpy()):
+        datas[i] = parse_date_seguro(unicos[i])
+
+    resultado = np.empty(len(serie), dtype=object)
+    resultado[:] = None
+    presentes = codigos >= 0
+    resultado[presentes] = datas[codigos[presentes]]
+    return pd.Series(resultado, index=serie.index, dtype=object)
+
+
 def transformar_dados_pdf(df_consol, df_detalhe):
     """
-    Aplica tipagem forte (Date, Decimal) nos dados extraídos do PDF.
+    Aplica tipagem forte (Date, centavos Int64) nos dados extraídos do PDF.
     """
-    colunas_monetarias_consol = [
-        'salario_contratual', 'total_proventos', 'total_descontos',
-        'valor_liquido', 'base_inss', 'base_fgts', 'valor_fgts',
-        'base_irrf'
-    ]
-    colunas_monetarias_detalhe = ['valor_rubrica']
+    colunas_monetarias_consol = COLUNAS_MONETARIAS_TOTAIS
+    colunas_monetarias_detalhe = COLUNAS_MONETARIAS_RUBRICAS
 
     # --- 1. CONSOLIDADO ---
     if not df_consol.empty:
-        # Tratamento de Datas (Usa o parser seguro)
-        for col in ['data_admissao', 'data_demissao', 'competencia']:
-            if col in df_consol.columns:
-                df_consol[col] = df_consol[col].apply(parse_date_seguro)
-
-        # Tratamento Monetário
-        for col in colunas_monetarias_consol:
-            if col in df_consol.columns:
-                df_consol[col] = df_consol[col].apply(converter_para_decimal)
+        # Tratamento de Datas (parser vetorizado, mesma regra do parse_date_seguro)
+        with medir('consolidado/datas', linhas_entrada=len(df_consol)):
+            for col in ['data_admissao', 'data_demissao', 'competencia']:
+                if col in df_consol.columns:
+                    df_consol[col] = parse_date_series(df_consol[col])
+
+        # Tratamento Monetário (centavos inteiros; vira NUMERIC só na carga)
+        with medir('consolidado/moeda', linhas_entrada=len(df_consol)):
+            for col in colunas_monetarias_consol:
+                if col in df_consol.columns:
+                    df_consol[col] = converter_para_centavos(df_consol[col])
 
         # CPF
-        if 'cpf' in df_consol.columns:
-            df_consol['cpf'] = df_consol['cpf'].astype(str).str.replace(r'[^\d]', '', regex=True)
-            df_consol['cpf'] = df_consol['cpf'].replace(['', 'None', 'nan', 'NaT'], None)
+        with medir('consolidado/cpf', linhas_entrada=len(df_consol)):
+            if 'cpf' in df_consol.columns:
+                df_consol['cpf'] = df_consol['cpf'].astype(str).str.replace(r'[^\d]', '', regex=True)
+                df_consol['cpf'] = df_consol['cpf'].replace(['', 'None', 'nan', 'NaT'], None)
 
         # Texto Geral
-        cols_ignoradas = ['competencia', 'data_admissao', 'data_demissao', 'cpf'] + colunas_monetarias_consol
-        cols_texto = [c for c in df_consol.columns if c not in cols_ignoradas]
-        for col in cols_texto:
-            df_consol[col] = clean_text_series(df_consol[col])
+        with medir('consolidado/texto', linhas_entrada=len(df_consol)):
+            cols_ignoradas = ['competencia', 'data_admissao', 'data_demissao', 'cpf'] + colunas_monetarias_consol
+            cols_texto = [c for c in df_consol.columns if c not in cols_ignoradas]
+            for col in cols_texto:
+                df_consol[col] = clean_text_series(df_consol[col])
 
     # --- 2. DETALHADO ---
     if not df_detalhe.empty:
         # Competência
-        if 'competencia' in df_detalhe.columns:
-            df_detalhe['competencia'] = df_detalhe['competencia'].apply(parse_date_seguro)
+        with medir('detalhado/datas', linhas_entrada=len(df_detalhe)):
+            if 'competencia' in df_detalhe.columns:
+                df_detalhe['competencia'] = parse_date_series(df_detalhe['competencia'])
 
         # Monetário
-        for col in colunas_monetarias_detalhe:
-            if col in df_detalhe.columns:
-                df_detalhe[col] = df_detalhe[col].apply(converter_para_decimal)
+        with medir('detalhado/moeda', linhas_entrada=len(df_detalhe)):
+            for col in colunas_monetarias_detalhe:
+                if col in df_detalhe.columns:
+                    df_detalhe[col] = converter_para_centavos(df_detalhe[col])
 
         # CPF
-        if 'cpf' in df_detalhe.columns:
-            df_detalhe['cpf'] = df_detalhe['cpf'].astype(str).str.replace(r'[^\d]', '', regex=True)
-            df_detalhe['cpf'] = df_detalhe['cpf'].replace(['', 'None', 'nan'], None)
+        with medir('detalhado/cpf', linhas_entrada=len(df_detalhe)):
+            if 'cpf' in df_detalhe.columns:
+                df_detalhe['cpf'] = df_detalhe['cpf'].astype(str).str.replace(r'[^\d]', '', regex=True)
+                df_detalhe['cpf'] = df_detalhe['cpf'].replace(['', 'None', 'nan'], None)
 
         # Texto
-        cols_ignoradas_det = ['competencia', 'cpf'] + colunas_monetarias_detalhe
-        cols_texto_det = [c for c in df_detalhe.columns if c not in cols_ignoradas_det]
-        for col in cols_texto_det:
-            df_detalhe[col] = clean_text_series(df_detalhe[col])
+        with medir('detalhado/texto', linhas_entrada=len(df_detalhe)):
+            cols_ignoradas_det = ['competencia', 'cpf'] + colunas_monetarias_detalhe
+            cols_texto_det = [c for c in df_detalhe.columns if c not in cols_ignoradas_det]
+            for col in cols_texto_det:
+                df_detalhe[col] = clean_text_series(df_detalhe[col])
 
     return df_consol, df_detalhe
 
 
+# Colunas do staging de colaboradores (também usadas quando a API não devolve nada)
+COLUNAS_STAGING_API = [
+    'colaborador_id_solides', 'cpf', 'nome_completo', 'matricula', 'email_corporativo',
+    'data_nascimento', 'genero', 'estado_civil', 'saudacao', 'nacionalidade',
+    'tipo_necessidade_especial', 'naturalidade', 'nome_pai', 'nome_mae', 'pcd',
+    'data_admissao', 'data_demissao', 'salario_api', 'turno_trabalho', 'tipo_contrato',
+    'data_contrato', 'escolaridade', 'curso_formacao', 'nivel_hierarquico',
+    'duracao_contrato', 'data_expiracao_contrato', 'periodo_experiencia_dias',
+    'forma_demissao', 'decisao_demissao', 'valor_rescisao', 'total_beneficios_api',
+    'ativo', 'etnia', 'data_ultima_atualizacao_api',
+    'nome_lider_imediato', 'lider_id_solides', 'unidade_nome', 'unidade_id_solides',
+    'cargo_nome_api', 'cargo_id_solides', 'departamento_nome_api', 'departamento_id_solides',
+    'cep', 'logradouro', 'numero_endereco', 'complemento_endereco', 'bairro', 'cidade', 'estado',
+    'celular', 'email_pessoal', 'telefone_emergencia',
+    'rg', 'data_emissao_rg', 'orgao_emissor_rg', 'titulo_eleitor', 'zona_eleitoral', 'secao_eleitoral',
+    'ctps_numero', 'ctps_serie', 'pis', 'banco_nome', 'banco_agencia', 'banco_conta'
+]
+
+# Detalhes da API transformados e carregados de uma vez (ver transformar_lotes_api)
+REGISTROS_POR_LOTE_API = 1000
+
+COLUNAS_BENEFICIOS_API = [
+    'colaborador_id_solides', 'nome_beneficio', 'tipo_beneficio',
+    'valor_beneficio', 'valor_desconto', 'periodicidade',
+    'opcao_desconto', 'aplicado_como'
+]
+
+
 def transformar_dados_api(lista_dicts_api):
     """
     Transforma a lista de dicionários brutos da API Solides em um DataFrame Pandas.
     Aplica achatamento (flatten) completo para pegar campos aninhados.
     """
     if not lista_dicts_api:
-        return pd.DataFrame()
+        return pd.DataFrame(columns=COLUNAS_STAGING_API)
 
     # O json_normalize faz o trabalho pesado de 'achatar' objetos aninhados
-    df = pd.json_normalize(lista_dicts_api)
+    with medir('json_normalize', linhas_entrada=len(lista_dicts_api)):
+        df = pd.json_normalize(lista_dicts_api)
 
     # Função auxiliar para limpar CPF apenas números
     def clean_digits(val):
@@ -207,62 +329,48 @@ def transformar_dados_api(lista_dicts_api):
     # --- Limpeza de Tipos ---
 
     # CPF
-    if 'cpf' in df.columns:
-        df['cpf'] = df['cpf'].apply(clean_digits)
-    else:
-        # Fallback simples se não achar no documents.idNumber
-        cols_cpf = ['documents.cpf', 'idNumber']
-        for c in cols_cpf:
-            if c in lista_dicts_api[0]:
-                pass
-        df['cpf'] = None
-
-        # Moeda
-    for col in ['salario_api', 'valor_rescisao', 'total_beneficios_api']:
-        if col in df.columns:
-            df[col] = df[col].apply(limpar_valor_moeda)
+    with medir('cpf', linhas_entrada=len(df)):
+        if 'cpf' in df.columns:
+            df['cpf'] = df['cpf'].apply(clean_digits)
+        else:
+            # Fallback simples se não achar no documents.idNumber
+            cols_cpf = ['documents.cpf', 'idNumber']
+            for c in cols_cpf:
+                if c in lista_dicts_api[0]:
+                    pass
+            df['cpf'] = None
+
+    # Moeda
+    with medir('moeda', linhas_entrada=len(df)):
+        for col in ['salario_api', 'valor_rescisao', 'total_beneficios_api']:
+            if col in df.columns:
+                df[col] = limpar_valor_moeda_series(df[col])
 
     # Datas (Agora usando o parse seguro)
     date_cols = [
         'data_nascimento', 'data_admissao', 'data_demissao', 'data_contrato',
         'data_expiracao_contrato', 'data_emissao_rg', 'data_ultima_atualizacao_api'
     ]
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = df[col].apply(parse_date_seguro)
+    with medir('datas', linhas_entrada=len(df)):
+        for col in date_cols:
+            if col in df.columns:
+                df[col] = parse_date_series(df[col])
 
     # Booleanos
     if 'pcd' in df.columns: df['pcd'] = df['pcd'].astype('boolean')
     if 'ativo' in df.columns: df['ativo'] = df['ativo'].astype('boolean')
 
     # --- Schema Final ---
-    colunas_finais = [
-        'colaborador_id_solides', 'cpf', 'nome_completo', 'matricula', 'email_corporativo',
-        'data_nascimento', 'genero', 'estado_civil', 'saudacao', 'nacionalidade',
-        'tipo_necessidade_especial', 'naturalidade', 'nome_pai', 'nome_mae', 'pcd',
-        'data_admissao', 'data_demissao', 'salario_api', 'turno_trabalho', 'tipo_contrato',
-        'data_contrato', 'escolaridade', 'curso_formacao', 'nivel_hierarquico',
-        'duracao_contrato', 'data_expiracao_contrato', 'periodo_experiencia_dias',
-        'forma_demissao', 'decisao_demissao', 'valor_rescisao', 'total_beneficios_api',
-        'ativo', 'etnia', 'data_ultima_atualizacao_api',
-        'nome_lider_imediato', 'lider_id_solides', 'unidade_nome', 'unidade_id_solides',
-        'cargo_nome_api', 'cargo_id_solides', 'departamento_nome_api', 'departamento_id_solides',
-        'cep', 'logradouro', 'numero_endereco', 'complemento_endereco', 'bairro', 'cidade', 'estado',
-        'celular', 'email_pessoal', 'telefone_emergencia',
-        'rg', 'data_emissao_rg', 'orgao_emissor_rg', 'titulo_eleitor', 'zona_eleitoral', 'secao_eleitoral',
-        'ctps_numero', 'ctps_serie', 'pis', 'banco_nome', 'banco_agencia', 'banco_conta'
-    ]
-
-    for col in colunas_finais:
+    for col in COLUNAS_STAGING_API:
         if col not in df.columns:
             df[col] = None
 
-    return df[colunas_finais].copy()
+    return df[COLUNAS_STAGING_API].copy()
 
 
 def transformar_beneficios_api(lista_dicts_api):
     if not lista_dicts_api:
-        return pd.DataFrame()
+        return pd.DataFrame(columns=COLUNAS_BENEFICIOS_API)
 
     lista_beneficios = []
     for colab in lista_dicts_api:
@@ -285,13 +393,59 @@ def transformar_beneficios_api(lista_dicts_api):
     df = pd.DataFrame(lista_beneficios)
 
     if df.empty:
-        return pd.DataFrame(columns=[
-            'colaborador_id_solides', 'nome_beneficio', 'tipo_beneficio',
-            'valor_beneficio', 'valor_desconto', 'periodicidade',
-            'opcao_desconto', 'aplicado_como'
-        ])
-
-    df['valor_beneficio'] = df['valor_bruto'].apply(limpar_valor_moeda)
-    df['valor_desconto'] = df['valor_desconto_bruto'].apply(limpar_valor_moeda)
+        return pd.DataFrame(columns=COLUNAS_BENEFICIOS_API)
+
+    df['valor_beneficio'] = limpar_valor_moeda_series(df['valor_bruto'])
+    df['valor_desconto'] = limpar_valor_moeda_series(df['valor_desconto_bruto'])
     df.drop(columns=['valor_bruto', 'valor_desconto_bruto'], inplace=True)
-    return df
\ No newline at end of file
+    return df
+
+
+def transformar_listagem_api(itens_listagem, ids_falhos=()):
+    """
+    Ids e updated_at (Timestamp, NaT se ilegível) de uma página da listagem da API,
+    com detalhe_falhou=True para os ids em `ids_falhos` (detalhe não buscado).
+    """
+    itens = [item for item in itens_listagem if item.get('id')]
+    return pd.DataFrame({
+        'colaborador_id_solides': pd.array([item['id'] for item in itens], dtype='Int64'),
+        'updated_at': instantes_atualizacao(itens).to_numpy(),
+        'detalhe_falhou': [item['id'] in ids_falhos for item in itens],
+    })
+
+
+def transformar_lotes_api(lotes_api, registros_por_lote=REGISTROS_POR_LOTE_API):
+    """
+    Transforma a API em lotes: junta as páginas (itens da listagem, detalhes)
+    até `registros_por_lote` detalhes e gera (df_listagem, df_colaboradores,
+    df_beneficios) por lote, sem nunca montar a lista bruta inteira nem o
+    DataFrame achatado de todos os colaboradores. A memória fica limitada a um
+    lote; lotes muito pequenos pagam caro o custo fixo do json_normalize e das
+    conversões por coluna.
+    """
+    itens_lote, detalhes_lote = [], []
+    for itens_listagem, detalhes in lotes_api:
+        itens_lote.extend(itens_listagem)
+        detalhes_lote.extend(detalhes)
+        # a listagem também fecha o lote (incremental: muitas páginas sem detalhe)
+        if len(detalhes_lote) >= registros_por_lote or len(itens_lote) >= 10 * registros_por_lote:
+            yield _transformar_lote_api(itens_lote, detalhes_lote)
+            itens_lote, detalhes_lote = [], []
+    if itens_lote or detalhes_lote:
+        yield _transformar_lote_api(itens_lote, detalhes_lote)
+
+
+def _transformar_lote_api(itens_listagem, detalhes):
+    """
+    (df_listagem, df_colaboradores, df_beneficios) de um lote, medido por grupo.
+    """
+    with medir('transformacao', linhas_entrada=len(detalhes)) as m:
+        with medir('listagem', linhas_entrada=len(itens_listagem)):
+            df_listagem = transformar_listagem_api(itens_listagem, ids_com_falha(detalhes))
+        with medir('colaboradores', linhas_entrada=len(detalhes)):
+            df_colaboradores = transformar_dados_api(detalhes)
+        with medir('beneficios', linhas_entrada=len(detalhes)) as m_ben:
+            df_beneficios = transformar_beneficios_api(detalhes)
+            m_ben['linhas_saida'] = len(df_beneficios)
+        m['linhas_saida'] = len(df_colaboradores)
+    return df_listagem, df_colaboradores, df_beneficios
@@ -43,4 +43,62 @@ def limpar_valor_moeda(valor_str):
             return float(valor_limpo)
         except (ValueError, TypeError):
             return None
-    return None
\ No newline at end of file
+    return None
+
+
+# Separador para juntar os textos de uma coluna numa string só (não aparece em valores reais)
+_SEPARADOR_LOTE = '\x00'
+
+
+def _float_ou_nan(texto):
+    try:
+        return float(texto)
+    except ValueError:
+        return np.nan
+
+
+def _converter_textos_moeda(textos):
+    """
+    Aplica as trocas do limpar_valor_moeda (R$, ponto de milhar, vírgula decimal)
+    de uma vez só sobre todos os textos juntos e converte em bloco.
+    O strip não é necessário: o float() já ignora espaços nas pontas e trata
+    texto vazio/só espaços como inválido, que vira NaN como no escalar.
+    """
+    junto = _SEPARADOR_LOTE.join(textos)
+    if junto.count(_SEPARADOR_LOTE) != len(textos) - 1:
+        return np.array([limpar_valor_moeda(t) for t in textos], dtype='float64')
+
+    junto = junto.replace('R$', '').replace('.', '').replace(',', '.')
+    partes = np.array(junto.split(_SEPARADOR_LOTE), dtype=object)
+    try:
+        # object -> float64 chama float() em cada item (mesma regra do escalar)
+        return partes.astype('float64')
+    except ValueError:
+        return np.array([_float_ou_nan(p) for p in partes], dtype='float64')
+
+
+def limpar_valor_moeda_series(serie):
+    """
+    Versão vetorizada do limpar_valor_moeda para uma Series inteira.
+    Retorna float64 (NaN onde a função escalar devolveria None), que é o mesmo
+    resultado de serie.apply(limpar_valor_moeda) numa coluna com algum valor.
+    """
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+        return serie.astype('float64')
+
+    resultado = np.full(len(serie), np.nan)
+    valores = serie.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(valores, skipna=True) == 'string':
+        eh_texto = ~pd.isna(valores)
+    else:
+        eh_texto = np.fromiter((isinstance(v, str) for v in valores), dtype=bool, count=len(valores))
+
+    if eh_texto.any():
+        resultado[eh_texto] = _converter_textos_moeda(valores[eh_texto].tolist())
+
+    # Números soltos numa coluna object (ex: JSON com salário numérico em alguns registros)
+    outros = ~eh_texto & ~pd.isna(valores)
+    if outros.any():
+        resultado[outros] = np.array([limpar_valor_moeda(v) for v in valores[outros]], dtype='float64')
+
+    return pd.Series(resultado, index=serie.index, dtype='float64', name=serie.name)
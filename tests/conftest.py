@@ -0,0 +1,48 @@
+# tests/conftest.py
+import io
+import os
+import sys
+import contextlib
+
+import pytest
+from sqlalchemy import text
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.gerar_holerites import gerar_pasta
+from src.migrations import aplicar_migracoes
+
+SCHEMA_TESTE = 'teste_pipeline'
+VARIAVEIS_BANCO = ('DB_USER', 'DB_PASS', 'DB_HOST', 'DB_PORT', 'DB_NAME')
+
+
+@pytest.fixture(scope='session')
+def pasta_pdfs(tmp_path_factory):
+    """
+    Pasta com holerite, férias e 13º sintéticos (benchmarks/gerar_holerites.py).
+    """
+    pasta = tmp_path_factory.mktemp('pdfs')
+    gerar_pasta(str(pasta), 12)
+    return str(pasta)
+
+
+@pytest.fixture
+def banco():
+    """
+    (engine, schema) de um schema descartável, com as migrações aplicadas, no
+    banco das variáveis DB_* do .env. Sem banco configurado, o teste é pulado.
+    """
+    if not all(os.getenv(v) for v in VARIAVEIS_BANCO):
+        pytest.skip("banco não configurado (variáveis DB_*)")
+    from src.database import get_db_engine
+    engine, _ = get_db_engine()
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS "{SCHEMA_TESTE}" CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA "{SCHEMA_TESTE}"'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        aplicar_migracoes(engine, SCHEMA_TESTE)
+    yield engine, SCHEMA_TESTE
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS "{SCHEMA_TESTE}" CASCADE'))
+    engine.dispose()
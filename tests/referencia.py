@@ -0,0 +1,195 @@
+# tests/referencia.py
+"""
+Referências congeladas e geradores de dados sintéticos dos testes de paridade
+(os benchmarks/ importam daqui): a extração de campos do bloco como era antes,
+os textos de holerite e férias que o extract_text devolveria, valores
+aleatórios para as conversões do transform e a comparação de DataFrames.
+Não evolui junto com o src/: é contra isto que o código novo é conferido.
+"""
+import random
+import re
+from datetime import date
+
+import numpy as np
+
+from src.utils import limpar_valor_moeda
+
+DEPARTAMENTOS = ["1 - TI", "2 - FINANCEIRO", "3 - RH", "4 - OPERACOES"]
+
+
+def gerar_texto_holerite(n_funcionarios, seed=42):
+    """
+    Texto no layout do holerite mensal (Empr.:/Contr.:, Departamento:, rubricas e rodapé).
+    """
+    rng = random.Random(seed)
+    linhas = ["ARQ CONSULTORIA LTDA Cálculo: Folha Mensal", "Competência: 10/2023"]
+    for i in range(n_funcionarios):
+        if i % 25 == 0:
+            linhas.append(f"Departamento: {rng.choice(DEPARTAMENTOS)}")
+        linhas.append(f"Empr.: {1000 + i} FUNCIONARIO {i} Situação: Trabalhando "
+                      f"CPF: {rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}-{rng.randint(10, 99)} "
+                      f"Adm: 01/02/2020")
+        linhas.append("Cargo: 12 ANALISTA Salário: 5.000,00 C.B.O: 212405")
+        linhas.append("8781 Salario Empregado 30,00 5.000,00 P 998 INSS 14,00 500,00 D")
+        linhas.append("ND: 0")
+        linhas.append("Proventos: 5.000,00 Descontos: 500,00 Líquido: 4.500,00")
+    return "\n".join(linhas) + "\n"
+
+
+def gerar_texto_ferias(n_funcionarios, seed=7):
+    """
+    Texto no layout do recibo de férias (Matrícula:/Nome do Funcionário, totais sem dois-pontos).
+    """
+    rng = random.Random(seed)
+    linhas = ["RECIBO DE FÉRIAS", "Cálculo: Férias", "Período de Gozo: 01/11/2023 a 30/11/2023"]
+    for i in range(n_funcionarios):
+        linhas.append(f"Matrícula: {2000 + i} Nome do Funcionário FUNCIONARIO {i} PIS/PASEP: 1234")
+        linhas.append(f"CPF: {rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}-{rng.randint(10, 99)} Adm: 01/03/2019")
+        linhas.append("Cargo: ANALISTA DE SISTEMAS")
+        linhas.append("1 FERIAS NORMAIS 30,00 5.000,00 P")
+        linhas.append("Total de Proventos 5.000,00")
+        linhas.append("Total de Descontos 500,00")
+        linhas.append("Líquido de Férias 4.500,00")
+        linhas.append("Base INSS Férias 5.000,00 Base FGTS Férias 5.000,00")
+        linhas.append("Valor FGTS Férias 400,00 Base IRRF Férias 3.500,00")
+    return "\n".join(linhas) + "\n"
+
+
+def campos_antigos(bloco, converter=limpar_valor_moeda):
+    """
+    Extração de cabeçalho e rodapé como era feita antes (re.search por campo).
+    Com converter=None os valores monetários ficam no texto capturado, como os
+    devolve o extrair_campos_bloco.
+    """
+    moeda = converter or (lambda valor: valor)
+    dados = {}
+    vinculo_match = re.search(r'(Empr|Contr)\.?', bloco)
+    dados['vinculo'] = 'Empregado' if vinculo_match and 'Empr' in vinculo_match.group(0) else 'Contribuinte' if vinculo_match else None
+
+    situacao_match = re.search(r'Situação:\s*([^\n\r]+)', bloco)
+    if situacao_match:
+        dados['situacao'] = re.split(r'\s+(?:CPF:|Adm:|PIS/PASEP:|Matrícula:)', situacao_match.group(1), maxsplit=1)[0].strip()
+    else:
+        header_chunk_match = re.search(r'(?:Empr|Contr)\.?\s*:\s*\d+.*?(?=\n|CPF:)', bloco, re.DOTALL)
+        if header_chunk_match:
+            unlabeled = re.search(r'\s(Trabalhando|Afastado|Férias|Demitido)\s*$', header_chunk_match.group(0), re.IGNORECASE)
+            dados['situacao'] = unlabeled.group(1) if unlabeled else None
+        else:
+            dados['situacao'] = None
+
+    demissao_motivo_match = re.search(r'DEMITIDO EM\s+(\d{2}/\d{2}/\d{4})\s*-\s*(.*?)(?=\n|$)', bloco, re.IGNORECASE | re.DOTALL)
+    if demissao_motivo_match:
+        dados['data_demissao'] = demissao_motivo_match.group(1).strip()
+        dados['motivo_demissao'] = demissao_motivo_match.group(2).strip()
+    else:
+        demissao_match_antigo = re.search(r'(?:Data Demissão|Demissão):\s*(\d{2}/\d{2}/\d{4})', bloco, re.IGNORECASE)
+        dados['data_demissao'] = demissao_match_antigo.group(1).strip() if demissao_match_antigo else None
+        dados['motivo_demissao'] = None
+
+    nome_match = re.search(r'(?:Empr|Contr)\.?\s*:\s*\d+\s+(.*?)(?=\s*Situação:|\s*CPF:|\s*Adm:|\n)', bloco, re.DOTALL | re.IGNORECASE)
+    if not nome_match:
+        nome_match = re.search(r'Nome do Funcionário\s+(.*?)(?=\s*Situação:|\s*PIS/PASEP:|\s*Matrícula:|\n)', bloco, re.DOTALL | re.IGNORECASE)
+    if nome_match:
+        nome_limpo = nome_match.group(1).replace('\n', ' ').strip()
+        status = dados.get('situacao', None)
+        if status != None and nome_limpo.lower().endswith(status.lower()):
+            nome_limpo = nome_limpo[:-len(status)].strip()
+        dados['nome_funcionario'] = re.sub(r'[^\s]+:\s*$', '', nome_limpo).strip()
+    else:
+        dados['nome_funcionario'] = None
+
+    cpf_match = re.search(r'CPF:\s*([\d\.\-]+)', bloco)
+    dados['cpf'] = cpf_match.group(1).strip() if cpf_match else None
+    admissao_match = re.search(r'Adm?:\s*(\d{2}/\d{2}/\d{4})', bloco)
+    dados['data_admissao'] = admissao_match.group(1).strip() if admissao_match else None
+
+    cargo_match = re.search(r'Cargo:\s*\d+\s+(.*?)(?=\s+Salário:|\s+C\.|С\.)', bloco, re.DOTALL)
+    if not cargo_match:
+        cargo_match = re.search(r'Cargo:\s+(.*?)(?=\s+Data de Pagamento:|\n)', bloco, re.DOTALL)
+    dados['cargo'] = cargo_match.group(1).replace('\n', ' ').strip() if cargo_match else None
+
+    salario_match = re.search(r'Salário:\s*([\d\.,]+)', bloco)
+    dados['salario_contratual'] = moeda(salario_match.group(1)) if salario_match else None
+
+    rodape = [
+        ('total_proventos', r'Proventos:\s*([\d\.,]+)', r'Total de Proventos\s+([\d\.,]+)'),
+        ('total_descontos', r'Descontos:\s*([\d\.,]+)', r'Total de Descontos\s+([\d\.,]+)'),
+        ('valor_liquido', r'L[íi]quido:\s*([\d\.,]+)', r'L[íi]quido de F[ée]rias\s+([\d\.,]+)'),
+        ('base_inss', r'Base INSS:\s*([\d\.,]+)', r'Base INSS F[ée]rias\s+([\d\.,]+)'),
+        ('base_fgts', r'Base FGTS:\s*([\d\.,]+)', r'Base FGTS F[ée]rias\s+([\d\.,]+)'),
+        ('valor_fgts', r'Valor FGTS:\s*([\d\.,]+)', r'Valor FGTS F[ée]rias\s+([\d\.,]+)'),
+        ('base_irrf', r'Base IRRF:\s*([\d\.,]+)', r'Base IRRF F[ée]rias\s+([\d\.,]+)'),
+    ]
+    for campo, primario, fallback in rodape:
+        m = re.search(primario, bloco, re.IGNORECASE)
+        if not m: m = re.search(fallback, bloco, re.IGNORECASE | re.DOTALL)
+        dados[campo] = moeda(m.group(1) if m else None)
+    return dados
+
+
+def variar(bloco, rng):
+    """
+    Deforma um bloco para exercitar casos de borda dos regex.
+    """
+    opcao = rng.randrange(6)
+    if opcao == 0:
+        return bloco.upper()
+    if opcao == 1:
+        i = rng.randrange(len(bloco))
+        return bloco[:i] + bloco[i + rng.randint(1, 15):]
+    if opcao == 2:
+        return bloco.replace("Situação: ", "", 1)
+    if opcao == 3:
+        return bloco.replace("Proventos:", "Total de Proventos: 1,00 Proventos:", 1)
+    if opcao == 4:
+        return bloco.replace("\n", " DEMITIDO EM 10/10/2023 - PEDIDO\nData Demissão: 11/10/2023\n", 1)
+    return bloco.replace("Cargo: 12", "Cargo:", 1).replace("Adm:", "Ad:", 1)
+
+
+def valor_data_aleatorio(rng):
+    d, m, a = rng.randint(0, 32), rng.randint(0, 13), rng.choice([1500, 1899, 1970, 2023, 2024, 2262, 2263, 9999])
+    dd, mm = (f"{d:02d}", f"{m:02d}") if rng.random() < 0.7 else (str(d), str(m))
+    formato = rng.randrange(12)
+    if formato == 0: return f"{dd}/{mm}/{a}"
+    if formato == 1: return f"{a}-{mm}-{dd}"
+    if formato == 2: return f"{mm}/{a}"
+    if formato == 3: return f"{mm}-{a}"
+    if formato == 4: return f"{dd}-{mm}-{a}"
+    if formato == 5: return f"{a}/{mm}/{dd}"
+    if formato == 6: return f"  {dd}/{mm}/{a} "
+    if formato == 7: return rng.choice([None, np.nan, '', ' ', 'nan', 'NaN', 'None', 'NULL', 'abc', '2023', '10/2023/1'])
+    if formato == 8: return date(rng.randint(1, 9999), rng.randint(1, 12), rng.randint(1, 28))
+    if formato == 9: return f"{a}-{mm}-{dd}T00:00:00"
+    if formato == 10: return f"{dd}/{mm}/{str(a)[2:]}"
+    return f"{dd}.{mm}.{a}"
+
+
+def valor_moeda_aleatorio(rng):
+    if rng.random() < 0.1:
+        return rng.choice([None, np.nan, 0, 7, -3, 2.5, True, False, '', ' ', 'R$', 'nan', 'inf', '1e3', '1_000', 'abc'])
+    if rng.random() < 0.5:
+        valor = f"{rng.uniform(-1e6, 1e6):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        return rng.choice(['', 'R$ ', 'R$', ' ', '\xa0']) + valor + rng.choice(['', ' ', '\xa0'])
+    return ''.join(rng.choice('0123456789.,-+ R$e\xa0') for _ in range(rng.randint(0, 10)))
+
+
+def normalizar(df):
+    """
+    Ordena linhas e colunas para comparar independente da ordem.
+    """
+    if df.empty:
+        return df
+    df = df[sorted(df.columns)].astype(str)
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def diferencas(df_ref, df_alt):
+    """
+    Linhas presentes em só um dos lados (no máximo algumas, para diagnóstico).
+    """
+    ref, alt = normalizar(df_ref), normalizar(df_alt)
+    if list(ref.columns) != list(alt.columns):
+        return f"colunas diferentes: {sorted(set(ref.columns) ^ set(alt.columns))}"
+    juntos = ref.merge(alt, how='outer', indicator=True)
+    so_um_lado = juntos[juntos['_merge'] != 'both']
+    return so_um_lado.head(5).to_string() if not so_um_lado.empty else None
@@ -0,0 +1,28 @@
+# tests/test_backends.py
+"""
+Paridade dos backends de extração de texto com o de referência (pdfplumber):
+as linhas consolidadas e de rubricas têm de sair iguais. O comparativo de
+tempo sobre os PDFs reais continua em benchmarks/paridade_backends.py.
+"""
+import pytest
+
+from src.backends import BACKENDS, BACKEND_PADRAO
+from src.extract import processar_pdfs
+from tests.referencia import diferencas
+
+
+@pytest.fixture(scope='module')
+def referencia(pasta_pdfs):
+    return processar_pdfs(pasta_pdfs, workers=1, backend=BACKEND_PADRAO)
+
+
+@pytest.mark.parametrize('backend', [b for b in BACKENDS if b != BACKEND_PADRAO])
+def test_backend_igual_a_referencia(pasta_pdfs, referencia, backend):
+    ref_consol, ref_detalhe = referencia
+    assert not ref_consol.empty and not ref_detalhe.empty
+
+    consol, detalhe = processar_pdfs(pasta_pdfs, workers=1, backend=backend)
+
+    assert (len(consol), len(detalhe)) == (len(ref_consol), len(ref_detalhe))
+    assert diferencas(ref_consol, consol) is None
+    assert diferencas(ref_detalhe, detalhe) is None
@@ -0,0 +1,57 @@
+# tests/test_campos_bloco.py
+"""
+Casos de ouro do extrair_campos_bloco: tem de dar exatamente o que a extração
+antiga (um re.search por campo, congelada em tests/referencia.py) capturava,
+nos blocos sintéticos de holerite e férias e em variações deles.
+"""
+import random
+
+import pytest
+
+from src.extract import segmentar_blocos, extrair_campos_bloco, PERFIS_LAYOUT
+from tests.referencia import gerar_texto_holerite, gerar_texto_ferias, campos_antigos, variar
+
+
+def _blocos(texto):
+    return [texto[i:f] for i, f in segmentar_blocos(texto)]
+
+
+BLOCOS = _blocos(gerar_texto_holerite(50)) + _blocos(gerar_texto_ferias(50))
+
+
+def test_holerite_campos_esperados():
+    bloco = _blocos(gerar_texto_holerite(1))[-1]
+    dados = extrair_campos_bloco(bloco, PERFIS_LAYOUT['holerite'])
+    assert dados['vinculo'] == 'Empregado'
+    assert dados['nome_funcionario'] == 'FUNCIONARIO 0'
+    assert dados['situacao'] == 'Trabalhando'
+    assert dados['data_admissao'] == '01/02/2020'
+    assert dados['cargo'] == 'ANALISTA'
+    assert dados['salario_contratual'] == '5.000,00'
+    totais = (dados['total_proventos'], dados['total_descontos'], dados['valor_liquido'])
+    assert totais == ('5.000,00', '500,00', '4.500,00')
+
+
+def test_ferias_campos_esperados():
+    bloco = _blocos(gerar_texto_ferias(1))[-1]
+    dados = extrair_campos_bloco(bloco, PERFIS_LAYOUT['ferias'])
+    assert dados['nome_funcionario'] == 'FUNCIONARIO 0'
+    assert dados['cargo'] == 'ANALISTA DE SISTEMAS'
+    assert dados['data_admissao'] == '01/03/2019'
+    totais = (dados['total_proventos'], dados['valor_liquido'], dados['base_irrf'])
+    assert totais == ('5.000,00', '4.500,00', '3.500,00')
+
+
+@pytest.mark.parametrize('perfil', ['generico', 'holerite', 'ferias'])
+def test_blocos_iguais_a_extracao_antiga(perfil):
+    blocos = [b for b in BLOCOS if perfil == 'generico' or (perfil == 'ferias') == b.startswith('Matrícula')]
+    for bloco in blocos:
+        assert extrair_campos_bloco(bloco, PERFIS_LAYOUT[perfil]) == campos_antigos(bloco, converter=None), bloco
+
+
+@pytest.mark.parametrize('semente', range(5))
+def test_variacoes_iguais_a_extracao_antiga(semente):
+    rng = random.Random(semente)
+    for _ in range(1000):
+        bloco = variar(rng.choice(BLOCOS), rng)
+        assert extrair_campos_bloco(bloco, PERFIS_LAYOUT['generico']) == campos_antigos(bloco, converter=None), bloco
@@ -0,0 +1,45 @@
+# tests/test_carga_api.py
+"""
+Marca d'água da sincronização da API (carregar_dados_api) contra um
+PostgreSQL de verdade (fixture `banco`: pulado sem as variáveis DB_*).
+"""
+from datetime import datetime
+
+from src.solides import CHAVE_FALHA_DETALHE
+from src.transform import transformar_lotes_api
+from src.load import carregar_dados_api, ler_estado_sync_api
+from benchmarks.fake_solides import gerar_colaborador, item_listagem
+
+
+def _sincronizar(banco, n_colaboradores, falhas=(), incremental=False):
+    """
+    Carrega uma página com `n_colaboradores`; os índices em `falhas` entram como
+    detalhe que falhou (item da listagem marcado, como em buscar_detalhes).
+    """
+    engine, schema = banco
+    colaboradores = [gerar_colaborador(i) for i in range(n_colaboradores)]
+    itens = [item_listagem(c) for c in colaboradores]
+    detalhes = [{**item_listagem(c), CHAVE_FALHA_DETALHE: 'HTTP 500'} if i in falhas else c
+                for i, c in enumerate(colaboradores)]
+    carregar_dados_api(transformar_lotes_api([(itens, detalhes)]), engine, schema, incremental=incremental)
+    return ler_estado_sync_api(engine, schema)[0]
+
+
+def _dia(i):
+    return datetime.strptime(gerar_colaborador(i)['updated_at'], '%Y-%m-%d')
+
+
+def test_marca_avanca_ate_o_maior_updated_at_sem_falhas(banco):
+    assert _sincronizar(banco, 10) == _dia(9)
+
+
+def test_marca_nao_passa_do_primeiro_detalhe_que_falhou(banco):
+    assert _sincronizar(banco, 10, falhas={7, 4}) == _dia(4)
+
+
+def test_falha_abaixo_da_marca_faz_a_marca_recuar(banco):
+    assert _sincronizar(banco, 10) == _dia(9)
+    # Colaborador novo (não está em dim_colaboradores) com updated_at antigo e detalhe falho
+    assert _sincronizar(banco, 12, falhas={2}, incremental=True) == _dia(2)
+    # Rebuscado com sucesso, a marca volta a avançar
+    assert _sincronizar(banco, 12, incremental=True) == _dia(11)
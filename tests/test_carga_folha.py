@@ -0,0 +1,47 @@
+# tests/test_carga_folha.py
+"""
+Carga das fatos da folha particionadas por mês (carregar_fatos_folha) contra
+um PostgreSQL de verdade (fixture `banco`: pulado sem as variáveis DB_*).
+"""
+import pytest
+from sqlalchemy import text
+
+from src.extract import processar_pdfs
+from src.transform import transformar_dados_pdf
+from src.load import carregar_fatos_folha
+
+
+@pytest.fixture(scope='module')
+def folha(pasta_pdfs):
+    return transformar_dados_pdf(*processar_pdfs(pasta_pdfs, workers=1))
+
+
+def _contagens(banco):
+    engine, schema = banco
+    with engine.connect() as conn:
+        return tuple(conn.execute(text(f'SELECT COUNT(*) FROM "{schema}"."{tabela}"')).scalar()
+                     for tabela in ('fato_folha_consolidada', 'fato_folha_detalhada'))
+
+
+def test_lote_seguinte_com_linhas_sem_competencia(banco, folha):
+    # Streaming: o segundo lote não troca mês nenhum (:meses vazio) e traz linhas sem competência
+    engine, schema = banco
+    df_consol, df_detalhe = folha
+    comps_carregadas = set()
+    carregar_fatos_folha(df_consol.iloc[:-3], df_detalhe.iloc[:-3], engine, schema, comps_carregadas)
+
+    resto_consol, resto_detalhe = df_consol.iloc[-3:].copy(), df_detalhe.iloc[-3:].copy()
+    resto_consol.loc[resto_consol.index[0], 'competencia'] = None
+    resto_detalhe.loc[resto_detalhe.index[0], 'competencia'] = None
+    carregar_fatos_folha(resto_consol, resto_detalhe, engine, schema, comps_carregadas)
+
+    assert _contagens(banco) == (len(df_consol) - 1, len(df_detalhe) - 1)
+
+
+def test_recarga_do_mes_substitui_as_linhas(banco, folha):
+    engine, schema = banco
+    df_consol, df_detalhe = folha
+    carregar_fatos_folha(df_consol, df_detalhe, engine, schema)
+    carregar_fatos_folha(df_consol, df_detalhe, engine, schema)
+
+    assert _contagens(banco) == (len(df_consol), len(df_detalhe))
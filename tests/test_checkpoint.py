@@ -0,0 +1,98 @@
+# tests/test_checkpoint.py
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import main
+from src import checkpoint
+from src.checkpoint import (iniciar_checkpoint, abrir_checkpoint, registrar_etapa, resultados_concluidos,
+                            aplicar_retencao_checkpoints)
+from src.dag import STATUS_REAPROVEITADA, executar_dag
+
+FRAME = pd.DataFrame({
+    'cpf': ['123.456.789-00', None],
+    'competencia': pd.to_datetime(['2023-10-01', '2023-11-01']).date,
+    'total_proventos': pd.array([500000, pd.NA], dtype='Int64'),
+    'salario': [5000.0, float('nan')],
+})
+
+
+@pytest.fixture(params=['parquet', 'pickle'])
+def formato(request, monkeypatch):
+    if request.param == 'parquet':
+        pytest.importorskip('pyarrow')
+    monkeypatch.setattr(checkpoint, 'FORMATO_FRAMES', request.param)
+    return request.param
+
+
+def _etapas_concluidas(dir_checkpoint):
+    return resultados_concluidos(*abrir_checkpoint(dir_checkpoint, dir_checkpoint))
+
+
+def test_frames_voltam_iguais_do_checkpoint(tmp_path, formato):
+    dir_checkpoint = iniciar_checkpoint(str(tmp_path), '20240101T000000', {'stream': None})
+    registrar_etapa(dir_checkpoint, 'pdf_extracao', 'ok',
+                    {'manifesto': {'arquivos': {'a.pdf': {'hash': 'x'}}}, 'consolidado': FRAME, 'detalhado': None})
+    registrar_etapa(dir_checkpoint, 'pdf_carga', 'erro', motivo="falhou")
+
+    concluidas = _etapas_concluidas(dir_checkpoint)
+
+    assert list(concluidas) == ['pdf_extracao']
+    resultado = concluidas['pdf_extracao']
+    assert resultado['manifesto'] == {'arquivos': {'a.pdf': {'hash': 'x'}}}
+    assert resultado['detalhado'] is None
+    pd.testing.assert_frame_equal(resultado['consolidado'], FRAME)
+    extensao = {'parquet': 'parquet', 'pickle': 'pkl'}[formato]
+    assert os.path.exists(os.path.join(dir_checkpoint, f"pdf_extracao__consolidado.{extensao}"))
+
+
+def test_etapa_concluida_e_reaproveitada_na_retomada(tmp_path, formato):
+    dir_checkpoint = iniciar_checkpoint(str(tmp_path), '20240101T000000', {})
+    registrar_etapa(dir_checkpoint, 'extracao', 'ok', {'consolidado': FRAME})
+    chamadas = []
+
+    def extracao(resultados):
+        chamadas.append('extracao')
+
+    def carga(resultados):
+        return {'linhas': len(resultados['extracao']['consolidado'])}
+
+    etapas = [('extracao', extracao, ()), ('carga', carga, ('extracao',))]
+    def ao_concluir(nome, situacao_etapa, resultado):
+        registrar_etapa(dir_checkpoint, nome, situacao_etapa['status'], resultado)
+
+    resultados, situacao = executar_dag(etapas, concluidas=_etapas_concluidas(dir_checkpoint), ao_concluir=ao_concluir)
+
+    assert chamadas == []
+    assert situacao['extracao']['status'] == STATUS_REAPROVEITADA
+    assert resultados['carga'] == {'linhas': 2}
+    assert set(_etapas_concluidas(dir_checkpoint)) == {'extracao', 'carga'}
+
+
+def test_busca_sem_snapshot_roda_de_novo(tmp_path, capsys):
+    dir_snapshot = tmp_path / '20240101T000000'
+    dir_snapshot.mkdir()
+    concluidas = {'api_busca': {'dir_snapshot': str(dir_snapshot)}, 'pdf_extracao': None}
+
+    assert main._descartar_busca_sem_snapshot(concluidas) == concluidas
+
+    dir_snapshot.rmdir()
+    assert main._descartar_busca_sem_snapshot(concluidas) == {'pdf_extracao': None}
+    assert "a busca da API roda de novo" in capsys.readouterr().out
+
+
+def test_retencao_mantem_os_mais_recentes_e_o_atual(tmp_path):
+    dir_checkpoints = str(tmp_path)
+    run_ids = ['20240101T000000', '20240102T000000', '20240103T000000', '20240104T000000']
+    for i, run_id in enumerate(run_ids):
+        dir_checkpoint = iniciar_checkpoint(dir_checkpoints, run_id, {})
+        gravado = time.time() - 3600 * (len(run_ids) - i)
+        os.utime(os.path.join(dir_checkpoint, checkpoint.ARQUIVO_ESTADO), (gravado, gravado))
+    # O mais antigo foi retomado há pouco: conta como recente
+    registrar_etapa(os.path.join(dir_checkpoints, run_ids[0]), 'api_busca', 'ok')
+
+    aplicar_retencao_checkpoints(dir_checkpoints, 1, atual=run_ids[1])
+
+    assert sorted(os.listdir(dir_checkpoints)) == [run_ids[0], run_ids[1]]
@@ -0,0 +1,73 @@
+# tests/test_extract.py
+from src.extract import PERFIS_LAYOUT, _extrair_blocos, classificar_layout, extrair_campos_bloco
+
+BLOCO_HOLERITE = (
+    "Empr.: {matricula} FULANO {matricula} Situação: Trabalhando CPF: 123.456.789-00 Adm: 01/02/2020\n"
+    "Cargo: 12 ANALISTA Salário: 5.000,00 C.B.O: 212405\n"
+    "8781 Salario Empregado 30,00 5.000,00 P 998 INSS 14,00 500,00 D\n"
+    "{fim}\n"
+    "Proventos: 5.000,00 Descontos: 500,00 Líquido: 4.500,00\n"
+)
+BLOCO_FERIAS = (
+    "Matrícula: {matricula} Nome do Funcionário FULANO {matricula} PIS/PASEP: 1234\n"
+    "CPF: 123.456.789-00 Adm: 01/03/2019\n"
+    "Cargo: ANALISTA DE SISTEMAS\n"
+    "1 FERIAS NORMAIS 30,00 5.000,00 P\n"
+    "Total de Proventos 5.000,00\n"
+    "Total de Descontos 500,00\n"
+    "Líquido de Férias 4.500,00\n"
+    "Base INSS Férias 5.000,00 Base FGTS Férias 5.000,00\n"
+    "Valor FGTS Férias 400,00 Base IRRF Férias 3.500,00\n"
+)
+TOTAIS = {'total_proventos': '5.000,00', 'total_descontos': '500,00', 'valor_liquido': '4.500,00'}
+TOTAIS_FERIAS = {**TOTAIS, 'base_inss': '5.000,00', 'base_fgts': '5.000,00', 'valor_fgts': '400,00',
+                 'base_irrf': '3.500,00'}
+CABECALHO = "ARQ CONSULTORIA LTDA Cálculo: Folha Mensal\nCompetência: 10/2023\nDepartamento: 1 - TI\n"
+
+
+def _rubricas_por_funcionario(paginas):
+    consolidados, rubricas = [], []
+    _extrair_blocos(paginas, consolidados, rubricas)
+    por_funcionario = {}
+    for r in rubricas:
+        por_funcionario.setdefault(r['nome_funcionario'], []).append(r['valor_rubrica'])
+    return por_funcionario
+
+
+def test_holerite_sem_nd_usa_rodape_como_fim_da_tabela():
+    # O layout sai da primeira página (holerite); o bloco da segunda não tem a linha "ND:"
+    paginas = [CABECALHO + BLOCO_HOLERITE.format(matricula=1000, fim="ND: 0"),
+               BLOCO_HOLERITE.format(matricula=1001, fim="Total de Proventos 5.000,00")]
+    assert classificar_layout(paginas[0]) == 'holerite'
+
+    rubricas = _rubricas_por_funcionario(paginas)
+
+    assert rubricas == {'FULANO 1000': ['5.000,00', '500,00'], 'FULANO 1001': ['5.000,00', '500,00']}
+
+
+def _totais(bloco, perfil):
+    dados = extrair_campos_bloco(bloco, PERFIS_LAYOUT[perfil])
+    return {campo: dados[campo] for campo in TOTAIS_FERIAS}
+
+
+def test_rodape_do_outro_layout_cai_no_padrao_alternativo():
+    bloco_ferias = BLOCO_FERIAS.format(matricula=2000)
+    bloco_holerite = BLOCO_HOLERITE.format(matricula=1000, fim="ND: 0")
+
+    assert _totais(bloco_ferias, 'holerite') == TOTAIS_FERIAS
+    assert _totais(bloco_ferias, 'ferias') == TOTAIS_FERIAS
+    assert {c: v for c, v in _totais(bloco_holerite, 'ferias').items() if v} == TOTAIS
+    assert _totais(bloco_holerite, 'ferias') == _totais(bloco_holerite, 'holerite')
+
+
+def test_paginas_com_layouts_misturados_mantem_os_totais():
+    # Primeira página de holerite, segunda com um bloco no layout de férias (e o contrário)
+    holerite = CABECALHO + BLOCO_HOLERITE.format(matricula=1000, fim="ND: 0")
+    ferias = "Cálculo: Férias\n" + BLOCO_FERIAS.format(matricula=2000)
+
+    for paginas in ([holerite, ferias], [ferias, holerite]):
+        consolidados = []
+        _extrair_blocos(paginas, consolidados, [])
+        totais = {d['nome_funcionario']: {c: d[c] for c in TOTAIS} for d in consolidados}
+
+        assert totais == {'FULANO 1000': TOTAIS, 'FULANO 2000': TOTAIS}
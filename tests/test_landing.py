@@ -0,0 +1,26 @@
+# tests/test_landing.py
+import os
+import time
+
+from src.landing import ARQUIVO_INDICE, IDADE_MAXIMA_TMP, aplicar_retencao, finalizar_snapshot, iniciar_snapshot
+
+
+def _snapshot(dir_landing, run_id):
+    finalizar_snapshot(iniciar_snapshot(dir_landing, run_id), {})
+
+
+def test_retencao_mantem_tmp_recente_de_outra_execucao(tmp_path, capsys):
+    dir_landing = str(tmp_path)
+    for run_id in ('20240101T000000', '20240102T000000', '20240103T000000'):
+        _snapshot(dir_landing, run_id)
+    iniciar_snapshot(dir_landing, '20240104T000000')   # execução sobreposta, ainda gravando
+    iniciar_snapshot(dir_landing, '20240105T000000')   # esta execução, interrompida
+    abandonado = iniciar_snapshot(dir_landing, '20231231T000000')
+    antigo = time.time() - IDADE_MAXIMA_TMP - 60
+    os.utime(abandonado, (antigo, antigo))
+
+    aplicar_retencao(dir_landing, 2, run_id='20240105T000000')
+
+    assert sorted(os.listdir(dir_landing)) == ['20240102T000000', '20240103T000000', '20240104T000000.tmp']
+    assert os.path.exists(os.path.join(dir_landing, '20240103T000000', ARQUIVO_INDICE))
+    assert "3 snapshot(s) antigo(s) removido(s)" in capsys.readouterr().out
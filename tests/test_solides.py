@@ -0,0 +1,99 @@
+# tests/test_solides.py
+"""
+Cliente da API Solides (src/solides.py) contra a API falsa local
+(benchmarks/fake_solides.py): paginação, 429/Retry-After e ordem dos detalhes.
+"""
+import time
+
+import pytest
+
+from src.extract import extrair_api_solides
+from src.solides import (CHAVE_FALHA_DETALHE, LimitadorTaxa, criar_sessao, iterar_paginas_colaboradores,
+                         ids_com_falha, _segundos_retry_after)
+from src.transform import transformar_listagem_api
+from benchmarks.fake_solides import iniciar_servidor
+
+
+@pytest.fixture
+def api_falsa():
+    """
+    Sobe uma API falsa por teste: iniciar(n_colaboradores, **opções) -> (estado, base_url).
+    """
+    servidores = []
+
+    def iniciar(n_colaboradores, **opcoes):
+        servidor, estado, base_url = iniciar_servidor(n_colaboradores, **opcoes)
+        servidores.append(servidor)
+        return estado, base_url
+
+    yield iniciar
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+class _Resposta:
+    def __init__(self, cabecalhos):
+        self.headers = cabecalhos
+
+
+def test_paginacao_ate_pagina_vazia(api_falsa):
+    estado, base_url = api_falsa(60)
+
+    paginas = list(iterar_paginas_colaboradores(criar_sessao('x'), base_url, LimitadorTaxa(0), page_size=25))
+
+    assert [len(p) for p in paginas] == [25, 25, 10]
+    assert [item['id'] for p in paginas for item in p] == [c['id'] for c in estado.colaboradores]
+    # 3 páginas com dados + a página vazia que encerra
+    assert estado.requisicoes == 4
+
+
+@pytest.mark.parametrize('workers', [1, 8])
+def test_detalhes_na_ordem_da_listagem(api_falsa, workers):
+    estado, base_url = api_falsa(150, latencia=0.002)
+
+    assert extrair_api_solides('x', base_url, workers=workers, rps=0) == estado.colaboradores
+
+
+def test_429_respeita_retry_after_e_entrega_tudo(api_falsa):
+    estado, base_url = api_falsa(60, limite_rps=30, retry_after='1')
+
+    t0 = time.monotonic()
+    detalhes = extrair_api_solides('x', base_url, workers=8, rps=0)
+    decorrido = time.monotonic() - t0
+
+    assert estado.respostas_429 > 0
+    assert detalhes == estado.colaboradores
+    # 61 requisições com no máximo 30 por segundo: as pausas pelo Retry-After seguram o cliente
+    assert decorrido >= 1.0
+
+
+def test_detalhes_que_falharam_sao_marcados(api_falsa):
+    estado, base_url = api_falsa(200, taxa_erro=0.1)
+
+    detalhes = extrair_api_solides('x', base_url, workers=8, rps=0)
+
+    falhos = ids_com_falha(detalhes)
+    assert estado.respostas_erro > 0
+    assert len(falhos) == estado.respostas_erro
+    esperado = {c['id']: c for c in estado.colaboradores}
+    for detalhe in detalhes:
+        if detalhe['id'] in falhos:
+            # Item da listagem no lugar do detalhe, com o motivo
+            assert detalhe[CHAVE_FALHA_DETALHE] == 'HTTP 500'
+            assert detalhe['updated_at'] == esperado[detalhe['id']]['updated_at']
+            assert 'documents' not in detalhe
+        else:
+            assert detalhe == esperado[detalhe['id']]
+
+    # A listagem leva a falha até o staging, onde ela segura a marca d'água
+    df_listagem = transformar_listagem_api(detalhes, falhos)
+    assert set(df_listagem.loc[df_listagem['detalhe_falhou'], 'colaborador_id_solides']) == falhos
+
+
+def test_segundos_retry_after():
+    assert _segundos_retry_after(_Resposta({'Retry-After': '2'}), 0) == 2.0
+    assert _segundos_retry_after(_Resposta({'Retry-After': 'Thu, 01 Jan 1970 00:00:00 GMT'}), 0) == 0.0
+    # Sem o cabeçalho (ou ilegível): backoff exponencial pela tentativa
+    assert _segundos_retry_after(_Resposta({}), 3) == 8.0
+    assert _segundos_retry_after(_Resposta({'Retry-After': 'depois'}), 1) == 2.0
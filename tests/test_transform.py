@@ -0,0 +1,62 @@
+# tests/test_transform.py
+"""
+Propriedade das conversões vetorizadas do transform: para valores aleatórios
+(todos os formatos aceitos, lixo, nulos e bordas), o resultado é idêntico ao
+da função escalar aplicada linha a linha. Os geradores ficam em
+tests/referencia.py (o benchmarks/bench_transform.py usa os mesmos para medir o ganho).
+"""
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+import pandas as pd
+import pytest
+
+from src.transform import parse_date_seguro, parse_date_series, converter_para_decimal, converter_para_centavos
+from src.utils import limpar_valor_moeda, limpar_valor_moeda_series
+from tests.referencia import valor_data_aleatorio, valor_moeda_aleatorio
+
+CASOS = 5000
+SEMENTES = range(4)
+
+
+@pytest.mark.parametrize('semente', SEMENTES)
+def test_parse_date_series_igual_ao_escalar(semente):
+    rng = random.Random(semente)
+    serie = pd.Series([valor_data_aleatorio(rng) for _ in range(CASOS)], dtype=object)
+
+    esperado = serie.apply(parse_date_seguro)
+    obtido = parse_date_series(serie)
+
+    assert obtido.dtype == object
+    divergentes = [(v, e, o) for v, e, o in zip(serie, esperado, obtido) if e != o and not (e is None and o is None)]
+    assert divergentes == []
+
+
+@pytest.mark.parametrize('semente', SEMENTES)
+def test_limpar_valor_moeda_series_igual_ao_escalar(semente):
+    rng = random.Random(semente)
+    serie = pd.Series([valor_moeda_aleatorio(rng) for _ in range(CASOS)], dtype=object)
+
+    esperado = pd.to_numeric(serie.apply(limpar_valor_moeda), errors='raise').astype('float64')
+    obtido = limpar_valor_moeda_series(serie)
+
+    assert obtido.dtype == 'float64'
+    iguais = (esperado == obtido) | (esperado.isna() & obtido.isna())
+    assert list(zip(serie[~iguais], esperado[~iguais], obtido[~iguais])) == []
+
+
+@pytest.mark.parametrize('semente', SEMENTES)
+def test_converter_para_centavos_igual_ao_decimal_arredondado(semente):
+    rng = random.Random(semente)
+    valores = [rng.choice([None, round(rng.uniform(-1e5, 1e5), rng.randint(0, 4)),
+                           rng.randint(0, 10 ** 7) / 100, rng.randint(0, 999) / 1000 + 0.005])
+               for _ in range(CASOS)]
+    serie = pd.Series(valores, dtype='float64')
+
+    obtido = converter_para_centavos(serie)
+
+    for v, c in zip(serie.apply(converter_para_decimal), obtido):
+        if v is None:
+            assert c is pd.NA
+        else:
+            assert c == int((v * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP)), v